@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -52,6 +55,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'fish_farming.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -72,6 +76,8 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'fish_farming.pagination.StandardPagination',
+    'PAGE_SIZE': 50,
 }
 
 
@@ -106,13 +112,36 @@ WSGI_APPLICATION = 'aqua.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite by default; set DATABASE_URL for PostgreSQL (see aqua/database.py)
 DATABASES = {
+    'default': database_config(BASE_DIR / 'db.sqlite3'),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Report responses, change stamps, ETags and the feeding band table all key
+# on the stamps in REPORT_CACHE_ALIAS (fish_farming.stamps), so every worker
+# process must read the same cache: a write moves the stamp for all of them.
+# The file cache is shared by the workers of one host; point REPORT_CACHE_DIR
+# at a directory they can all write, or use Redis/Memcached for several hosts.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'aqua',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('REPORT_CACHE_DIR', str(BASE_DIR / '.report-cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
 
+REPORT_CACHE_ALIAS = 'reports'
+REPORT_CACHE_TIMEOUT = 3600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -154,3 +183,16 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Writes only mark a pond's daily KPI rows stale; a scheduled materialize_kpis
+# (e.g. cron every few minutes) recomputes them (fish_farming.kpis). True
+# recomputes the pond from the written date on every commit instead.
+KPI_MATERIALIZE_ON_WRITE = False
+
+# Days deletions stay visible to delta sync (fish_farming.sync); a scheduled
+# prune_sync_tombstones removes older ones, and older cursors get 410 Gone.
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
+# Requests per endpoint kept for the p50/p95/p99 summary at /request-stats/
+# (fish_farming.instrumentation)
+REQUEST_METRICS_WINDOW = 1000
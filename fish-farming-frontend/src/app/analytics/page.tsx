@@ -1,18 +1,8 @@
 'use client';
 
 import { useState } from 'react';
-import { 
-  usePonds, 
-  useStocking, 
-  useDailyLogs, 
-  useSamplings, 
-  useFeeds, 
-  useHarvests, 
-  useExpenses, 
-  useIncomes,
-  useAlerts,
-  useMortalities 
-} from '@/hooks/useApi';
+import { usePonds, useAnalytics } from '@/hooks/useApi';
+import { AnalyticsParams } from '@/lib/api';
 import { 
   BarChart3, 
   TrendingUp, 
@@ -31,15 +21,6 @@ import { toast } from 'sonner';
 
 export default function AnalyticsPage() {
   const { data: pondsData } = usePonds();
-  const { data: stockingData } = useStocking();
-  const { data: dailyLogsData } = useDailyLogs();
-  const { data: samplingsData } = useSamplings();
-  const { data: feedsData } = useFeeds();
-  const { data: harvestsData } = useHarvests();
-  const { data: expensesData } = useExpenses();
-  const { data: incomesData } = useIncomes();
-  const { data: alertsData } = useAlerts();
-  const { data: mortalityData } = useMortalities();
 
   const [timeRange, setTimeRange] = useState('30d');
   const [selectedPond, setSelectedPond] = useState('all');
@@ -48,79 +29,26 @@ export default function AnalyticsPage() {
     endDate: ''
   });
 
-  const allPonds = pondsData?.data || [];
-  const allStockings = stockingData?.data || [];
-  const allDailyLogs = dailyLogsData?.data || [];
-  const allSamplings = samplingsData?.data || [];
-  const allFeeds = feedsData?.data || [];
-  const allHarvests = harvestsData?.data || [];
-  const allExpenses = expensesData?.data || [];
-  const allIncomes = incomesData?.data || [];
-  const allAlerts = alertsData?.data || [];
-  const allMortality = mortalityData?.data || [];
-
-  // Filter data based on selected pond
-  const ponds = allPonds;
-  const stockings = selectedPond === 'all' 
-    ? allStockings 
-    : allStockings.filter(stocking => stocking.pond === parseInt(selectedPond));
-  const dailyLogs = selectedPond === 'all' 
-    ? allDailyLogs 
-    : allDailyLogs.filter(log => log.pond === parseInt(selectedPond));
-  const samplings = selectedPond === 'all' 
-    ? allSamplings 
-    : allSamplings.filter(sampling => sampling.pond === parseInt(selectedPond));
-  const feeds = selectedPond === 'all' 
-    ? allFeeds 
-    : allFeeds.filter(feed => feed.pond === parseInt(selectedPond));
-  const harvests = selectedPond === 'all' 
-    ? allHarvests 
-    : allHarvests.filter(harvest => harvest.pond === parseInt(selectedPond));
-  const expenses = selectedPond === 'all' 
-    ? allExpenses 
-    : allExpenses.filter(expense => expense.pond === parseInt(selectedPond));
-  const incomes = selectedPond === 'all' 
-    ? allIncomes 
-    : allIncomes.filter(income => income.pond === parseInt(selectedPond));
-  const alerts = selectedPond === 'all' 
-    ? allAlerts 
-    : allAlerts.filter(alert => alert.pond === parseInt(selectedPond));
-  const mortality = selectedPond === 'all' 
-    ? allMortality 
-    : allMortality.filter(mortality => mortality.pond === parseInt(selectedPond));
+  // Totals, averages and recent activity are aggregated by the server
+  const analyticsParams: AnalyticsParams = {};
+  if (selectedPond !== 'all') {
+    analyticsParams.pond = parseInt(selectedPond);
+  }
+  if (dateRange.startDate || dateRange.endDate) {
+    if (dateRange.startDate) analyticsParams.start_date = dateRange.startDate;
+    if (dateRange.endDate) analyticsParams.end_date = dateRange.endDate;
+  } else if (timeRange !== 'custom') {
+    analyticsParams.range = timeRange as AnalyticsParams['range'];
+  }
+  const { data: analyticsData } = useAnalytics(analyticsParams);
 
-  // Date filtering function
-  const filterByDateRange = (data: any[], dateField: string = 'date') => {
-    if (!dateRange.startDate && !dateRange.endDate) return data;
-    
-    return data.filter(item => {
-      const itemDate = new Date(item[dateField]);
-      const startDate = dateRange.startDate ? new Date(dateRange.startDate) : null;
-      const endDate = dateRange.endDate ? new Date(dateRange.endDate) : null;
-      
-      if (startDate && endDate) {
-        return itemDate >= startDate && itemDate <= endDate;
-      } else if (startDate) {
-        return itemDate >= startDate;
-      } else if (endDate) {
-        return itemDate <= endDate;
-      }
-      return true;
-    });
-  };
-
-  // Apply date filtering to all data
-  const filteredStockings = filterByDateRange(stockings);
-  const filteredDailyLogs = filterByDateRange(dailyLogs);
-  const filteredSamplings = filterByDateRange(samplings);
-  const filteredFeeds = filterByDateRange(feeds);
-  const filteredHarvests = filterByDateRange(harvests);
-  const filteredExpenses = filterByDateRange(expenses);
-  const filteredIncomes = filterByDateRange(incomes);
-  const filteredAlerts = filterByDateRange(alerts, 'created_at');
-  const filteredMortality = filterByDateRange(mortality);
-
-  console.log(ponds, filteredStockings, filteredHarvests, filteredExpenses, filteredIncomes, filteredAlerts);
+  const ponds = pondsData?.data || [];
+  const analytics = analyticsData?.data;
+  const totals = analytics?.totals;
+  const waterQuality = analytics?.water_quality;
+  const harvests = analytics?.recent.harvests || [];
+  const mortality = analytics?.recent.mortality || [];
+  const alerts = analytics?.recent.alerts || [];
 
   // Helper function to safely convert to number
   const toNumber = (value: string | number | null | undefined): number => {
@@ -132,132 +60,32 @@ export default function AnalyticsPage() {
     return 0;
   };
 
-  // Calculate KPIs
-  const totalPonds = ponds.length;
-  const activePonds = ponds.filter(pond => pond.is_active).length;
-  const totalStocked = filteredStockings.reduce((sum, stocking) => sum + toNumber(stocking.pcs), 0);
-  const totalHarvested = filteredHarvests.reduce((sum, harvest) => sum + toNumber(harvest.total_weight_kg), 0);
-  const totalRevenue = filteredHarvests.reduce((sum, harvest) => sum + toNumber(harvest.total_revenue), 0);
-  const totalExpenses = filteredExpenses.reduce((sum, expense) => sum + toNumber(expense.amount), 0);
-  const totalIncome = filteredIncomes.reduce((sum, income) => sum + toNumber(income.amount), 0);
-  const netProfit = totalIncome - totalExpenses;
-  const activeAlerts = filteredAlerts.filter(alert => !alert.is_resolved).length;
+  // KPIs
+  const totalPonds = analytics?.ponds.total ?? ponds.length;
+  const activePonds = analytics?.ponds.active ?? ponds.filter(pond => pond.is_active).length;
+  const totalStocked = totals?.total_stocked ?? 0;
+  const totalHarvested = totals?.total_harvested_kg ?? 0;
+  const totalRevenue = totals?.total_revenue ?? 0;
+  const totalExpenses = totals?.total_expenses ?? 0;
+  const totalIncome = totals?.total_income ?? 0;
+  const netProfit = totals?.net_profit ?? 0;
+  const activeAlerts = totals?.active_alerts ?? 0;
 
-  // Calculate averages
-  const avgWaterTemp = filteredSamplings.length > 0 
-    ? filteredSamplings.reduce((sum, s) => sum + toNumber(s.temperature_c), 0) / filteredSamplings.length 
-    : 0;
-  const avgDO = filteredSamplings.length > 0 
-    ? filteredSamplings.reduce((sum, s) => sum + toNumber(s.dissolved_oxygen), 0) / filteredSamplings.length 
-    : 0;
-  const avgPH = filteredSamplings.length > 0 
-    ? filteredSamplings.reduce((sum, s) => sum + toNumber(s.ph), 0) / filteredSamplings.length 
-    : 0;
+  // Water quality averages
+  const avgWaterTemp = waterQuality?.avg_temperature_c ?? 0;
+  const avgDO = waterQuality?.avg_dissolved_oxygen ?? 0;
+  const avgPH = waterQuality?.avg_ph ?? 0;
 
-  // Calculate FCR (Feed Conversion Ratio)
-  const totalFeedUsed = filteredFeeds.reduce((sum, feed) => sum + toNumber(feed.amount_kg), 0);
-  const fcr = totalHarvested > 0 ? totalFeedUsed / totalHarvested : 0;
-
-  // Calculate feed consumption metrics
-  const totalFeedCost = filteredFeeds.reduce((sum, feed) => sum + toNumber(feed.total_cost || 0), 0);
-  const avgFeedCostPerKg = filteredFeeds.length > 0 
-    ? filteredFeeds.reduce((sum, feed) => sum + toNumber(feed.cost_per_kg || 0), 0) / filteredFeeds.length 
-    : 0;
-  // Calculate average feeding rate - use actual data or calculate from biomass if not available
-  const avgFeedingRate = (() => {
-    if (filteredFeeds.length === 0) return 0;
-    
-    let totalRate = 0;
-    let validFeeds = 0;
-    const feedDetails: Array<{
-      id: number;
-      feeding_rate_percent: string | null;
-      biomass_at_feeding_kg: string | null;
-      amount_kg: string;
-      calculated: boolean;
-      method: string;
-      calculatedRate?: number;
-    }> = [];
-    
-    // Calculate total biomass from stocking data for estimation
-    const totalBiomassFromStocking = filteredStockings.reduce((sum, stocking) => {
-      const fishCount = toNumber(stocking.pcs);
-      const avgWeight = toNumber(stocking.initial_avg_weight_kg);
-      return sum + (fishCount * avgWeight);
-    }, 0);
-    
-    filteredFeeds.forEach(feed => {
-      const feedingRate = toNumber(feed.feeding_rate_percent);
-      const biomass = toNumber(feed.biomass_at_feeding_kg);
-      const amount = toNumber(feed.amount_kg);
-      
-      feedDetails.push({
-        id: feed.id,
-        feeding_rate_percent: feed.feeding_rate_percent,
-        biomass_at_feeding_kg: feed.biomass_at_feeding_kg,
-        amount_kg: feed.amount_kg,
-        calculated: false,
-        method: 'none'
-      });
-      
-      if (feedingRate > 0) {
-        totalRate += feedingRate;
-        validFeeds++;
-        feedDetails[feedDetails.length - 1].method = 'direct';
-      } else if (biomass > 0 && amount > 0) {
-        // Calculate feeding rate from biomass and amount if not directly available
-        const calculatedRate = (amount / biomass) * 100;
-        totalRate += calculatedRate;
-        validFeeds++;
-        feedDetails[feedDetails.length - 1].calculated = true;
-        feedDetails[feedDetails.length - 1].calculatedRate = calculatedRate;
-        feedDetails[feedDetails.length - 1].method = 'biomass';
-      } else if (amount > 0 && totalBiomassFromStocking > 0) {
-        // Estimate feeding rate using total biomass from stocking data
-        const estimatedRate = (amount / totalBiomassFromStocking) * 100;
-        totalRate += estimatedRate;
-        validFeeds++;
-        feedDetails[feedDetails.length - 1].calculated = true;
-        feedDetails[feedDetails.length - 1].calculatedRate = estimatedRate;
-        feedDetails[feedDetails.length - 1].method = 'estimated';
-      }
-    });
-    
-    const result = validFeeds > 0 ? totalRate / validFeeds : 0;
-    
-    // Enhanced debug logging
-    console.log('Feeding Rate Calculation Details:', {
-      totalFeeds: filteredFeeds.length,
-      validFeeds: validFeeds,
-      totalRate: totalRate,
-      avgFeedingRate: result,
-      totalBiomassFromStocking: totalBiomassFromStocking,
-      feedDetails: feedDetails.slice(0, 5) // Show first 5 feeds for debugging
-    });
-    
-    return result;
-  })();
-  
-  // Debug feed data
-  console.log('Feed data debug:', {
-    totalFeeds: filteredFeeds.length,
-    feedSamples: filteredFeeds.slice(0, 3).map(feed => ({
-      id: feed.id,
-      feeding_rate_percent: feed.feeding_rate_percent,
-      biomass_at_feeding_kg: feed.biomass_at_feeding_kg,
-      amount_kg: feed.amount_kg,
-      total_cost: feed.total_cost
-    })),
-    avgFeedingRate: avgFeedingRate
-  });
-  
-  const dailyFeedConsumption = filteredFeeds.length > 0 
-    ? filteredFeeds.reduce((sum, feed) => sum + toNumber(feed.consumption_rate_kg_per_day || feed.amount_kg), 0) / filteredFeeds.length 
-    : 0;
+  // Feed metrics
+  const fcr = totals?.fcr ?? 0;
+  const totalFeedCost = totals?.total_feed_cost ?? 0;
+  const avgFeedCostPerKg = totals?.avg_feed_cost_per_kg ?? 0;
+  const avgFeedingRate = totals?.avg_feeding_rate ?? 0;
+  const dailyFeedConsumption = totals?.daily_feed_consumption ?? 0;
 
-  // Calculate survival rate using mortality data
-  const totalMortality = filteredMortality.reduce((sum, mortality) => sum + toNumber(mortality.count), 0);
-  const survivalRate = totalStocked > 0 ? ((totalStocked - totalMortality) / totalStocked) * 100 : 0;
+  // Survival
+  const totalMortality = totals?.total_mortality ?? 0;
+  const survivalRate = totals?.survival_rate ?? 0;
 
   const kpiCards = [
     {
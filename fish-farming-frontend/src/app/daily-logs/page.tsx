@@ -1,18 +1,21 @@
 'use client';
 
 import { useState } from 'react';
-import { useDailyLogs, usePonds, useDeleteDailyLog } from '@/hooks/useApi';
+import { usePagedDailyLogs, usePonds, useDeleteDailyLog } from '@/hooks/useApi';
 import { formatDate, formatNumber } from '@/lib/utils';
 import { Calendar, Plus, Edit, Trash2, Eye, Thermometer, Droplets, AlertTriangle } from 'lucide-react';
 import Link from 'next/link';
 import { toast } from 'sonner';
 
 export default function DailyLogsPage() {
-  const { data: dailyLogsData, isLoading } = useDailyLogs();
+  // Newest first, one page at a time; older logs load on request
+  const {
+    data: dailyLogsData, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage
+  } = usePagedDailyLogs();
   const { data: pondsData } = usePonds();
   const deleteDailyLog = useDeleteDailyLog();
   
-  const dailyLogs = dailyLogsData?.data || [];
+  const dailyLogs = dailyLogsData?.pages.flatMap((page) => page.results) || [];
   const ponds = pondsData?.data || [];
 
   const handleDelete = async (id: number, pondName: string, date: string) => {
@@ -54,8 +57,8 @@ export default function DailyLogsPage() {
       <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
         <div className="flex items-center justify-between">
           <div>
-            <h3 className="text-lg font-semibold text-gray-900">Total Daily Logs</h3>
-            <p className="text-3xl font-bold text-blue-600">{dailyLogs.length}</p>
+            <h3 className="text-lg font-semibold text-gray-900">Daily Logs Loaded</h3>
+            <p className="text-3xl font-bold text-blue-600">{dailyLogs.length}{hasNextPage ? '+' : ''}</p>
           </div>
           <div className="rounded-full bg-blue-100 p-3">
             <Calendar className="h-8 w-8 text-blue-600" />
@@ -160,6 +163,17 @@ export default function DailyLogsPage() {
               </tbody>
             </table>
           </div>
+          {hasNextPage && (
+            <div className="px-6 py-4 border-t border-gray-200 text-center">
+              <button
+                onClick={() => fetchNextPage()}
+                disabled={isFetchingNextPage}
+                className="inline-flex items-center px-4 py-2 border border-gray-300 rounded-md shadow-sm text-sm font-medium text-gray-700 bg-white hover:bg-gray-50 disabled:opacity-50"
+              >
+                {isFetchingNextPage ? 'Loading...' : 'Load older logs'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -35,6 +35,19 @@ interface TargetBiomassResult {
   target_date: string;
   recommendations: string[];
   warnings: string[];
+  projection?: TargetBiomassProjection;
+}
+
+interface TargetBiomassProjection {
+  days_to_target: number | null;
+  start_date: string;
+  daily_mortality_rate: number;
+  feed_cost_per_kg: number | null;
+  biomass_kg: number[];
+  fish_count: number[];
+  feed_kg_per_day: number[];
+  cumulative_feed_kg: number[];
+  cumulative_cost: number[] | null;
 }
 
 export default function TargetBiomassPage() {
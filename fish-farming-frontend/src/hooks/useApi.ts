@@ -1,5 +1,8 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { apiService } from '@/lib/api';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import {
+  apiService, getPage, getLinkedPage, Paginated, AnalyticsParams,
+  DailyLog, Feed, FishSampling, Mortality, Sampling
+} from '@/lib/api';
 import { toast } from 'sonner';
 
 // Generic hook for GET requests
@@ -45,6 +48,31 @@ export function  useApiQuery<T>(
   return result;
 }
 
+// Generic hook for paged lists: loads one page at a time and follows the
+// server's `next` link on fetchNextPage(); rows are in data.pages[n].results
+export function useInfiniteList<T>(
+  queryKey: string[],
+  url: string,
+  params?: Record<string, unknown>,
+  options?: {
+    enabled?: boolean;
+    pageSize?: number;
+  }
+) {
+  return useInfiniteQuery({
+    queryKey: [...queryKey, 'infinite', JSON.stringify(params || {}), String(options?.pageSize ?? '')],
+    queryFn: async ({ pageParam }): Promise<Paginated<T>> => {
+      const response = pageParam
+        ? await getLinkedPage<T>(url, pageParam)
+        : await getPage<T>(url, { ...params, page_size: options?.pageSize });
+      return response.data;
+    },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next,
+    enabled: options?.enabled,
+  });
+}
+
 // Generic hook for mutations
 export function useApiMutation<TData, TVariables>(
   mutationFn: (variables: TVariables) => Promise<{ data: TData }>,
@@ -91,12 +119,20 @@ export function usePondSummary(id: number) {
   });
 }
 
+export function usePondSummaries() {
+  return useApiQuery(['ponds', 'summary'], () => apiService.getPondSummaries());
+}
+
 export function usePondFinancialSummary(id: number) {
   return useApiQuery(['ponds', id.toString(), 'financial'], () => apiService.getPondFinancialSummary(id), {
     enabled: !!id,
   });
 }
 
+export function useFarmFinancialSummary() {
+  return useApiQuery(['ponds', 'financial'], () => apiService.getFarmFinancialSummary());
+}
+
 export function useSpecies() {
   return useApiQuery(['species'], () => apiService.getSpecies());
 }
@@ -417,6 +453,10 @@ export function useDailyLogs() {
   return useApiQuery(['daily-logs'], () => apiService.getDailyLogs());
 }
 
+export function usePagedDailyLogs(params?: Record<string, unknown>, pageSize?: number) {
+  return useInfiniteList<DailyLog>(['daily-logs'], '/daily-logs/', params, { pageSize });
+}
+
 export function useDailyLogById(id: number) {
   return useApiQuery(
     ['daily-logs', id.toString()],
@@ -515,6 +555,10 @@ export function useSamplings() {
   return useApiQuery(['sampling'], () => apiService.getSamplings());
 }
 
+export function usePagedSamplings(params?: Record<string, unknown>, pageSize?: number) {
+  return useInfiniteList<Sampling>(['sampling'], '/sampling/', params, { pageSize });
+}
+
 export function useSamplingById(id: number) {
   return useApiQuery(
     ['sampling', id.toString()],
@@ -564,6 +608,10 @@ export function useMortalities() {
   return useApiQuery(['mortality'], () => apiService.getMortalities());
 }
 
+export function usePagedMortalities(params?: Record<string, unknown>, pageSize?: number) {
+  return useInfiniteList<Mortality>(['mortality'], '/mortality/', params, { pageSize });
+}
+
 export function useMortalityById(id: number) {
   return useApiQuery(
     ['mortality', id.toString()],
@@ -662,6 +710,10 @@ export function useFeeds() {
   return useApiQuery(['feeds'], () => apiService.getFeeds());
 }
 
+export function usePagedFeeds(params?: Record<string, unknown>, pageSize?: number) {
+  return useInfiniteList<Feed>(['feeds'], '/feeds/', params, { pageSize });
+}
+
 export function useFeedById(id: number) {
   return useApiQuery(
     ['feeds', id.toString()],
@@ -894,6 +946,10 @@ export function useFishSampling() {
   return useApiQuery(['fish-sampling'], () => apiService.getFishSampling());
 }
 
+export function usePagedFishSampling(params?: Record<string, unknown>, pageSize?: number) {
+  return useInfiniteList<FishSampling>(['fish-sampling'], '/fish-sampling/', params, { pageSize });
+}
+
 export function useFishSamplingById(id: number) {
   return useApiQuery(
     ['fish-sampling', id.toString()],
@@ -1069,6 +1125,14 @@ export function useBiomassAnalysis(params?: { pond?: number; species?: number; s
   );
 }
 
+// Analytics dashboard
+export function useAnalytics(params?: AnalyticsParams) {
+  return useApiQuery(
+    ['analytics', JSON.stringify(params || {})],
+    () => apiService.getAnalytics(params)
+  );
+}
+
 // FCR Analysis
 export function useFcrAnalysis(params?: { pond?: number; species?: number; start_date?: string; end_date?: string }) {
   const result = useApiQuery(
@@ -40,6 +40,39 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints are paginated: page-number lists also carry `count`,
+// date-ordered lists use a cursor and only carry next/previous links
+export interface Paginated<T> {
+  count?: number;
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// Largest page the API serves; used when a page needs the complete list
+export const MAX_PAGE_SIZE = 500;
+
+// Fetch a single page of a list endpoint
+export const getPage = <T>(url: string, params?: Record<string, unknown>) =>
+  api.get<Paginated<T>>(url, { params });
+
+// Fetch the page a `next`/`previous` link points to. Only its query string is
+// used, so the request goes through the configured base URL like any other.
+export const getLinkedPage = <T>(url: string, link: string) =>
+  api.get<Paginated<T>>(`${url}${new URL(link).search}`);
+
+// Follow `next` links and collect every row of a list endpoint
+export async function getAllPages<T>(url: string, params?: Record<string, unknown>): Promise<{ data: T[] }> {
+  const rows: T[] = [];
+  let response = await getPage<T>(url, { page_size: MAX_PAGE_SIZE, ...params });
+  rows.push(...response.data.results);
+  while (response.data.next) {
+    response = await getLinkedPage<T>(url, response.data.next);
+    rows.push(...response.data.results);
+  }
+  return { data: rows };
+}
+
 // API Types
 export interface Species {
   id: number;
@@ -466,6 +499,89 @@ export interface FcrAnalysis {
   }>;
 }
 
+export interface AnalyticsSeriesPoint {
+  period: string;
+  stocked: number;
+  feed_kg: number;
+  feed_cost: number;
+  harvested_kg: number;
+  revenue: number;
+  mortality: number;
+  expenses: number;
+  income: number;
+}
+
+export interface Analytics {
+  filters: {
+    pond: number | null;
+    start_date: string | null;
+    end_date: string | null;
+    interval: 'day' | 'week' | 'month';
+  };
+  ponds: {
+    total: number;
+    active: number;
+  };
+  totals: {
+    total_stocked: number;
+    stocked_biomass_kg: number;
+    total_harvested_kg: number;
+    total_revenue: number;
+    total_expenses: number;
+    total_income: number;
+    net_profit: number;
+    profit_margin: number;
+    total_feed_kg: number;
+    total_feed_cost: number;
+    feed_records: number;
+    avg_feed_cost_per_kg: number;
+    avg_feeding_rate: number;
+    daily_feed_consumption: number;
+    fcr: number;
+    total_mortality: number;
+    survival_rate: number;
+    total_alerts: number;
+    active_alerts: number;
+  };
+  water_quality: {
+    samples: number;
+    avg_temperature_c: number;
+    avg_dissolved_oxygen: number;
+    avg_ph: number;
+  };
+  series: AnalyticsSeriesPoint[];
+  kpis: {
+    latest: {
+      ponds: number;
+      date: string | null;
+      total_biomass_kg: number;
+      avg_weight_g: number;
+    };
+    series: AnalyticsKpiPoint[];
+  };
+  recent: {
+    harvests: Harvest[];
+    mortality: Mortality[];
+    alerts: Alert[];
+  };
+}
+
+export interface AnalyticsKpiPoint {
+  period: string;
+  biomass_kg: number;
+  avg_weight_g: number;
+  survival_rate_percent: number;
+  fcr: number;
+}
+
+export interface AnalyticsParams {
+  pond?: number;
+  range?: '7d' | '30d' | '90d' | '1y';
+  start_date?: string;
+  end_date?: string;
+  interval?: 'day' | 'week' | 'month';
+}
+
 export interface DailyLog {
   id: number;
   pond: number;
@@ -527,6 +643,26 @@ export interface FinancialSummary {
   }>;
 }
 
+export interface BulkCreateResult {
+  created: number;
+  updated: number;
+  ids: number[];
+}
+
+export interface SyncChange {
+  model: string;
+  op: 'upsert' | 'delete';
+  id: number;
+  at: string;
+  data?: Record<string, unknown>;
+}
+
+export interface SyncPage {
+  changes: SyncChange[];
+  next_cursor: string | null;
+  has_more: boolean;
+}
+
 // API Functions
 export const apiService = {
   // Authentication
@@ -553,128 +689,135 @@ export const apiService = {
   },
 
   // Species
-  getSpecies: () => api.get<Species[]>('/species/'),
+  getSpecies: () => getAllPages<Species>('/species/'),
   getSpeciesById: (id: number) => api.get<Species>(`/species/${id}/`),
   createSpecies: (data: Partial<Species>) => api.post<Species>('/species/', data),
   updateSpecies: (id: number, data: Partial<Species>) => api.put<Species>(`/species/${id}/`, data),
   deleteSpecies: (id: number) => api.delete(`/species/${id}/`),
 
   // Ponds
-  getPonds: () => api.get<Pond[]>('/ponds/'),
+  getPonds: () => getAllPages<Pond>('/ponds/'),
   getPondById: (id: number) => api.get<Pond>(`/ponds/${id}/`),
   getPondSummary: (id: number) => api.get<PondSummary>(`/ponds/${id}/summary/`),
+  getPondSummaries: () => getAllPages<PondSummary>('/ponds/summary/'),
   getPondFinancialSummary: (id: number) => api.get<FinancialSummary>(`/ponds/${id}/financial_summary/`),
+  getFarmFinancialSummary: () => api.get<FinancialSummary>('/ponds/financial_summary/'),
   createPond: (data: Partial<Pond>) => api.post<Pond>('/ponds/', data),
   updatePond: (id: number, data: Partial<Pond>) => api.put<Pond>(`/ponds/${id}/`, data),
   deletePond: (id: number) => api.delete(`/ponds/${id}/`),
 
   // Stocking
-  getStocking: () => api.get<Stocking[]>('/stocking/'),
+  getStocking: () => getAllPages<Stocking>('/stocking/'),
   getStockingById: (id: number) => api.get<Stocking>(`/stocking/${id}/`),
   createStocking: (data: Partial<Stocking>) => api.post<Stocking>('/stocking/', data),
   updateStocking: (id: number, data: Partial<Stocking>) => api.put<Stocking>(`/stocking/${id}/`, data),
   deleteStocking: (id: number) => api.delete(`/stocking/${id}/`),
 
   // Daily Logs
-  getDailyLogs: () => api.get<DailyLog[]>('/daily-logs/'),
+  getDailyLogs: () => getAllPages<DailyLog>('/daily-logs/'),
   getDailyLogById: (id: number) => api.get<DailyLog>(`/daily-logs/${id}/`),
   createDailyLog: (data: Partial<DailyLog>) => api.post<DailyLog>('/daily-logs/', data),
+  createDailyLogsBulk: (data: Partial<DailyLog>[], upsert = false) => api.post<BulkCreateResult>('/daily-logs/bulk/', data, { params: upsert ? { upsert: true } : undefined }),
   updateDailyLog: (id: number, data: Partial<DailyLog>) => api.put<DailyLog>(`/daily-logs/${id}/`, data),
   deleteDailyLog: (id: number) => api.delete(`/daily-logs/${id}/`),
 
   // Sample Types
-  getSampleTypes: () => api.get<SampleType[]>('/sample-types/'),
+  getSampleTypes: () => getAllPages<SampleType>('/sample-types/'),
   getSampleTypeById: (id: number) => api.get<SampleType>(`/sample-types/${id}/`),
   createSampleType: (data: Partial<SampleType>) => api.post<SampleType>('/sample-types/', data),
   updateSampleType: (id: number, data: Partial<SampleType>) => api.put<SampleType>(`/sample-types/${id}/`, data),
   deleteSampleType: (id: number) => api.delete(`/sample-types/${id}/`),
 
   // Water Quality Sampling
-  getSamplings: () => api.get<Sampling[]>('/sampling/'),
+  getSamplings: () => getAllPages<Sampling>('/sampling/'),
   getSamplingById: (id: number) => api.get<Sampling>(`/sampling/${id}/`),
   createSampling: (data: Partial<Sampling>) => api.post<Sampling>('/sampling/', data),
+  createSamplingsBulk: (data: Partial<Sampling>[]) => api.post<BulkCreateResult>('/sampling/bulk/', data),
   updateSampling: (id: number, data: Partial<Sampling>) => api.put<Sampling>(`/sampling/${id}/`, data),
   deleteSampling: (id: number) => api.delete(`/sampling/${id}/`),
 
   // Mortality Tracking
-  getMortalities: () => api.get<Mortality[]>('/mortality/'),
+  getMortalities: () => getAllPages<Mortality>('/mortality/'),
   getMortalityById: (id: number) => api.get<Mortality>(`/mortality/${id}/`),
   createMortality: (data: Partial<Mortality>) => api.post<Mortality>('/mortality/', data),
+  createMortalitiesBulk: (data: Partial<Mortality>[]) => api.post<BulkCreateResult>('/mortality/bulk/', data),
   updateMortality: (id: number, data: Partial<Mortality>) => api.put<Mortality>(`/mortality/${id}/`, data),
   deleteMortality: (id: number) => api.delete(`/mortality/${id}/`),
 
   // Feed Types
-  getFeedTypes: () => api.get<FeedType[]>('/feed-types/'),
+  getFeedTypes: () => getAllPages<FeedType>('/feed-types/'),
   getFeedTypeById: (id: number) => api.get<FeedType>(`/feed-types/${id}/`),
   createFeedType: (data: Partial<FeedType>) => api.post<FeedType>('/feed-types/', data),
   updateFeedType: (id: number, data: Partial<FeedType>) => api.put<FeedType>(`/feed-types/${id}/`, data),
   deleteFeedType: (id: number) => api.delete(`/feed-types/${id}/`),
 
   // Feeds
-  getFeeds: () => api.get<Feed[]>('/feeds/'),
+  getFeeds: () => getAllPages<Feed>('/feeds/'),
   getFeedById: (id: number) => api.get<Feed>(`/feeds/${id}/`),
   createFeed: (data: Partial<Feed>) => api.post<Feed>('/feeds/', data),
+  createFeedsBulk: (data: Partial<Feed>[]) => api.post<BulkCreateResult>('/feeds/bulk/', data),
   updateFeed: (id: number, data: Partial<Feed>) => api.put<Feed>(`/feeds/${id}/`, data),
   deleteFeed: (id: number) => api.delete(`/feeds/${id}/`),
 
   // Feed Inventory
-  getInventoryFeeds: () => api.get<InventoryFeed[]>('/inventory-feed/'),
+  getInventoryFeeds: () => getAllPages<InventoryFeed>('/inventory-feed/'),
   getInventoryFeedById: (id: number) => api.get<InventoryFeed>(`/inventory-feed/${id}/`),
   createInventoryFeed: (data: Partial<InventoryFeed>) => api.post<InventoryFeed>('/inventory-feed/', data),
   updateInventoryFeed: (id: number, data: Partial<InventoryFeed>) => api.put<InventoryFeed>(`/inventory-feed/${id}/`, data),
   deleteInventoryFeed: (id: number) => api.delete(`/inventory-feed/${id}/`),
 
   // Feeding Bands
-  getFeedingBands: () => api.get<FeedingBand[]>('/feeding-bands/'),
+  getFeedingBands: () => getAllPages<FeedingBand>('/feeding-bands/'),
   getFeedingBandById: (id: number) => api.get<FeedingBand>(`/feeding-bands/${id}/`),
   createFeedingBand: (data: Partial<FeedingBand>) => api.post<FeedingBand>('/feeding-bands/', data),
   updateFeedingBand: (id: number, data: Partial<FeedingBand>) => api.put<FeedingBand>(`/feeding-bands/${id}/`, data),
   deleteFeedingBand: (id: number) => api.delete(`/feeding-bands/${id}/`),
 
   // Harvests
-  getHarvests: () => api.get<Harvest[]>('/harvests/'),
+  getHarvests: () => getAllPages<Harvest>('/harvests/'),
   getHarvestById: (id: number) => api.get<Harvest>(`/harvests/${id}/`),
   createHarvest: (data: Partial<Harvest>) => api.post<Harvest>('/harvests/', data),
   updateHarvest: (id: number, data: Partial<Harvest>) => api.put<Harvest>(`/harvests/${id}/`, data),
   deleteHarvest: (id: number) => api.delete(`/harvests/${id}/`),
 
   // Expenses
-  getExpenses: () => api.get<Expense[]>('/expenses/'),
+  getExpenses: () => getAllPages<Expense>('/expenses/'),
   getExpenseById: (id: number) => api.get<Expense>(`/expenses/${id}/`),
   createExpense: (data: Partial<Expense>) => api.post<Expense>('/expenses/', data),
   updateExpense: (id: number, data: Partial<Expense>) => api.put<Expense>(`/expenses/${id}/`, data),
   deleteExpense: (id: number) => api.delete(`/expenses/${id}/`),
 
   // Income
-  getIncomes: () => api.get<Income[]>('/incomes/'),
+  getIncomes: () => getAllPages<Income>('/incomes/'),
   getIncomeById: (id: number) => api.get<Income>(`/incomes/${id}/`),
   createIncome: (data: Partial<Income>) => api.post<Income>('/incomes/', data),
   updateIncome: (id: number, data: Partial<Income>) => api.put<Income>(`/incomes/${id}/`, data),
   deleteIncome: (id: number) => api.delete(`/incomes/${id}/`),
 
   // Expense Types
-  getExpenseTypes: () => api.get<ExpenseType[]>('/expense-types/'),
+  getExpenseTypes: () => getAllPages<ExpenseType>('/expense-types/'),
   getExpenseTypeById: (id: number) => api.get<ExpenseType>(`/expense-types/${id}/`),
   createExpenseType: (data: Partial<ExpenseType>) => api.post<ExpenseType>('/expense-types/', data),
   updateExpenseType: (id: number, data: Partial<ExpenseType>) => api.put<ExpenseType>(`/expense-types/${id}/`, data),
   deleteExpenseType: (id: number) => api.delete(`/expense-types/${id}/`),
 
   // Income Types
-  getIncomeTypes: () => api.get<IncomeType[]>('/income-types/'),
+  getIncomeTypes: () => getAllPages<IncomeType>('/income-types/'),
   getIncomeTypeById: (id: number) => api.get<IncomeType>(`/income-types/${id}/`),
   createIncomeType: (data: Partial<IncomeType>) => api.post<IncomeType>('/income-types/', data),
   updateIncomeType: (id: number, data: Partial<IncomeType>) => api.put<IncomeType>(`/income-types/${id}/`, data),
   deleteIncomeType: (id: number) => api.delete(`/income-types/${id}/`),
 
   // Alerts
-  getAlerts: () => api.get<Alert[]>('/alerts/'),
+  getAlerts: () => getAllPages<Alert>('/alerts/'),
   getAlertById: (id: number) => api.get<Alert>(`/alerts/${id}/`),
   resolveAlert: (id: number) => api.post(`/alerts/${id}/resolve/`),
 
   // Fish Sampling
-  getFishSampling: () => api.get<FishSampling[]>('/fish-sampling/'),
+  getFishSampling: () => getAllPages<FishSampling>('/fish-sampling/'),
   getFishSamplingById: (id: number) => api.get<FishSampling>(`/fish-sampling/${id}/`),
   createFishSampling: (data: Partial<FishSampling>) => api.post<FishSampling>('/fish-sampling/', data),
+  createFishSamplingsBulk: (data: Partial<FishSampling>[], upsert = false) => api.post<BulkCreateResult>('/fish-sampling/bulk/', data, { params: upsert ? { upsert: true } : undefined }),
   updateFishSampling: (id: number, data: Partial<FishSampling>) => api.put<FishSampling>(`/fish-sampling/${id}/`, data),
   deleteFishSampling: (id: number) => api.delete(`/fish-sampling/${id}/`),
   getBiomassAnalysis: (params?: { pond?: number; species?: number; start_date?: string; end_date?: string }) => 
@@ -684,8 +827,14 @@ export const apiService = {
     return api.get<FcrAnalysis>('/fish-sampling/fcr_analysis/', { params });
   },
 
+  // Analytics
+  getAnalytics: (params?: AnalyticsParams) => api.get<Analytics>('/analytics/', { params }),
+
+  // Delta sync
+  getChanges: (params?: { cursor?: string; limit?: number }) => api.get<SyncPage>('/sync/', { params }),
+
   // Feeding Advice
-  getFeedingAdvice: () => api.get<FeedingAdvice[]>('/feeding-advice/'),
+  getFeedingAdvice: () => getAllPages<FeedingAdvice>('/feeding-advice/'),
   getFeedingAdviceById: (id: number) => api.get<FeedingAdvice>(`/feeding-advice/${id}/`),
   createFeedingAdvice: (data: Partial<FeedingAdvice>) => api.post<FeedingAdvice>('/feeding-advice/', data),
   generateFeedingAdvice: (data: { pond_id: number }) => api.post<FeedingAdvice>('/feeding-advice/generate_advice/', data),
@@ -3,7 +3,8 @@ from .models import (
     Pond, Species, Stocking, DailyLog, FeedType, Feed, SampleType, Sampling, 
     Mortality, Harvest, ExpenseType, IncomeType, Expense, Income, 
     InventoryFeed, Treatment, Alert, Setting, FeedingBand, 
-    EnvAdjustment, KPIDashboard, FishSampling, FeedingAdvice, SurvivalRate
+    EnvAdjustment, KPIDashboard, FishSampling, FeedingAdvice, SurvivalRate,
+    PopulationLedger, DeletedRecord
 )
 
 
@@ -234,4 +235,23 @@ class SurvivalRateAdmin(admin.ModelAdmin):
     list_display = ['pond', 'species', 'date', 'initial_stocked', 'current_alive', 'survival_rate_percent', 'total_mortality', 'total_harvested']
     list_filter = ['date', 'species', 'pond__user']
     search_fields = ['pond__name', 'species__name', 'notes']
-    readonly_fields = ['survival_rate_percent', 'total_mortality', 'total_survival_kg', 'created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['survival_rate_percent', 'total_mortality', 'total_survival_kg', 'created_at', 'updated_at']
+
+
+@admin.register(PopulationLedger)
+class PopulationLedgerAdmin(admin.ModelAdmin):
+    list_display = ['pond', 'species', 'date', 'stocked', 'mortality', 'harvested', 'alive']
+    list_filter = ['date', 'species', 'pond__user']
+    search_fields = ['pond__name', 'species__name']
+    readonly_fields = [
+        'stocked', 'mortality', 'harvested',
+        'cumulative_stocked', 'cumulative_mortality', 'cumulative_harvested', 'updated_at'
+    ]
+
+
+@admin.register(DeletedRecord)
+class DeletedRecordAdmin(admin.ModelAdmin):
+    list_display = ['model', 'object_id', 'user', 'deleted_at']
+    list_filter = ['model', 'deleted_at']
+    search_fields = ['model', 'object_id', 'user__username']
+    readonly_fields = ['deleted_at']
@@ -0,0 +1,864 @@
+"""Batch feeding-advice generation.
+
+Advice used to be generated one pond/species at a time, with every analysis
+(population, water quality, mortality, feeding, growth, applied advice)
+querying its own 30/90-day window. ``FeedingAdviceEngine`` loads those
+windows for every pond in a run up front, computes the analyses in memory
+and writes the resulting ``FeedingAdvice`` rows in bulk.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import (
+    DailyLog, Feed, FeedingAdvice, FishSampling, Mortality, Sampling, Species, Stocking
+)
+from .feeding_stages import feeding_band_table, get_feeding_stage
+from .population import current_populations
+from .stamps import touch
+
+
+NO_POPULATION = {'total_stocked': 0, 'total_mortality': 0, 'total_harvested': 0, 'current_count': 0}
+
+# Fields filled in by FeedingAdvice.apply_feeding_metrics rather than the analysis
+DERIVED_FIELDS = ['total_biomass_kg', 'recommended_feed_kg', 'feeding_rate_percent', 'daily_feed_cost']
+
+
+def _as_date(value):
+    """Date part of a datetime, as a DateField lookup would compare it"""
+    if timezone.is_aware(value):
+        value = timezone.make_naive(value, timezone.get_default_timezone())
+    return value.date()
+
+
+class FeedingAdviceEngine:
+    """Generate feeding advice for many ponds from preloaded data.
+
+    All queries run in ``__init__``: stocked species, sampling history,
+    population totals, and the 7/30/90-day windows of water samples, daily
+    logs, mortality and feeds. The analysis methods only read those rows, so
+    the number of queries does not grow with the number of ponds or species.
+    """
+
+    def __init__(self, ponds, today=None):
+        self.ponds = list(ponds)
+        pond_ids = [pond.id for pond in self.ponds]
+        self.today = today or timezone.now().date()
+        self.feeding_bands = feeding_band_table()
+        last_7_days = self.today - timedelta(days=7)
+        last_30_days = self.today - timedelta(days=30)
+
+        # Species stocked in each pond
+        self.stocked_species = defaultdict(set)
+        for pond_id, species_id in Stocking.objects.filter(pond_id__in=pond_ids).values_list(
+            'pond_id', 'species_id'
+        ).distinct().order_by():
+            self.stocked_species[pond_id].add(species_id)
+        species_ids = set().union(*self.stocked_species.values())
+        self.species = Species.objects.in_bulk(species_ids)
+
+        # Sampling history per pond/species, oldest first
+        self.samplings = defaultdict(list)
+        for sampling in FishSampling.objects.filter(
+            pond_id__in=pond_ids, species_id__in=species_ids
+        ).only('id', 'pond_id', 'species_id', 'date', 'average_weight_kg').order_by('date'):
+            self.samplings[(sampling.pond_id, sampling.species_id)].append(sampling)
+
+        # Population now and before the 30-day mortality window
+        self.populations = current_populations(pond_ids)
+        self.earlier_populations = current_populations(pond_ids, as_of=self.today - timedelta(days=31))
+
+        # Latest water sample of the last 30 days per pond
+        self.water_samples = {}
+        for sample in Sampling.objects.filter(
+            pond_id__in=pond_ids,
+            sample_type__name__icontains='water',
+            date__gte=last_30_days
+        ).order_by('-date', '-id'):
+            self.water_samples.setdefault(sample.pond_id, sample)
+
+        # Daily logs of the last 7 days per pond, newest first
+        self.daily_logs = defaultdict(list)
+        for log in DailyLog.objects.filter(pond_id__in=pond_ids, date__gte=last_7_days).order_by('-date'):
+            self.daily_logs[log.pond_id].append(log)
+
+        # Mortality of the last 30 days per pond/species
+        self.mortalities = defaultdict(list)
+        for mortality in Mortality.objects.filter(
+            pond_id__in=pond_ids, species_id__in=species_ids, date__gte=last_30_days
+        ).order_by('-date'):
+            self.mortalities[(mortality.pond_id, mortality.species_id)].append(mortality)
+
+        # Feeds of the last 30 days per pond, newest first
+        self.feeds = defaultdict(list)
+        for feed in Feed.objects.filter(
+            pond_id__in=pond_ids, date__gte=last_30_days
+        ).select_related('feed_type').order_by('-date', '-id'):
+            self.feeds[feed.pond_id].append(feed)
+
+        # Last 5 applied advice per pond/species
+        self.applied_advice = defaultdict(list)
+        latest_applied = F('applied_date').desc()
+        for advice in FeedingAdvice.objects.filter(pond_id__in=pond_ids, is_applied=True).annotate(
+            recency=Window(RowNumber(), partition_by=[F('pond_id'), F('species_id')], order_by=latest_applied)
+        ).filter(recency__lte=5).order_by(latest_applied).only('id', 'pond_id', 'species_id', 'applied_date'):
+            self.applied_advice[(advice.pond_id, advice.species_id)].append(advice)
+
+    def combinations(self, pond, species_id=None):
+        """Species stocked in ``pond``, by name, optionally limited to one species"""
+        species = [
+            self.species[stocked_id] for stocked_id in self.stocked_species.get(pond.id, ())
+            if species_id is None or stocked_id == species_id
+        ]
+        return sorted(species, key=lambda item: item.name)
+
+    def has_sampling(self, pond, species):
+        return bool(self.samplings.get((pond.id, species.id)))
+
+    def fish_population(self, pond, species):
+        """Comprehensive fish population analysis"""
+        population = self.populations.get((pond.id, species.id), NO_POPULATION)
+        total_stocked = population['total_stocked']
+        total_mortality = population['total_mortality']
+        total_harvested = population['total_harvested']
+        
+        # Mortality over the last 30 days, from the running total before that window
+        earlier = self.earlier_populations.get((pond.id, species.id), NO_POPULATION)
+        recent_mortality = total_mortality - earlier['total_mortality']
+        
+        # Calculate survival rate
+        survival_rate = 0
+        if total_stocked > 0:
+            survival_rate = ((total_stocked - total_mortality - total_harvested) / total_stocked) * 100
+        
+        # Analyze mortality trends
+        mortality_trend = 'stable'
+        if recent_mortality > 0:
+            avg_daily_mortality = recent_mortality / 30
+            if avg_daily_mortality > (total_stocked * 0.001):  # More than 0.1% daily
+                mortality_trend = 'high'
+            elif avg_daily_mortality < (total_stocked * 0.0001):  # Less than 0.01% daily
+                mortality_trend = 'low'
+        
+        return {
+            'total_stocked': total_stocked,
+            'total_mortality': total_mortality,
+            'recent_mortality_30d': recent_mortality,
+            'total_harvested': total_harvested,
+            'current_count': max(0, total_stocked - total_mortality - total_harvested),
+            'survival_rate': survival_rate,
+            'mortality_trend': mortality_trend
+        }
+    
+    def water_quality(self, pond):
+        """Comprehensive water quality analysis"""
+        water_quality = {
+            'temperature': None,
+            'ph': None,
+            'dissolved_oxygen': None,
+            'turbidity': None,
+            'ammonia': None,
+            'nitrite': None,
+            'quality_score': 0,
+            'quality_status': 'unknown'
+        }
+        
+        # Latest water sample, falling back to the latest daily log
+        latest_sample = self.water_samples.get(pond.id)
+        recent_logs = self.daily_logs.get(pond.id)
+        if latest_sample:
+            water_quality['temperature'] = latest_sample.temperature_c
+            water_quality['ph'] = latest_sample.ph
+            water_quality['dissolved_oxygen'] = latest_sample.dissolved_oxygen
+            water_quality['turbidity'] = latest_sample.turbidity
+            water_quality['ammonia'] = latest_sample.ammonia
+            water_quality['nitrite'] = latest_sample.nitrite
+        elif recent_logs:
+            latest_log = recent_logs[0]
+            water_quality['temperature'] = latest_log.water_temp_c
+            water_quality['ph'] = latest_log.ph
+        
+        # Calculate water quality score (0-100)
+        score = 0
+        if water_quality['temperature']:
+            temp = float(water_quality['temperature'])
+            if 20 <= temp <= 28:  # Optimal range
+                score += 25
+            elif 15 <= temp <= 32:  # Acceptable range
+                score += 15
+        
+        if water_quality['ph']:
+            ph = float(water_quality['ph'])
+            if 6.5 <= ph <= 8.5:  # Optimal range
+                score += 25
+            elif 6.0 <= ph <= 9.0:  # Acceptable range
+                score += 15
+        
+        if water_quality['dissolved_oxygen']:
+            do = float(water_quality['dissolved_oxygen'])
+            if do >= 5:  # Good
+                score += 25
+            elif do >= 3:  # Acceptable
+                score += 15
+        
+        if water_quality['ammonia']:
+            ammonia = float(water_quality['ammonia'])
+            if ammonia <= 0.02:  # Safe
+                score += 25
+            elif ammonia <= 0.05:  # Acceptable
+                score += 15
+        
+        water_quality['quality_score'] = score
+        
+        # Determine quality status
+        if score >= 80:
+            water_quality['quality_status'] = 'excellent'
+        elif score >= 60:
+            water_quality['quality_status'] = 'good'
+        elif score >= 40:
+            water_quality['quality_status'] = 'fair'
+        else:
+            water_quality['quality_status'] = 'poor'
+        
+        return water_quality
+    
+    def mortality_patterns(self, pond, species):
+        """Analyze mortality patterns and causes"""
+        recent_mortality = self.mortalities.get((pond.id, species.id), [])
+        
+        mortality_analysis = {
+            'total_recent_deaths': sum(mortality.count for mortality in recent_mortality),
+            'mortality_events': len(recent_mortality),
+            'avg_deaths_per_event': 0,
+            'mortality_trend': 'stable',
+            'risk_factors': []
+        }
+        
+        if mortality_analysis['mortality_events'] > 0:
+            mortality_analysis['avg_deaths_per_event'] = (
+                mortality_analysis['total_recent_deaths'] / mortality_analysis['mortality_events']
+            )
+        
+        # Analyze mortality causes
+        causes = {}
+        for mortality in recent_mortality:
+            cause = causes.setdefault(mortality.cause, {'cause': mortality.cause, 'total_deaths': 0, 'event_count': 0})
+            cause['total_deaths'] += mortality.count
+            cause['event_count'] += 1
+        
+        mortality_analysis['causes'] = sorted(causes.values(), key=lambda cause: -cause['total_deaths'])
+        
+        # Determine risk factors
+        if mortality_analysis['total_recent_deaths'] > 10:
+            mortality_analysis['risk_factors'].append('high_mortality_rate')
+        
+        if mortality_analysis['mortality_events'] > 5:
+            mortality_analysis['risk_factors'].append('frequent_mortality_events')
+        
+        # Check for disease-related mortality
+        disease_causes = sum(
+            mortality.count for mortality in recent_mortality if 'disease' in mortality.cause.lower()
+        )
+        
+        if disease_causes > 0:
+            mortality_analysis['risk_factors'].append('disease_present')
+        
+        return mortality_analysis
+    
+    def feeding_patterns(self, pond):
+        """Analyze historical feeding patterns and success rates"""
+        # Feed model doesn't have species field, only pond
+        recent_feeds = self.feeds.get(pond.id, [])
+        
+        feeding_analysis = {
+            'total_feed_30d': sum(feed.amount_kg for feed in recent_feeds),
+            'avg_daily_feed': 0,
+            'feeding_consistency': 'unknown',
+            'feed_efficiency': 0,
+            'cost_analysis': {},
+            'feed_types_used': []
+        }
+        
+        if recent_feeds:
+            feeding_analysis['avg_daily_feed'] = feeding_analysis['total_feed_30d'] / 30
+            
+            # Analyze feeding consistency
+            daily_feeds = defaultdict(int)
+            for feed in recent_feeds:
+                daily_feeds[feed.date] += feed.amount_kg
+            
+            if len(daily_feeds) > 5:
+                amounts = [float(total) for total in daily_feeds.values() if total]
+                if amounts:
+                    avg_amount = sum(amounts) / len(amounts)
+                    variance = sum((x - avg_amount) ** 2 for x in amounts) / len(amounts)
+                    std_dev = variance ** 0.5
+                    
+                    if std_dev < avg_amount * 0.2:  # Less than 20% variation
+                        feeding_analysis['feeding_consistency'] = 'very_consistent'
+                    elif std_dev < avg_amount * 0.4:  # Less than 40% variation
+                        feeding_analysis['feeding_consistency'] = 'consistent'
+                    else:
+                        feeding_analysis['feeding_consistency'] = 'inconsistent'
+            
+            # Analyze feed types
+            feed_types = {}
+            for feed in recent_feeds:
+                name = feed.feed_type.name
+                feed_type = feed_types.setdefault(name, {'feed_type__name': name, 'total_amount': 0, 'usage_count': 0})
+                feed_type['total_amount'] += feed.amount_kg
+                feed_type['usage_count'] += 1
+            
+            feeding_analysis['feed_types_used'] = sorted(
+                feed_types.values(), key=lambda feed_type: -feed_type['total_amount']
+            )
+            
+            # Calculate feed conversion ratio if possible
+            # This would require harvest data to be meaningful
+        
+        return feeding_analysis
+    
+    def environmental_factors(self, pond):
+        """Analyze environmental and seasonal factors"""
+        # Determine season
+        current_month = self.today.month
+        if current_month in [12, 1, 2]:
+            season = 'winter'
+        elif current_month in [3, 4, 5]:
+            season = 'spring'
+        elif current_month in [6, 7, 8]:
+            season = 'summer'
+        else:
+            season = 'autumn'
+        
+        environmental_analysis = {
+            'season': season,
+            'temperature_trend': 'stable',
+            'weather_conditions': 'normal',
+            'seasonal_factors': []
+        }
+        
+        # Analyze temperature trends from the recent daily logs
+        temps = [log.water_temp_c for log in self.daily_logs.get(pond.id, []) if log.water_temp_c]
+        if len(temps) > 1:
+            temp_change = temps[0] - temps[-1]
+            if temp_change > 2:
+                environmental_analysis['temperature_trend'] = 'warming'
+            elif temp_change < -2:
+                environmental_analysis['temperature_trend'] = 'cooling'
+        
+        # Add seasonal factors
+        if season == 'winter':
+            environmental_analysis['seasonal_factors'].extend(['low_metabolism', 'reduced_appetite'])
+        elif season == 'summer':
+            environmental_analysis['seasonal_factors'].extend(['high_metabolism', 'increased_appetite'])
+        
+        return environmental_analysis
+    
+    def growth_patterns(self, pond, species):
+        """Analyze fish growth patterns and trends"""
+        since = self.today - timedelta(days=90)
+        recent_samplings = [
+            sampling for sampling in self.samplings.get((pond.id, species.id), []) if sampling.date >= since
+        ]
+        
+        growth_analysis = {
+            'growth_rate_kg_per_day': 0,
+            'growth_trend': 'stable',
+            'weight_gain_90d': 0,
+            'growth_consistency': 'unknown',
+            'growth_quality': 'normal'
+        }
+        
+        if len(recent_samplings) >= 2:
+            first_sampling = recent_samplings[0]
+            last_sampling = recent_samplings[-1]
+            
+            days_diff = (last_sampling.date - first_sampling.date).days
+            if days_diff > 0:
+                weight_gain = float(last_sampling.average_weight_kg) - float(first_sampling.average_weight_kg)
+                growth_analysis['weight_gain_90d'] = weight_gain
+                growth_analysis['growth_rate_kg_per_day'] = weight_gain / days_diff
+                
+                # Determine growth trend
+                if growth_analysis['growth_rate_kg_per_day'] > 0.02:  # > 20g/day
+                    growth_analysis['growth_trend'] = 'excellent'
+                    growth_analysis['growth_quality'] = 'excellent'
+                elif growth_analysis['growth_rate_kg_per_day'] > 0.01:  # > 10g/day
+                    growth_analysis['growth_trend'] = 'good'
+                    growth_analysis['growth_quality'] = 'good'
+                elif growth_analysis['growth_rate_kg_per_day'] > 0.005:  # > 5g/day
+                    growth_analysis['growth_trend'] = 'normal'
+                    growth_analysis['growth_quality'] = 'normal'
+                else:
+                    growth_analysis['growth_trend'] = 'slow'
+                    growth_analysis['growth_quality'] = 'poor'
+        
+        return growth_analysis
+    
+    def feeding_history(self, pond):
+        """Analyze feeding history to recommend optimal feed type and cost"""
+        recent_feeds = self.feeds.get(pond.id)
+        if not recent_feeds:
+            return None
+        
+        # Analyze feed types by performance
+        feed_type_performance = {}
+        for feed in recent_feeds:
+            feed_type_id = feed.feed_type_id
+            if feed_type_id not in feed_type_performance:
+                feed_type_performance[feed_type_id] = {
+                    'feed_type': feed.feed_type,
+                    'total_usage': 0,
+                    'avg_cost_per_kg': 0,
+                    'usage_count': 0,
+                    'recent_usage': 0
+                }
+            
+            feed_type_performance[feed_type_id]['total_usage'] += float(feed.amount_kg or 0)
+            feed_type_performance[feed_type_id]['usage_count'] += 1
+            
+            # Calculate cost per kg
+            if feed.cost_per_kg:
+                cost_per_kg = float(feed.cost_per_kg)
+            elif feed.cost_per_packet and feed.packet_size_kg:
+                cost_per_kg = float(feed.cost_per_packet) / float(feed.packet_size_kg)
+            else:
+                cost_per_kg = 0
+            
+            if cost_per_kg > 0:
+                current_avg = feed_type_performance[feed_type_id]['avg_cost_per_kg']
+                count = feed_type_performance[feed_type_id]['usage_count']
+                feed_type_performance[feed_type_id]['avg_cost_per_kg'] = (
+                    (current_avg * (count - 1) + cost_per_kg) / count
+                )
+            
+            # Check if used recently (last 7 days)
+            if feed.date >= self.today - timedelta(days=7):
+                feed_type_performance[feed_type_id]['recent_usage'] += 1
+        
+        # Sort by recent usage first, then by total usage
+        best_feed_data = max(
+            feed_type_performance.values(),
+            key=lambda performance: (performance['recent_usage'], performance['total_usage'])
+        )
+        
+        result = {'feed_type': best_feed_data['feed_type'].id}
+        if best_feed_data['avg_cost_per_kg'] > 0:
+            result['feed_cost_per_kg'] = best_feed_data['avg_cost_per_kg']
+        
+        return result
+    
+    def applied_advice_history(self, pond, species, current_base_rate):
+        """Analyze previously applied advice to improve recommendations"""
+        applied_advice = self.applied_advice.get((pond.id, species.id))
+        if not applied_advice:
+            return None
+        
+        # Analyze the effectiveness of previous advice
+        rate_adjustments = []
+        feed_adjustments = []
+        samplings = self.samplings.get((pond.id, species.id), [])
+        
+        for advice in applied_advice:
+            if advice.applied_date is None:
+                continue
+            
+            # Next 3 fish samplings after this advice was applied
+            applied_on = _as_date(advice.applied_date)
+            post_advice_samplings = [sampling for sampling in samplings if sampling.date > applied_on][:3]
+            
+            if len(post_advice_samplings) >= 2:
+                # Calculate growth rate after advice
+                first_sampling = post_advice_samplings[0]
+                last_sampling = post_advice_samplings[-1]
+                
+                days_diff = (last_sampling.date - first_sampling.date).days
+                if days_diff > 0:
+                    weight_growth = float(last_sampling.average_weight_kg) - float(first_sampling.average_weight_kg)
+                    growth_rate = weight_growth / days_diff
+                    
+                    # Expected growth rate (industry standard: 0.01-0.02 kg/day for good growth)
+                    expected_growth = 0.015  # 1.5g per day average
+                    
+                    if growth_rate > expected_growth * 1.2:  # Excellent growth
+                        # Previous advice worked well, consider similar rate
+                        rate_adjustments.append(1.1)  # Slight increase
+                        feed_adjustments.append(1.05)
+                    elif growth_rate < expected_growth * 0.8:  # Poor growth
+                        # Previous advice may have been too aggressive
+                        rate_adjustments.append(0.9)  # Slight decrease
+                        feed_adjustments.append(0.95)
+                    else:  # Normal growth
+                        rate_adjustments.append(1.0)  # No change
+                        feed_adjustments.append(1.0)
+        
+        # Calculate average adjustments
+        if rate_adjustments:
+            avg_rate_adjustment = sum(rate_adjustments) / len(rate_adjustments)
+            avg_feed_adjustment = sum(feed_adjustments) / len(feed_adjustments)
+            
+            return {
+                'final_rate': current_base_rate * avg_rate_adjustment,
+                'learning_applied': True,
+                'historical_analysis': {
+                    'previous_advice_count': len(applied_advice),
+                    'rate_adjustment_factor': avg_rate_adjustment,
+                    'feed_adjustment_factor': avg_feed_adjustment
+                }
+            }
+        
+        return None
+    
+    def advice_data(self, pond, species):
+        """Comprehensive feeding advice based on all available data, or None without samplings"""
+        samplings = self.samplings.get((pond.id, species.id))
+        if not samplings:
+            return None
+        latest_sampling = samplings[-1]
+        
+        fish_count_analysis = self.fish_population(pond, species)
+        estimated_fish_count = fish_count_analysis['current_count']
+        water_quality_analysis = self.water_quality(pond)
+        mortality_analysis = self.mortality_patterns(pond, species)
+        feeding_analysis = self.feeding_patterns(pond)
+        environmental_analysis = self.environmental_factors(pond)
+        growth_analysis = self.growth_patterns(pond, species)
+        
+        feeding_recommendations = calculate_feeding_recommendations(
+            estimated_fish_count,
+            latest_sampling,
+            water_quality_analysis,
+            mortality_analysis,
+            feeding_analysis,
+            environmental_analysis,
+            growth_analysis
+        )
+        
+        # Enhanced feed type and cost analysis
+        feed_analysis = self.feeding_history(pond)
+        if feed_analysis:
+            feeding_recommendations.update(feed_analysis)
+        
+        # Learning from previously applied advice
+        advice_learning = self.applied_advice_history(pond, species, feeding_recommendations['base_rate'])
+        if advice_learning:
+            feeding_recommendations.update(advice_learning)
+        
+        advice_data = {
+            'pond': pond.id,
+            'species': species.id,
+            'date': self.today,
+            'estimated_fish_count': estimated_fish_count,
+            'average_fish_weight_kg': latest_sampling.average_weight_kg,
+            'total_biomass_kg': estimated_fish_count * float(latest_sampling.average_weight_kg),
+            'recommended_feed_kg': feeding_recommendations['recommended_feed_kg'],
+            'feeding_rate_percent': feeding_recommendations['final_rate'],
+            'feeding_frequency': feeding_recommendations['feeding_frequency'],
+            'water_temp_c': water_quality_analysis.get('temperature'),
+            'season': environmental_analysis['season'],
+            'notes': generate_comprehensive_notes(
+                pond, species, fish_count_analysis, water_quality_analysis,
+                mortality_analysis, feeding_analysis, environmental_analysis,
+                growth_analysis, feeding_recommendations
+            )
+        }
+        
+        # Calculate daily feed cost with enhanced cost data
+        if feeding_recommendations.get('feed_cost_per_kg'):
+            advice_data['daily_feed_cost'] = feeding_recommendations['recommended_feed_kg'] * float(feeding_recommendations['feed_cost_per_kg'])
+        
+        # Add all analysis data for transparency
+        advice_data['analysis_data'] = {
+            'fish_count_analysis': fish_count_analysis,
+            'water_quality_analysis': water_quality_analysis,
+            'mortality_analysis': mortality_analysis,
+            'feeding_analysis': feeding_analysis,
+            'environmental_analysis': environmental_analysis,
+            'growth_analysis': growth_analysis,
+            'feeding_recommendations': feeding_recommendations
+        }
+        
+        return advice_data
+    
+    def build(self, pond, species, user):
+        """Unsaved FeedingAdvice for a pond/species, or None without samplings.
+        
+        Only the analysis inputs are stored; biomass, rate, feed amount and cost
+        are derived the same way ``FeedingAdvice.save`` derives them. Raises
+        ``ValidationError`` for inputs the model would reject and ``ValueError``
+        when there is no biomass left to feed.
+        """
+        data = self.advice_data(pond, species)
+        if data is None:
+            return None
+        
+        advice = FeedingAdvice(
+            pond=pond,
+            species=species,
+            user=user,
+            date=data['date'],
+            estimated_fish_count=data['estimated_fish_count'],
+            average_fish_weight_kg=data['average_fish_weight_kg'],
+            feeding_frequency=data['feeding_frequency'],
+            water_temp_c=data['water_temp_c'],
+            season=data['season'],
+            notes=data['notes'],
+        )
+        advice.clean_fields(exclude=['pond', 'species', 'user', 'feed_type'] + DERIVED_FIELDS)
+        advice.apply_feeding_metrics(self.feeding_bands.find)
+        if advice.total_biomass_kg is None:
+            raise ValueError('no fish remaining to feed')
+        return advice
+    
+    def save(self, advices, update_existing=False):
+        """Write advice rows in bulk; returns ``(created, updated)``.
+        
+        With ``update_existing`` advice for a pond/species that already has
+        advice on the same date overwrites that row instead of adding one.
+        """
+        existing = {}
+        if update_existing and advices:
+            for advice_id, pond_id, species_id, date in FeedingAdvice.objects.filter(
+                pond_id__in={advice.pond_id for advice in advices},
+                date__in={advice.date for advice in advices}
+            ).order_by('id').values_list('id', 'pond_id', 'species_id', 'date'):
+                existing.setdefault((pond_id, species_id, date), advice_id)
+        
+        created = []
+        updated = []
+        now = timezone.now()
+        for advice in advices:
+            advice.pk = existing.get((advice.pond_id, advice.species_id, advice.date))
+            if advice.pk is None:
+                created.append(advice)
+            else:
+                advice.updated_at = now
+                updated.append(advice)
+        
+        FeedingAdvice.objects.bulk_create(created, batch_size=500)
+        if updated:
+            fields = [
+                field.name for field in FeedingAdvice._meta.concrete_fields
+                if not field.primary_key and field.name != 'created_at'
+            ]
+            FeedingAdvice.objects.bulk_update(updated, fields, batch_size=500)
+        # Bulk writes send no signals
+        for user_id in {advice.user_id for advice in advices}:
+            touch(FeedingAdvice, user_id)
+        return created, updated
+
+
+def get_feeding_frequency(avg_weight_g):
+    """Determine feeding frequency based on fish size using scientific feeding stages"""
+    feeding_stage = get_feeding_stage(avg_weight_g)
+    return feeding_stage['feeding_frequency']
+
+
+def calculate_feeding_adjustments(water_quality, mortality, growth, environmental, feeding):
+    """Calculate feeding adjustments based on environmental and health factors"""
+    adjustments = {
+        'water_quality': 0,
+        'temperature': 0,
+        'mortality': 0,
+        'growth': 0,
+        'seasonal': 0,
+        'feeding_consistency': 0,
+        'total_adjustment': 0
+    }
+    
+    # Water quality adjustments
+    if water_quality['quality_status'] == 'poor':
+        adjustments['water_quality'] = -20  # Reduce feeding in poor water quality
+    elif water_quality['quality_status'] == 'excellent':
+        adjustments['water_quality'] = 5   # Slight increase in excellent conditions
+    
+    # Temperature adjustments
+    if water_quality['temperature']:
+        temp = float(water_quality['temperature'])
+        if temp < 15:
+            adjustments['temperature'] = -50  # Significantly reduce in cold water
+        elif temp < 20:
+            adjustments['temperature'] = -20  # Reduce in cool water
+        elif temp < 26:
+            adjustments['temperature'] = -10  # Slight reduction below optimal
+        elif temp > 30:
+            adjustments['temperature'] = -20  # Reduce in very warm water
+        elif temp > 35:
+            adjustments['temperature'] = -40  # Significantly reduce in hot water
+    
+    # Mortality adjustments
+    if 'high_mortality_rate' in mortality['risk_factors']:
+        adjustments['mortality'] = -20  # Reduce feeding if high mortality
+    if 'disease_present' in mortality['risk_factors']:
+        adjustments['mortality'] = -30  # Further reduce if disease present
+    
+    # Growth pattern adjustments
+    if growth['growth_quality'] == 'excellent':
+        adjustments['growth'] = 10  # Slight increase for excellent growth
+    elif growth['growth_quality'] == 'poor':
+        adjustments['growth'] = -10  # Slight decrease for poor growth
+    
+    # Seasonal adjustments
+    if environmental['season'] == 'winter':
+        adjustments['seasonal'] = -40  # Significant reduction in winter
+    elif environmental['season'] == 'summer':
+        adjustments['seasonal'] = 10  # Increase in summer
+    
+    # Feeding consistency adjustments
+    if feeding['feeding_consistency'] == 'inconsistent':
+        adjustments['feeding_consistency'] = -10  # Slight reduction for inconsistent feeding
+    
+    # Calculate total adjustment (clamp between -50% and +30%)
+    adjustments['total_adjustment'] = sum([
+        adjustments['water_quality'],
+        adjustments['temperature'],
+        adjustments['mortality'],
+        adjustments['growth'],
+        adjustments['seasonal'],
+        adjustments['feeding_consistency']
+    ])
+    
+    # Clamp total adjustment to reasonable range
+    adjustments['total_adjustment'] = max(-50, min(30, adjustments['total_adjustment']))
+    
+    return adjustments
+
+
+def calculate_feeding_recommendations(fish_count, latest_sampling, water_quality,
+                                      mortality, feeding, environmental, growth):
+    """Calculate feeding recommendations using scientific formulas based on %BW/day"""
+    
+    # Get fish weight in grams
+    avg_weight_g = float(latest_sampling.average_weight_kg) * 1000
+    
+    # Get feeding stage and %BW/day from scientific feeding table
+    feeding_stage = get_feeding_stage(avg_weight_g)
+    base_rate = feeding_stage['percent_bw_per_day']
+    protein_requirement = feeding_stage['protein_percent']
+    pellet_size = feeding_stage['pellet_size']
+    
+    # Core formula: Daily feed (kg) = (Number of fish × Average weight (g) ÷ 1000) × (%BW/day ÷ 100)
+    total_biomass_kg = (fish_count * avg_weight_g) / 1000
+    base_daily_feed_kg = total_biomass_kg * (base_rate / 100)
+    
+    # Apply environmental and condition adjustments (±10-30%)
+    adjustments = calculate_feeding_adjustments(
+        water_quality, mortality, growth, environmental, feeding
+    )
+    
+    # Calculate final feeding rate with adjustments
+    adjustment_factor = 1 + (adjustments['total_adjustment'] / 100)
+    final_rate = base_rate * adjustment_factor
+    final_daily_feed_kg = base_daily_feed_kg * adjustment_factor
+    
+    # Determine feeding frequency based on fish size
+    feeding_frequency = get_feeding_frequency(avg_weight_g)
+    
+    return {
+        'base_rate': base_rate,
+        'final_rate': round(final_rate, 2),
+        'recommended_feed_kg': round(final_daily_feed_kg, 2),
+        'feeding_frequency': feeding_frequency,
+        'protein_requirement': protein_requirement,
+        'pellet_size': pellet_size,
+        'feeding_stage': feeding_stage['stage_name'],
+        'adjustments': adjustments,
+        'total_biomass_kg': round(total_biomass_kg, 2),
+        'base_daily_feed_kg': round(base_daily_feed_kg, 2)
+    }
+
+
+def generate_comprehensive_notes(pond, species, fish_analysis, water_quality,
+                                 mortality, feeding, environmental, growth, recommendations):
+    """Generate detailed notes explaining the recommendations"""
+    
+    # A pond harvested or died out has no fish to average over
+    current_count = fish_analysis.get('current_count', 0)
+    if current_count:
+        average_weight = f"{float(recommendations.get('total_biomass_kg', 0) / current_count) * 1000:.1f} g average"
+    else:
+        average_weight = "Not available (no fish remaining)"
+    
+    notes = [
+        f"=== SCIENTIFIC FEEDING ADVICE FOR {species.name.upper()} IN {pond.name.upper()} ===",
+        f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}",
+        "",
+        "📊 SCIENTIFIC FEEDING STAGE ANALYSIS:",
+        f"• Current Stage: {recommendations.get('feeding_stage', 'Unknown')}",
+        f"• Fish Weight: {average_weight}",
+        f"• Pieces per kg: {recommendations.get('pcs_per_kg', 'N/A')}",
+        f"• Protein Requirement: {recommendations.get('protein_requirement', 'N/A')}%",
+        f"• Recommended Pellet Size: {recommendations.get('pellet_size', 'N/A')}",
+        f"• Feeding Frequency: {recommendations.get('feeding_frequency', 'N/A')} times per day",
+        f"• Feeding Times: {recommendations.get('feeding_times', 'N/A')}",
+        f"• Feeding Split: {recommendations.get('feeding_split', 'N/A')}",
+        "",
+        "🧮 DAILY FEEDING CALCULATION:",
+        f"• Formula: Daily feed (kg) = (Fish count × Avg weight (g) ÷ 1000) × (%BW/day ÷ 100)",
+        f"• Fish Count: {fish_analysis.get('current_count', 0):,} fish",
+        f"• Total Biomass: {recommendations.get('total_biomass_kg', 0):.2f} kg",
+        f"• Base %BW/day: {recommendations.get('base_rate', 0):.1f}%",
+        f"• Base Daily Feed: {recommendations.get('base_daily_feed_kg', 0):.2f} kg",
+        f"• Final %BW/day: {recommendations.get('final_rate', 0):.1f}% (after adjustments)",
+        f"• Final Daily Feed: {recommendations.get('recommended_feed_kg', 0):.2f} kg",
+        f"• Feeding Frequency: {recommendations.get('feeding_frequency', 2)} times per day",
+        "",
+        "⚖️ FEEDING ADJUSTMENTS:",
+        f"• Water Quality: {recommendations.get('adjustments', {}).get('water_quality', 0):+.0f}%",
+        f"• Temperature: {recommendations.get('adjustments', {}).get('temperature', 0):+.0f}%",
+        f"• Mortality Risk: {recommendations.get('adjustments', {}).get('mortality', 0):+.0f}%",
+        f"• Growth Quality: {recommendations.get('adjustments', {}).get('growth', 0):+.0f}%",
+        f"• Seasonal: {recommendations.get('adjustments', {}).get('seasonal', 0):+.0f}%",
+        f"• Feeding Consistency: {recommendations.get('adjustments', {}).get('feeding_consistency', 0):+.0f}%",
+        f"• Total Adjustment: {recommendations.get('adjustments', {}).get('total_adjustment', 0):+.0f}%",
+        "",
+        "=== FISH POPULATION ANALYSIS ===",
+        f"Current fish count: {fish_analysis['current_count']:,}",
+        f"Survival rate: {fish_analysis['survival_rate']:.1f}%",
+        f"Mortality trend: {fish_analysis['mortality_trend']}",
+        "",
+        "=== WATER QUALITY ANALYSIS ===",
+        f"Quality status: {water_quality['quality_status'].upper()} (Score: {water_quality['quality_score']}/100)",
+        f"Temperature: {water_quality['temperature']}°C" if water_quality['temperature'] else "Temperature: Not available",
+        f"pH: {water_quality['ph']}" if water_quality['ph'] else "pH: Not available",
+        f"Dissolved Oxygen: {water_quality['dissolved_oxygen']} mg/L" if water_quality['dissolved_oxygen'] else "Dissolved Oxygen: Not available",
+        "",
+        "=== MORTALITY ANALYSIS ===",
+        f"Recent deaths (30d): {mortality['total_recent_deaths']}",
+        f"Mortality events: {mortality['mortality_events']}",
+        f"Risk factors: {', '.join(mortality['risk_factors']) if mortality['risk_factors'] else 'None identified'}",
+        "",
+        "=== FEEDING PATTERN ANALYSIS ===",
+        f"Average daily feed (30d): {feeding['avg_daily_feed']:.2f} kg",
+        f"Feeding consistency: {feeding['feeding_consistency']}",
+        f"Feed types used: {len(feeding['feed_types_used'])}",
+        "",
+        "=== GROWTH ANALYSIS ===",
+        f"Growth rate: {growth['growth_rate_kg_per_day']:.4f} kg/day",
+        f"Growth trend: {growth['growth_trend']}",
+        f"Growth quality: {growth['growth_quality']}",
+        "",
+        "=== ENVIRONMENTAL FACTORS ===",
+        f"Season: {environmental['season'].title()}",
+        f"Temperature trend: {environmental['temperature_trend']}",
+        f"Seasonal factors: {', '.join(environmental['seasonal_factors'])}",
+        "",
+        "=== RECOMMENDATIONS ===",
+        f"Recommended feeding rate: {recommendations['final_rate']:.1f}% of biomass",
+        f"Daily feed amount: {recommendations['recommended_feed_kg']:.2f} kg",
+        f"Feeding frequency: {recommendations['feeding_frequency']} times per day",
+        "",
+        "=== ADJUSTMENT FACTORS APPLIED ===",
+        f"Water quality impact: {recommendations['adjustments']['water_quality']:+.0f}%",
+        f"Temperature impact: {recommendations['adjustments']['temperature']:+.0f}%",
+        f"Mortality risk level: {recommendations['adjustments']['mortality']:+.0f}%",
+        f"Growth quality: {recommendations['adjustments']['growth']:+.0f}%",
+        f"Seasonal impact: {recommendations['adjustments']['seasonal']:+.0f}%",
+        f"Total adjustment: {recommendations['adjustments']['total_adjustment']:+.0f}%",
+    ]
+    
+    return '\n'.join(notes)
@@ -0,0 +1,217 @@
+"""Server-side aggregates for the analytics dashboard.
+
+Every figure is computed in SQL: totals with ``aggregate`` and time series
+grouped by day, week or month, so the payload depends on the requested range
+rather than on how much history a farm has.
+"""
+from datetime import timedelta
+
+from django.db.models import Avg, Case, Count, ExpressionWrapper, F, FloatField, Q, Sum, When
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+
+from .db import latest_per_group
+from .models import Alert, Expense, Feed, Harvest, Income, KPIDashboard, Mortality, Pond, Sampling, Species, Stocking
+
+
+TIME_RANGES = {'7d': 7, '30d': 30, '90d': 90, '1y': 365}
+DEFAULT_TIME_RANGE = '30d'
+INTERVALS = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+RECENT_ACTIVITY_LIMIT = 10
+
+# Series columns and the aggregate behind each one, per source model
+SERIES = {
+    Stocking: {'stocked': Sum('pcs')},
+    Feed: {'feed_kg': Sum('amount_kg'), 'feed_cost': Sum('total_cost')},
+    Harvest: {'harvested_kg': Sum('total_weight_kg'), 'revenue': Sum('total_revenue')},
+    Mortality: {'mortality': Sum('count')},
+    Expense: {'expenses': Sum('amount')},
+    Income: {'income': Sum('amount')},
+}
+SERIES_FIELDS = [field for aggregates in SERIES.values() for field in aggregates]
+
+# Everything the analytics response reads, for its HTTP validators
+ANALYTICS_MODELS = set(SERIES) | {Pond, Species, Sampling, Alert, KPIDashboard}
+
+
+def resolve_range(start_date=None, end_date=None, time_range=None, today=None):
+    """Return ``(start, end)``; explicit dates win over a ``7d``/``30d``/``90d``/``1y`` range"""
+    if start_date or end_date:
+        return start_date, end_date
+    days = TIME_RANGES[time_range or DEFAULT_TIME_RANGE]
+    return today - timedelta(days=days), today
+
+
+def default_interval(start_date, end_date):
+    """Daily buckets for a month, weekly for half a year, monthly beyond"""
+    if start_date is None or end_date is None:
+        return 'month'
+    days = (end_date - start_date).days
+    if days <= 31:
+        return 'day'
+    if days <= 183:
+        return 'week'
+    return 'month'
+
+
+def _to_float(value):
+    return float(value) if value is not None else 0.0
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else 0.0
+
+
+def _percent_of_feed(biomass):
+    """Feed amount as a percentage of ``biomass`` (a field reference or a number)"""
+    return ExpressionWrapper(F('amount_kg') * 100.0 / biomass, output_field=FloatField())
+
+
+class FarmAnalytics:
+    """Aggregates for one user's farm, optionally one pond, over a date range."""
+
+    def __init__(self, user, pond_id=None, start_date=None, end_date=None, interval=None):
+        self.user = user
+        self.pond_id = pond_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.interval = interval or default_interval(start_date, end_date)
+
+    def records(self, model, date_field='date'):
+        """Rows of ``model`` owned by the user, limited to the pond and date range"""
+        if model in (Expense, Income):
+            queryset = model.objects.filter(user=self.user)
+        else:
+            queryset = model.objects.filter(pond__user=self.user)
+        if self.pond_id:
+            queryset = queryset.filter(pond_id=self.pond_id)
+        if self.start_date:
+            queryset = queryset.filter(**{f'{date_field}__gte': self.start_date})
+        if self.end_date:
+            queryset = queryset.filter(**{f'{date_field}__lte': self.end_date})
+        return queryset.order_by()
+
+    def series(self):
+        """One row per period that has records, with every ``SERIES_FIELDS`` value, oldest first"""
+        trunc = INTERVALS[self.interval]
+        periods = {}
+        for model, aggregates in SERIES.items():
+            rows = self.records(model).annotate(period=trunc('date')).values('period').annotate(**aggregates)
+            for row in rows:
+                period = periods.setdefault(row['period'], dict.fromkeys(SERIES_FIELDS, 0.0))
+                for field in aggregates:
+                    period[field] = _to_float(row[field])
+        return [
+            {'period': period.isoformat(), **values}
+            for period, values in sorted(periods.items())
+        ]
+
+    def feeding(self, stocked_biomass_kg):
+        """Feed averages; feeding rate falls back to the stocked biomass like the dashboard did"""
+        rate_cases = [
+            When(feeding_rate_percent__gt=0, then=F('feeding_rate_percent')),
+            When(biomass_at_feeding_kg__gt=0, amount_kg__gt=0, then=_percent_of_feed(F('biomass_at_feeding_kg'))),
+        ]
+        if stocked_biomass_kg > 0:
+            rate_cases.append(When(amount_kg__gt=0, then=_percent_of_feed(stocked_biomass_kg)))
+        return self.records(Feed).aggregate(
+            records=Count('id'),
+            avg_cost_per_kg=Avg('cost_per_kg'),
+            avg_feeding_rate=Avg(Case(*rate_cases, default=None, output_field=FloatField())),
+            daily_consumption=Avg(Coalesce('consumption_rate_kg_per_day', 'amount_kg')),
+        )
+
+    def kpis(self):
+        """Growth KPIs read from the materialized daily ``KPIDashboard`` rows.
+
+        ``latest`` sums each pond's most recent row in the range; ``series``
+        averages the rows per period, with biomass as the mean daily farm total.
+        """
+        rows = self.records(KPIDashboard)
+        latest = latest_per_group(rows, ['pond_id'], ['-date'])
+        snapshot = {'ponds': 0, 'date': None, 'total_biomass_kg': 0.0}
+        weights = []
+        for row in latest:
+            snapshot['ponds'] += 1
+            snapshot['date'] = max(snapshot['date'] or row.date, row.date)
+            snapshot['total_biomass_kg'] += _to_float(row.total_biomass_kg)
+            if row.avg_weight_g is not None:
+                weights.append(float(row.avg_weight_g))
+        snapshot['date'] = snapshot['date'].isoformat() if snapshot['date'] else None
+        snapshot['avg_weight_g'] = _ratio(sum(weights), len(weights))
+
+        periods = rows.annotate(period=INTERVALS[self.interval]('date')).values('period').annotate(
+            biomass_kg=ExpressionWrapper(Sum('total_biomass_kg') * 1.0 / Count('date', distinct=True), output_field=FloatField()),
+            avg_weight_g=Avg('avg_weight_g'),
+            survival_rate_percent=Avg('survival_rate_percent'),
+            fcr=Avg('feed_conversion_ratio'),
+        ).order_by('period')
+        series = [
+            {
+                'period': row['period'].isoformat(),
+                **{field: _to_float(row[field]) for field in ('biomass_kg', 'avg_weight_g', 'survival_rate_percent', 'fcr')},
+            }
+            for row in periods
+        ]
+        return {'latest': snapshot, 'series': series}
+
+    def build(self):
+        ponds = Pond.objects.filter(user=self.user).aggregate(
+            total=Count('id'), active=Count('id', filter=Q(is_active=True))
+        )
+        series = self.series()
+        totals = {field: sum(row[field] for row in series) for field in SERIES_FIELDS}
+
+        stocked_biomass_kg = _to_float(self.records(Stocking).aggregate(
+            total=Sum(F('pcs') * F('initial_avg_weight_kg'))
+        )['total'])
+        feeding = self.feeding(stocked_biomass_kg)
+
+        water = self.records(Sampling).aggregate(
+            samples=Count('id'),
+            avg_temperature_c=Avg('temperature_c'),
+            avg_dissolved_oxygen=Avg('dissolved_oxygen'),
+            avg_ph=Avg('ph'),
+        )
+        alerts = self.records(Alert, date_field='created_at__date').aggregate(
+            total=Count('id'), active=Count('id', filter=Q(is_resolved=False))
+        )
+
+        net_profit = totals['income'] - totals['expenses']
+        return {
+            'filters': {
+                'pond': self.pond_id,
+                'start_date': self.start_date.isoformat() if self.start_date else None,
+                'end_date': self.end_date.isoformat() if self.end_date else None,
+                'interval': self.interval,
+            },
+            'ponds': ponds,
+            'totals': {
+                'total_stocked': int(totals['stocked']),
+                'stocked_biomass_kg': stocked_biomass_kg,
+                'total_harvested_kg': totals['harvested_kg'],
+                'total_revenue': totals['revenue'],
+                'total_expenses': totals['expenses'],
+                'total_income': totals['income'],
+                'net_profit': net_profit,
+                'profit_margin': _ratio(net_profit, totals['income']) * 100,
+                'total_feed_kg': totals['feed_kg'],
+                'total_feed_cost': totals['feed_cost'],
+                'feed_records': feeding['records'],
+                'avg_feed_cost_per_kg': _to_float(feeding['avg_cost_per_kg']),
+                'avg_feeding_rate': _to_float(feeding['avg_feeding_rate']),
+                'daily_feed_consumption': _to_float(feeding['daily_consumption']),
+                'fcr': _ratio(totals['feed_kg'], totals['harvested_kg']),
+                'total_mortality': int(totals['mortality']),
+                'survival_rate': _ratio(totals['stocked'] - totals['mortality'], totals['stocked']) * 100,
+                'total_alerts': alerts['total'],
+                'active_alerts': alerts['active'],
+            },
+            'water_quality': {
+                'samples': water['samples'],
+                'avg_temperature_c': _to_float(water['avg_temperature_c']),
+                'avg_dissolved_oxygen': _to_float(water['avg_dissolved_oxygen']),
+                'avg_ph': _to_float(water['avg_ph']),
+            },
+            'series': series,
+            'kpis': self.kpis(),
+        }
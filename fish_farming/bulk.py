@@ -0,0 +1,302 @@
+"""Bulk creation of high-volume records.
+
+Posting a day of feeds or samplings one request at a time costs an ownership
+query, related-row lookups and a ``save()`` with its signal handlers per row.
+A ``bulk`` request instead validates every row against related rows loaded
+once, fills the derived fields in one pass, inserts everything with
+``bulk_create`` in one transaction and then runs the side effects the signal
+handlers would have run (population ledger, growth rates, KPI refresh, change
+stamps) once per pond.
+
+A batch is all-or-nothing: when any row is invalid nothing is written and the
+errors are reported per row index.
+"""
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .growth import GrowthRateEngine, growth_state
+from .instrumentation import timed_serializer
+from .kpis import KPI_SOURCE_MODELS, schedule_refresh
+from .models import DailyLog, Feed, FishSampling, Mortality, Pond, Sampling, Stocking
+from .population import movement_of, record_movement
+from .serializers import (
+    DailyLogSerializer, FeedSerializer, FishSamplingSerializer,
+    MortalitySerializer, SamplingSerializer,
+)
+from .stamps import touch
+
+
+BULK_MAX_ROWS = 5000
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves ids from the rows in ``context['preloaded']`` instead of a query per value"""
+
+    def to_internal_value(self, data):
+        rows = self.context.get('preloaded', {}).get(self.field_name)
+        if rows is None:
+            return super().to_internal_value(data)
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in rows:
+            self.fail('does_not_exist', pk_value=data)
+        return rows[pk]
+
+
+def latest_weights(pond_ids):
+    """Latest sampling and latest stocking per ``(pond_id, species_id)``, as ``Mortality.save`` looks them up"""
+    latest_sampling = {}
+    for sampling in FishSampling.objects.filter(pond_id__in=pond_ids).only(
+        'pond_id', 'species_id', 'date', 'average_weight_kg'
+    ).order_by('date'):
+        latest_sampling[(sampling.pond_id, sampling.species_id)] = sampling
+    latest_stocking = {}
+    for stocking in Stocking.objects.filter(pond_id__in=pond_ids).only(
+        'stocking_id', 'pond_id', 'species_id', 'date', 'initial_avg_weight_kg'
+    ).order_by('date'):
+        latest_stocking[(stocking.pond_id, stocking.species_id)] = stocking
+    return latest_sampling, latest_stocking
+
+
+class BulkCreate:
+    """Validate and insert many rows of ``model`` for one user.
+
+    Subclasses set ``model`` and ``serializer_class`` and fill derived fields
+    in ``prepare``. Models with a unique key set ``unique_fields``; existing
+    keys are errors unless ``upsert`` is set, in which case those rows are
+    overwritten and every row must fill all of its key fields.
+    """
+    model = None
+    serializer_class = None
+    unique_fields = None
+    # Fields the serializer does not take that the request supplies
+    owner_fields = ()
+
+    def __init__(self, user, upsert=False):
+        self.user = user
+        self.upsert = upsert and self.unique_fields is not None
+        # Keys of the batch that are already stored
+        self.existing = set()
+
+    def get_serializer(self, rows):
+        class Serializer(self.serializer_class):
+            serializer_related_field = PreloadedPrimaryKeyRelatedField
+
+            def get_validators(self):
+                # Unique keys are checked for the whole batch in ``check_unique``
+                return []
+
+        child = Serializer()
+        context = {'preloaded': self.preload(child, rows)}
+        return timed_serializer(Serializer(data=rows, many=True, context=context))
+
+    def scope(self, queryset):
+        """Rows a related field may point to; ponds are limited to the user's own"""
+        if queryset.model is Pond:
+            return queryset.filter(user=self.user)
+        return queryset
+
+    def preload(self, child, rows):
+        """``{field name: {pk: row}}`` for every writable relation, one query per field"""
+        preloaded = {}
+        for name, field in child.fields.items():
+            if field.read_only or not isinstance(field, PreloadedPrimaryKeyRelatedField):
+                continue
+            ids = {
+                int(row[name]) for row in rows
+                if isinstance(row, dict) and str(row.get(name, '')).isdigit()
+            }
+            preloaded[name] = self.scope(field.get_queryset()).in_bulk(ids)
+        return preloaded
+
+    def key(self, instance):
+        return tuple(getattr(instance, self.model._meta.get_field(field).attname) for field in self.unique_fields)
+
+    def check_unique(self, instances):
+        """Per-row errors for keys repeated in the batch or, without ``upsert``, already stored"""
+        errors = {}
+        seen = {}
+        for index, instance in enumerate(instances):
+            key = self.key(instance)
+            # Keys with an empty part never conflict in the database, so an
+            # upsert of one would insert a duplicate instead of overwriting
+            if None in key:
+                if self.upsert:
+                    missing = [field for field, part in zip(self.unique_fields, key) if part is None]
+                    errors[index] = {field: ['This field is required to upsert.'] for field in missing}
+                continue
+            if key in seen:
+                errors[index] = {'non_field_errors': [f'Duplicates row {seen[key]} of this batch.']}
+            else:
+                seen[key] = index
+
+        if seen:
+            attnames = [self.model._meta.get_field(field).attname for field in self.unique_fields]
+            stored = self.model.objects.filter(**{
+                f'{attname}__in': {key[position] for key in seen}
+                for position, attname in enumerate(attnames)
+            }).values_list(*attnames)
+            self.existing = set(stored) & set(seen)
+        if not self.upsert:
+            fields = ', '.join(self.unique_fields)
+            for key in self.existing:
+                errors.setdefault(seen[key], {'non_field_errors': [f'A record with this {fields} already exists.']})
+        return errors
+
+    def prepare(self, instances):
+        """Fill derived fields before insert"""
+
+    def after_insert(self, instances):
+        """Run the side effects of the inserted rows' signal handlers"""
+        first_dates = {}
+        for instance in instances:
+            if instance.pond_id not in first_dates or instance.date < first_dates[instance.pond_id]:
+                first_dates[instance.pond_id] = instance.date
+        if self.model in KPI_SOURCE_MODELS:
+            for pond_id, since in first_dates.items():
+                schedule_refresh(pond_id, since)
+        touch(self.model, self.user.pk)
+        transaction.on_commit(lambda: touch(self.model, self.user.pk), robust=True)
+
+    def run(self, rows):
+        """Insert ``rows``; returns ``(result, errors)`` with ``errors`` as ``[{'index', 'errors'}]``"""
+        serializer = self.get_serializer(rows)
+        if not serializer.is_valid():
+            return None, [
+                {'index': index, 'errors': row_errors}
+                for index, row_errors in enumerate(serializer.errors) if row_errors
+            ]
+
+        owner = {field: self.user for field in self.owner_fields}
+        instances = [self.model(**attrs, **owner) for attrs in serializer.validated_data]
+        errors = self.check_unique(instances) if self.unique_fields else {}
+        if errors:
+            return None, [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
+
+        self.prepare(instances)
+        options = {}
+        if self.upsert:
+            options = {
+                'update_conflicts': True,
+                'unique_fields': self.unique_fields,
+                'update_fields': [
+                    field.name for field in self.model._meta.concrete_fields
+                    if not field.primary_key and field.name not in self.unique_fields and field.name != 'created_at'
+                ],
+            }
+        with transaction.atomic():
+            created = self.model.objects.bulk_create(instances, batch_size=500, **options)
+            self.after_insert(created)
+
+        updated = len(self.existing)
+        return {
+            'created': len(created) - updated,
+            'updated': updated,
+            'ids': [instance.pk for instance in created],
+        }, None
+
+
+class FeedBulkCreate(BulkCreate):
+    model = Feed
+    serializer_class = FeedSerializer
+
+    def prepare(self, instances):
+        for instance in instances:
+            instance.calculate_derived_fields()
+
+
+class DailyLogBulkCreate(BulkCreate):
+    model = DailyLog
+    serializer_class = DailyLogSerializer
+    unique_fields = ['pond', 'date']
+
+
+class SamplingBulkCreate(BulkCreate):
+    model = Sampling
+    serializer_class = SamplingSerializer
+
+
+class MortalityBulkCreate(BulkCreate):
+    model = Mortality
+    serializer_class = MortalitySerializer
+
+    def prepare(self, instances):
+        latest_sampling, latest_stocking = latest_weights({instance.pond_id for instance in instances})
+        for instance in instances:
+            if not instance.avg_weight_kg and instance.species_id:
+                key = (instance.pond_id, instance.species_id)
+                instance.apply_default_weight(latest_sampling.get(key), latest_stocking.get(key))
+            instance.calculate_total_weight()
+
+    def after_insert(self, instances):
+        # One ledger movement per pond, species and date, as the signal handler records per row
+        movements = {}
+        for instance in instances:
+            pond_id, species_id, date, field, count = movement_of(instance)
+            key = (pond_id, species_id, date, field)
+            movements[key] = movements.get(key, 0) + count
+        for (pond_id, species_id, date, field), count in sorted(
+            movements.items(), key=lambda item: (item[0][0], item[0][1] or 0, item[0][2])
+        ):
+            record_movement(pond_id, species_id, date, field, count)
+        super().after_insert(instances)
+
+
+class FishSamplingBulkCreate(BulkCreate):
+    model = FishSampling
+    serializer_class = FishSamplingSerializer
+    unique_fields = ['pond', 'species', 'date']
+    owner_fields = ('user',)
+
+    def prepare(self, instances):
+        for instance in instances:
+            instance.calculate_derived_metrics()
+
+    def after_insert(self, instances):
+        # New samplings become the previous sampling of later ones
+        engine = GrowthRateEngine({instance.pond_id for instance in instances})
+        targets = {instance.pk for instance in instances}
+        for instance in instances:
+            targets |= engine.dependents(instance.pk, *growth_state(instance))
+        engine.save(engine.changed_rows(targets))
+        super().after_insert(instances)
+
+
+class BulkCreateMixin:
+    """``POST <list>/bulk/`` taking a JSON array of rows; ``?upsert=true`` overwrites existing keys"""
+    bulk_create_class = None
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        try:
+            rows = request.data
+            if not isinstance(rows, list) or not rows:
+                return Response({
+                    'error': 'Request body must be a non-empty array of records'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if len(rows) > BULK_MAX_ROWS:
+                return Response({
+                    'error': f'At most {BULK_MAX_ROWS} records can be created at once'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            upsert = request.query_params.get('upsert', '').lower() in ('1', 'true', 'yes')
+            result, errors = self.bulk_create_class(request.user, upsert=upsert).run(rows)
+            if errors:
+                return Response({
+                    'error': f'{len(errors)} of {len(rows)} records are invalid; nothing was saved',
+                    'errors': errors,
+                }, status=status.HTTP_400_BAD_REQUEST)
+            return Response(result, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            return Response({
+                'error': f'Failed to create records: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+
+
+@register()
+def check_report_cache(app_configs, **kwargs):
+    """Change stamps must live in a cache every worker process shares"""
+    alias = getattr(settings, 'REPORT_CACHE_ALIAS', 'default')
+    if not isinstance(caches[alias], LocMemCache):
+        return []
+    return [Warning(
+        f'REPORT_CACHE_ALIAS "{alias}" is a local-memory cache, which each worker process keeps to itself.',
+        hint='With more than one worker, writes in one process leave stale cached reports, wrong 304 '
+             'responses and stale feeding bands in the others. Use a file, Redis or Memcached cache.',
+        id='fish_farming.W001',
+    )]
@@ -0,0 +1,103 @@
+"""Conditional GET for API responses.
+
+The ``ETag`` of a response hashes the user, today's date, the full request
+path, the rendered media type and the stamps (``stamps.py``) of every model the
+response reads; ``Last-Modified`` is the newest of those stamps, rounded up
+to the whole second HTTP dates carry. Both are known from one cache lookup,
+so a request with a matching ``If-None-Match`` or ``If-Modified-Since`` gets
+a ``304`` before the view runs a query or a serializer.
+
+While that second has not passed, another write could land in it without
+moving ``Last-Modified``, so such responses carry only the ``ETag``.
+"""
+import hashlib
+import json
+import time
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+
+from .stamps import get_stamps
+
+
+def related_models(queryset):
+    """The model of ``queryset`` and the models it ``select_related``s"""
+    models = {queryset.model}
+
+    def walk(model, related):
+        for name, nested in related.items():
+            field = model._meta.get_field(name)
+            models.add(field.related_model)
+            if isinstance(nested, dict):
+                walk(field.related_model, nested)
+
+    if isinstance(queryset.query.select_related, dict):
+        walk(queryset.model, queryset.query.select_related)
+    return models
+
+
+def validators(request, models):
+    """``(etag, last_modified)`` for the user's view of ``models`` at this URL.
+
+    ``last_modified`` is ``None`` until the second after the newest stamp.
+    """
+    stamps = get_stamps(models, request.user.pk)
+    renderer = getattr(request, 'accepted_renderer', None)
+    fingerprint = json.dumps([
+        request.user.pk,
+        # Relative date ranges and "as of today" reports move with the date
+        timezone.localdate().isoformat(),
+        request.get_full_path(),
+        getattr(renderer, 'media_type', None),
+        sorted(stamps.items()),
+    ])
+    etag = f'"{hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()}"'
+    last_modified = -(-max(stamps.values()) // 1_000_000_000)
+    if last_modified * 1_000_000_000 > time.time_ns():
+        return etag, None
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Let browsers keep the body but revalidate it on every request
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_get(request, models, view):
+    """Answer ``304`` from the validators of ``models``, otherwise run ``view()`` and tag a 200 response"""
+    if request.method not in ('GET', 'HEAD'):
+        return view()
+    etag, last_modified = validators(request, models)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return set_validators(not_modified, etag, last_modified)
+    response = view()
+    if response.status_code == status.HTTP_200_OK:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """``ETag``/``Last-Modified`` and ``304`` responses for ``list`` and ``retrieve``.
+
+    The validators cover the viewset's model and the models its ``queryset``
+    selects related; override ``conditional_models`` when the serializer
+    reads more.
+    """
+
+    def conditional_models(self):
+        return related_models(self.queryset)
+
+    def list(self, request, *args, **kwargs):
+        view = super().list
+        return conditional_get(request, self.conditional_models(), lambda: view(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        view = super().retrieve
+        return conditional_get(request, self.conditional_models(), lambda: view(request, *args, **kwargs))
@@ -0,0 +1,30 @@
+"""Query helpers with backend-specific fast paths."""
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def _expression(field):
+    """``'-date'`` -> ``F('date').desc()``"""
+    if field.startswith('-'):
+        return F(field[1:]).desc()
+    return F(field).asc()
+
+
+def latest_per_group(queryset, partition, order_by):
+    """The first row of ``queryset`` per ``partition`` when sorted by ``order_by``.
+
+    On PostgreSQL this is ``DISTINCT ON``, which reads each group's rows once
+    in index order. Other backends number the rows with a window function and
+    keep the first of each group. Either way it is one query; do not reorder
+    the result, since ``DISTINCT ON`` requires its fields to lead the ordering.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        return queryset.order_by(*partition, *order_by).distinct(*partition)
+    return queryset.annotate(
+        recency=Window(
+            RowNumber(),
+            partition_by=[F(field) for field in partition],
+            order_by=[_expression(field) for field in order_by],
+        )
+    ).filter(recency=1)
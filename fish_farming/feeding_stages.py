@@ -0,0 +1,431 @@
+"""Feeding-stage and feeding-band lookups.
+
+The scientific feeding table and the ``FeedingBand`` rows are compiled once
+per process into sorted breakpoints, so finding the stage or band for a fish
+weight is a binary search rather than an ``elif`` chain or a database query.
+The band table stays in process memory, keyed on the shared FeedingBand
+change stamp (``stamps.py``). A write in this process drops it at once; a
+write in another process moves the stamp, which each process compares at
+most once per ``STAMP_CHECK_INTERVAL`` seconds. Lookups in between, inside
+transactions or not, touch neither the database nor the cache.
+"""
+import time
+from bisect import bisect_left
+from types import MappingProxyType
+
+
+# Scientific feeding table: upper weight bound in grams (inclusive) and the
+# stage for fish up to that weight
+SCIENTIFIC_FEEDING_STAGES = (
+    # Starter: 3000→1000 (0.33→1 g) - 28-20% BW/day
+    (0.33, {
+        'stage_name': 'Starter (3000 pcs/kg)',
+        'percent_bw_per_day': 28.0,
+        'protein_percent': 40,
+        'pellet_size': '0.5-0.8 mm',
+        'pcs_per_kg': 3000,
+        'feeding_frequency': 6,
+        'feeding_times': '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30',
+        'feeding_split': '20•20•15•15•15•15%'
+    }),
+    (0.67, {
+        'stage_name': 'Starter (1500 pcs/kg)',
+        'percent_bw_per_day': 24.0,
+        'protein_percent': 40,
+        'pellet_size': '0.5-0.8 mm',
+        'pcs_per_kg': 1500,
+        'feeding_frequency': 6,
+        'feeding_times': '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30',
+        'feeding_split': '20•20•15•15•15•15%'
+    }),
+    (1.0, {
+        'stage_name': 'Starter (1000 pcs/kg)',
+        'percent_bw_per_day': 20.0,
+        'protein_percent': 40,
+        'pellet_size': '0.5-0.8 mm',
+        'pcs_per_kg': 1000,
+        'feeding_frequency': 6,
+        'feeding_times': '7:30 • 9:30 • 11:30 • 13:30 • 15:30 • 17:30',
+        'feeding_split': '20•20•15•15•15•15%'
+    }),
+
+    # Nursery-1: 1000→200 (1→5 g) - 18-14% BW/day
+    (2.0, {
+        'stage_name': 'Nursery-1 (500 pcs/kg)',
+        'percent_bw_per_day': 18.0,
+        'protein_percent': 38,
+        'pellet_size': '0.8-1.2 mm',
+        'pcs_per_kg': 500,
+        'feeding_frequency': 5,
+        'feeding_times': '7:30 • 10:00 • 12:30 • 15:00 • 17:30',
+        'feeding_split': '25•20•20•20•15%'
+    }),
+    (5.0, {
+        'stage_name': 'Nursery-1 (200 pcs/kg)',
+        'percent_bw_per_day': 14.0,
+        'protein_percent': 38,
+        'pellet_size': '0.8-1.2 mm',
+        'pcs_per_kg': 200,
+        'feeding_frequency': 5,
+        'feeding_times': '7:30 • 10:00 • 12:30 • 15:00 • 17:30',
+        'feeding_split': '25•20•20•20•15%'
+    }),
+
+    # Nursery-2: 200→100 (5→10 g) - 11-9% BW/day
+    (6.7, {
+        'stage_name': 'Nursery-2 (150 pcs/kg)',
+        'percent_bw_per_day': 11.0,
+        'protein_percent': 36,
+        'pellet_size': '1.2-1.5 mm',
+        'pcs_per_kg': 150,
+        'feeding_frequency': 4,
+        'feeding_times': '8:00 • 11:00 • 14:00 • 17:00',
+        'feeding_split': '30•25•25•20%'
+    }),
+    (10.0, {
+        'stage_name': 'Nursery-2 (100 pcs/kg)',
+        'percent_bw_per_day': 9.0,
+        'protein_percent': 36,
+        'pellet_size': '1.2-1.5 mm',
+        'pcs_per_kg': 100,
+        'feeding_frequency': 4,
+        'feeding_times': '8:00 • 11:00 • 14:00 • 17:00',
+        'feeding_split': '30•25•25•20%'
+    }),
+
+    # Grower-1: 100→40 (10→25 g) - 7-5.5% BW/day
+    (12.5, {
+        'stage_name': 'Grower-1 (80 pcs/kg)',
+        'percent_bw_per_day': 7.0,
+        'protein_percent': 34,
+        'pellet_size': '1.5-2.0 mm',
+        'pcs_per_kg': 80,
+        'feeding_frequency': 4,
+        'feeding_times': '8:00 • 11:00 • 14:30 • 17:30',
+        'feeding_split': '30•25•25•20%'
+    }),
+    (25.0, {
+        'stage_name': 'Grower-1 (40 pcs/kg)',
+        'percent_bw_per_day': 5.5,
+        'protein_percent': 34,
+        'pellet_size': '1.5-2.0 mm',
+        'pcs_per_kg': 40,
+        'feeding_frequency': 4,
+        'feeding_times': '8:00 • 11:00 • 14:30 • 17:30',
+        'feeding_split': '30•25•25•20%'
+    }),
+
+    # Grower-2: 40→20 (25→50 g) - 4.8-3.8% BW/day
+    (33.0, {
+        'stage_name': 'Grower-2 (30 pcs/kg)',
+        'percent_bw_per_day': 4.8,
+        'protein_percent': 32,
+        'pellet_size': '2.0-2.5 mm',
+        'pcs_per_kg': 30,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+    (50.0, {
+        'stage_name': 'Grower-2 (20 pcs/kg)',
+        'percent_bw_per_day': 3.8,
+        'protein_percent': 32,
+        'pellet_size': '2.0-2.5 mm',
+        'pcs_per_kg': 20,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+
+    # Grower-3: 20→10 (50→100 g) - 3.6-2.8% BW/day
+    (67.0, {
+        'stage_name': 'Grower-3 (15 pcs/kg)',
+        'percent_bw_per_day': 3.6,
+        'protein_percent': 30,
+        'pellet_size': '2.5-3.0 mm',
+        'pcs_per_kg': 15,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+    (100.0, {
+        'stage_name': 'Grower-3 (10 pcs/kg)',
+        'percent_bw_per_day': 2.8,
+        'protein_percent': 30,
+        'pellet_size': '2.5-3.0 mm',
+        'pcs_per_kg': 10,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+
+    # Grower-4: 10→6 (100→167 g) - 2.6-2.2% BW/day
+    (125.0, {
+        'stage_name': 'Grower-4 (8 pcs/kg)',
+        'percent_bw_per_day': 2.6,
+        'protein_percent': 30,
+        'pellet_size': '3.0 mm',
+        'pcs_per_kg': 8,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+    (167.0, {
+        'stage_name': 'Grower-4 (6 pcs/kg)',
+        'percent_bw_per_day': 2.2,
+        'protein_percent': 30,
+        'pellet_size': '3.0 mm',
+        'pcs_per_kg': 6,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+
+    # Grower-5: 6→4 (167→250 g) - 2.1-1.9% BW/day
+    (200.0, {
+        'stage_name': 'Grower-5 (5 pcs/kg)',
+        'percent_bw_per_day': 2.1,
+        'protein_percent': 30,
+        'pellet_size': '3.0-3.5 mm',
+        'pcs_per_kg': 5,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+    (250.0, {
+        'stage_name': 'Grower-5 (4 pcs/kg)',
+        'percent_bw_per_day': 1.9,
+        'protein_percent': 30,
+        'pellet_size': '3.0-3.5 mm',
+        'pcs_per_kg': 4,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+
+    # Grower-6: 4→3 (250→333 g) - 1.9-1.7% BW/day
+    (300.0, {
+        'stage_name': 'Grower-6 (3.3 pcs/kg)',
+        'percent_bw_per_day': 1.9,
+        'protein_percent': 30,
+        'pellet_size': '3.5 mm',
+        'pcs_per_kg': 3.3,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+    (333.0, {
+        'stage_name': 'Grower-6 (3 pcs/kg)',
+        'percent_bw_per_day': 1.7,
+        'protein_percent': 30,
+        'pellet_size': '3.5 mm',
+        'pcs_per_kg': 3,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+
+    # Grower-7: 3→2 (333→500 g) - 1.7-1.5% BW/day
+    (400.0, {
+        'stage_name': 'Grower-7 (2.5 pcs/kg)',
+        'percent_bw_per_day': 1.7,
+        'protein_percent': 30,
+        'pellet_size': '3.5-4.0 mm',
+        'pcs_per_kg': 2.5,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+    (500.0, {
+        'stage_name': 'Grower-7 (2 pcs/kg)',
+        'percent_bw_per_day': 1.5,
+        'protein_percent': 30,
+        'pellet_size': '3.5-4.0 mm',
+        'pcs_per_kg': 2,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+
+    # Grower-8: 2→1.5 (500→667 g) - 1.5-1.3% BW/day
+    (600.0, {
+        'stage_name': 'Grower-8 (1.7 pcs/kg)',
+        'percent_bw_per_day': 1.5,
+        'protein_percent': 30,
+        'pellet_size': '4.0 mm',
+        'pcs_per_kg': 1.7,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+    (667.0, {
+        'stage_name': 'Grower-8 (1.5 pcs/kg)',
+        'percent_bw_per_day': 1.3,
+        'protein_percent': 30,
+        'pellet_size': '4.0 mm',
+        'pcs_per_kg': 1.5,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+
+    # Grower-9: 1.5→1 (667→1000 g) - 1.3-1.1% BW/day
+    (800.0, {
+        'stage_name': 'Grower-9 (1.25 pcs/kg)',
+        'percent_bw_per_day': 1.3,
+        'protein_percent': 30,
+        'pellet_size': '4.0-4.5 mm',
+        'pcs_per_kg': 1.25,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+    (1000.0, {
+        'stage_name': 'Grower-9 (1 pcs/kg)',
+        'percent_bw_per_day': 1.1,
+        'protein_percent': 30,
+        'pellet_size': '4.0-4.5 mm',
+        'pcs_per_kg': 1,
+        'feeding_frequency': 3,
+        'feeding_times': '8:00 • 12:30 • 17:00',
+        'feeding_split': '40•30•30%'
+    }),
+
+    # Finisher-1: 1→0.75 (1.0→1.5 kg) - 1.1-1.0% BW/day
+    (1250.0, {
+        'stage_name': 'Finisher-1 (0.8 pcs/kg)',
+        'percent_bw_per_day': 1.1,
+        'protein_percent': 28,
+        'pellet_size': '4.5-5.0 mm',
+        'pcs_per_kg': 0.8,
+        'feeding_frequency': 2,
+        'feeding_times': '8:30 • 16:30',
+        'feeding_split': '60•40%'
+    }),
+    (1500.0, {
+        'stage_name': 'Finisher-1 (0.67 pcs/kg)',
+        'percent_bw_per_day': 1.0,
+        'protein_percent': 28,
+        'pellet_size': '4.5-5.0 mm',
+        'pcs_per_kg': 0.67,
+        'feeding_frequency': 2,
+        'feeding_times': '8:30 • 16:30',
+        'feeding_split': '60•40%'
+    }),
+
+    # Finisher-2: 0.75→0.5 (1.5→2.0 kg) - 1.0-0.9% BW/day
+    (1750.0, {
+        'stage_name': 'Finisher-2 (0.57 pcs/kg)',
+        'percent_bw_per_day': 1.0,
+        'protein_percent': 26,
+        'pellet_size': '5.0 mm',
+        'pcs_per_kg': 0.57,
+        'feeding_frequency': 2,
+        'feeding_times': '8:30 • 16:30',
+        'feeding_split': '60•40%'
+    }),
+    # > 1750g (0.5 pcs/kg)
+    (float('inf'), {
+        'stage_name': 'Finisher-2 (0.5 pcs/kg)',
+        'percent_bw_per_day': 0.9,
+        'protein_percent': 26,
+        'pellet_size': '5.0 mm',
+        'pcs_per_kg': 0.5,
+        'feeding_frequency': 2,
+        'feeding_times': '8:30 • 16:30',
+        'feeding_split': '60•40%'
+    }),
+)
+
+_STAGE_BOUNDS = tuple(bound for bound, _ in SCIENTIFIC_FEEDING_STAGES)
+_STAGES = tuple(MappingProxyType(stage) for _, stage in SCIENTIFIC_FEEDING_STAGES)
+
+
+def get_feeding_stage(avg_weight_g):
+    """Get feeding stage information based on fish weight using scientific feeding table"""
+    return _STAGES[bisect_left(_STAGE_BOUNDS, avg_weight_g)]
+
+
+class FeedingBandTable:
+    """Binary-search view of a set of FeedingBand rows.
+
+    Answers the same question as ``FeedingBand.objects.filter(min_weight_g__lte=w,
+    max_weight_g__gte=w).first()``: the matching band with the lowest
+    ``min_weight_g``. Bands may overlap, so the answer is precomputed for every
+    band edge and for the gap above each edge.
+    """
+
+    def __init__(self, bands):
+        bands = sorted(bands, key=lambda band: (band.min_weight_g, band.pk))
+        self.edges = sorted({band.min_weight_g for band in bands} | {band.max_weight_g for band in bands})
+        # Band matching exactly at each edge
+        self.at_edge = [
+            next((band for band in bands if band.min_weight_g <= edge <= band.max_weight_g), None)
+            for edge in self.edges
+        ]
+        # Band matching strictly between the previous edge and this one
+        self.below_edge = [None] + [
+            next((band for band in bands if band.min_weight_g <= lower and band.max_weight_g >= upper), None)
+            for lower, upper in zip(self.edges, self.edges[1:])
+        ]
+
+    def find(self, avg_weight_g):
+        index = bisect_left(self.edges, avg_weight_g)
+        if index == len(self.edges):
+            return None
+        if self.edges[index] == avg_weight_g:
+            return self.at_edge[index]
+        return self.below_edge[index]
+
+
+# Seconds a process keeps its band table before comparing the shared stamp again
+STAMP_CHECK_INTERVAL = 1.0
+
+# (FeedingBand stamp the table was built at, monotonic time of the last comparison, table)
+_band_table = (None, 0.0, None)
+
+
+def feeding_band_table():
+    """The FeedingBand table, rebuilt when the bands changed in any process"""
+    global _band_table
+    from django.db import connection
+    from .models import FeedingBand
+    from .stamps import get_stamps
+    if connection.in_atomic_block and getattr(connection, 'feeding_bands_written', None) is connection.atomic_blocks[0]:
+        # Its own uncommitted bands must not outlive a rollback, so they are never kept
+        return FeedingBandTable(FeedingBand.objects.all())
+    stamp, checked_at, table = _band_table
+    now = time.monotonic()
+    if table is not None and now - checked_at < STAMP_CHECK_INTERVAL:
+        return table
+    current = get_stamps({FeedingBand}, None)[FeedingBand._meta.label_lower]
+    if table is None or current != stamp:
+        # A write landing while the rows load moves the stamp again, so the next check reloads
+        table = FeedingBandTable(FeedingBand.objects.all())
+    _band_table = (current, now, table)
+    return table
+
+
+def forget_feeding_bands():
+    """Drop the table after a FeedingBand write in this process.
+
+    Inside a transaction the writer sees its own rows until it commits; the
+    table is dropped again on commit so no process-wide copy predates it.
+    """
+    global _band_table
+    from django.db import connection, transaction
+    _band_table = (None, 0.0, None)
+    if connection.in_atomic_block:
+        connection.feeding_bands_written = connection.atomic_blocks[0]
+
+        def committed():
+            global _band_table
+            connection.feeding_bands_written = None
+            _band_table = (None, 0.0, None)
+
+        transaction.on_commit(committed)
+
+
+def find_feeding_band(avg_weight_g):
+    """Find the appropriate feeding band for a fish weight in grams"""
+    return feeding_band_table().find(avg_weight_g)
@@ -0,0 +1,68 @@
+"""Financial summaries built from grouped aggregates.
+
+Expenses and income are each summed once per category and once per calendar
+month, so a summary is four queries whatever the number of records.
+"""
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+
+TREND_MONTHS = 12
+
+
+def shift_month(month_start, months):
+    """First day of the month ``months`` after (or before, if negative) ``month_start``"""
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def _by_category(queryset, category_field):
+    rows = queryset.order_by().values(category_field).annotate(total=Sum('amount'))
+    return {row[category_field]: row['total'] or Decimal('0') for row in rows}
+
+
+def _by_month(queryset, first_month, end_month):
+    rows = queryset.filter(date__gte=first_month, date__lt=end_month).order_by().annotate(
+        month=TruncMonth('date')
+    ).values('month').annotate(total=Sum('amount'))
+    return {row['month']: row['total'] or Decimal('0') for row in rows}
+
+
+def financial_summary(expenses, incomes, today, months=TREND_MONTHS):
+    """Totals, category breakdowns and calendar-month trends for the given records.
+
+    ``monthly_trends`` covers the ``months`` months up to and including the
+    one containing ``today``, newest first, with empty months as zero.
+    """
+    expenses_by_category = _by_category(expenses, 'expense_type__category')
+    income_by_category = _by_category(incomes, 'income_type__category')
+    total_expenses = sum(expenses_by_category.values(), Decimal('0'))
+    total_income = sum(income_by_category.values(), Decimal('0'))
+
+    current_month = today.replace(day=1)
+    first_month = shift_month(current_month, -(months - 1))
+    end_month = shift_month(current_month, 1)
+    monthly_expenses = _by_month(expenses, first_month, end_month)
+    monthly_income = _by_month(incomes, first_month, end_month)
+
+    monthly_trends = {}
+    for i in range(months):
+        month = shift_month(current_month, -i)
+        month_expenses = monthly_expenses.get(month, Decimal('0'))
+        month_income = monthly_income.get(month, Decimal('0'))
+        monthly_trends[month.strftime('%Y-%m')] = {
+            'expenses': float(month_expenses),
+            'income': float(month_income),
+            'profit_loss': float(month_income - month_expenses)
+        }
+
+    return {
+        'total_expenses': total_expenses,
+        'total_income': total_income,
+        'profit_loss': total_income - total_expenses,
+        'expenses_by_category': {k: float(v) for k, v in expenses_by_category.items()},
+        'income_by_category': {k: float(v) for k, v in income_by_category.items()},
+        'monthly_trends': monthly_trends
+    }
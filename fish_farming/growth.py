@@ -0,0 +1,194 @@
+"""Set-based recomputation of FishSampling growth metrics.
+
+``FishSampling.calculate_growth_rate`` resolves the previous sampling, the
+latest stocking and the current fish count with separate queries for every
+row. The engine below loads all of that for a set of ponds up front, walks
+the samplings in date order and writes only the rows whose values changed.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from itertools import groupby
+
+from django.db.backends.utils import format_number
+from django.utils import timezone
+
+from .models import FishSampling, Stocking
+from .population import current_populations
+from .stamps import touch
+
+
+GROWTH_FIELDS = ['growth_rate_kg_per_day', 'biomass_difference_kg']
+
+
+def _as_stored(value, field_name):
+    """Round a computed value the same way the database column stores it"""
+    if value is None:
+        return None
+    field = FishSampling._meta.get_field(field_name)
+    return Decimal(format_number(value, field.max_digits, field.decimal_places))
+
+
+class GrowthRateEngine:
+    """Recompute growth rate and biomass difference for whole ponds at once.
+
+    Loads every sampling, stocking and ledger population of the given ponds in a
+    fixed number of queries. ``previous_sampling`` follows the same rules as the
+    model method: the latest earlier sampling of the same species, falling back
+    to the latest earlier sampling of any species. Samplings on the same date
+    are ordered by id.
+    """
+
+    def __init__(self, pond_ids):
+        self.pond_ids = list(pond_ids)
+
+        self.samplings = defaultdict(list)
+        for sampling in FishSampling.objects.filter(pond_id__in=self.pond_ids).order_by('pond_id', 'date', 'id'):
+            self.samplings[sampling.pond_id].append(sampling)
+
+        # Latest stocking per pond/species and per pond (any species)
+        self.latest_stocking = {}
+        self.latest_pond_stocking = {}
+        stockings = Stocking.objects.filter(pond_id__in=self.pond_ids).only(
+            'stocking_id', 'pond_id', 'species_id', 'date', 'pcs', 'total_weight_kg'
+        ).order_by('date', 'stocking_id')
+        for stocking in stockings:
+            self.latest_stocking[(stocking.pond_id, stocking.species_id)] = stocking
+            self.latest_pond_stocking[stocking.pond_id] = stocking
+
+        # Pond-wide totals (species None) include rows recorded without a species
+        self.populations = current_populations(self.pond_ids)
+
+    @property
+    def sampling_count(self):
+        return sum(len(rows) for rows in self.samplings.values())
+
+    def fish_count(self, pond_id, species_id=None):
+        """Current alive fish (stocked - mortality - harvested), never negative"""
+        totals = self.populations.get((pond_id, species_id))
+        return totals['current_count'] if totals else 0
+
+    def walk(self, pond_id, rows=None):
+        """Yield ``(sampling, previous_sampling)`` for a pond in date order"""
+        if rows is None:
+            rows = self.samplings[pond_id]
+        latest_by_species = {}
+        latest_any = None
+        for _, same_day in groupby(rows, key=lambda sampling: sampling.date):
+            same_day = list(same_day)
+            for sampling in same_day:
+                previous = None
+                if sampling.species_id is not None:
+                    previous = latest_by_species.get(sampling.species_id)
+                yield sampling, previous or latest_any
+            for sampling in same_day:
+                if sampling.species_id is not None:
+                    latest_by_species[sampling.species_id] = sampling
+                latest_any = sampling
+
+    def dependents(self, sampling_id, pond_id, date, species_id):
+        """Ids of the samplings whose previous sampling is ``sampling_id``.
+
+        The row is evaluated at the given position, so the state from before an
+        edit (or of a deleted row) can be checked against the current data. At
+        most the next sampling of the same species and the samplings on the
+        next date that fall back to "any species" can depend on it.
+        """
+        rows = [sampling for sampling in self.samplings[pond_id] if sampling.id != sampling_id]
+        rows.append(FishSampling(id=sampling_id, pond_id=pond_id, date=date, species_id=species_id))
+        rows.sort(key=lambda sampling: (sampling.date, sampling.id))
+        return {
+            sampling.id
+            for sampling, previous in self.walk(pond_id, rows)
+            if previous is not None and previous.id == sampling_id
+        }
+
+    def compute(self, sampling, previous_sampling):
+        """Return ``(growth_rate_kg_per_day, biomass_difference_kg)`` as stored in the DB"""
+        latest_stocking = None
+        if not previous_sampling:
+            if sampling.species_id is not None:
+                latest_stocking = self.latest_stocking.get((sampling.pond_id, sampling.species_id))
+            else:
+                latest_stocking = self.latest_pond_stocking.get(sampling.pond_id)
+
+        # Work on a detached copy so the loaded row keeps its stored values
+        probe = FishSampling(
+            pond_id=sampling.pond_id,
+            species_id=sampling.species_id,
+            date=sampling.date,
+            average_weight_kg=sampling.average_weight_kg,
+        )
+        probe.apply_growth_metrics(
+            previous_sampling,
+            latest_stocking,
+            lambda: self.fish_count(sampling.pond_id, sampling.species_id),
+        )
+        return (
+            _as_stored(probe.growth_rate_kg_per_day, 'growth_rate_kg_per_day'),
+            _as_stored(probe.biomass_difference_kg, 'biomass_difference_kg'),
+        )
+
+    def changed_rows(self, targets=None):
+        """Recompute ``targets`` (ids, default all) and return the rows that changed"""
+        changed = []
+        now = timezone.now()
+        for pond_id in self.pond_ids:
+            for sampling, previous in self.walk(pond_id):
+                if targets is not None and sampling.id not in targets:
+                    continue
+                growth_rate, biomass_difference = self.compute(sampling, previous)
+                if (growth_rate, biomass_difference) != (sampling.growth_rate_kg_per_day, sampling.biomass_difference_kg):
+                    sampling.growth_rate_kg_per_day = growth_rate
+                    sampling.biomass_difference_kg = biomass_difference
+                    sampling.updated_at = now
+                    changed.append(sampling)
+        return changed
+
+    def save(self, rows):
+        if rows:
+            FishSampling.objects.bulk_update(rows, GROWTH_FIELDS + ['updated_at'], batch_size=500)
+            # Bulk writes send no signals
+            for user_id in {row.user_id for row in rows}:
+                touch(FishSampling, user_id)
+        return rows
+
+
+def recalculate_growth_rates(pond_ids, species_id=None):
+    """Recompute growth metrics for every sampling in ``pond_ids``.
+
+    ``species_id`` limits which rows are written; earlier samplings of other
+    species are still considered as the previous sampling. Returns the engine
+    and the list of rows that were updated.
+    """
+    engine = GrowthRateEngine(pond_ids)
+    targets = None
+    if species_id is not None:
+        targets = {
+            sampling.id
+            for rows in engine.samplings.values()
+            for sampling in rows
+            if sampling.species_id == species_id
+        }
+    return engine, engine.save(engine.changed_rows(targets))
+
+
+def growth_state(sampling):
+    """The fields that decide which samplings follow ``sampling``"""
+    return (sampling.pond_id, sampling.date, sampling.species_id)
+
+
+def cascade_growth_rates(sampling_id, before=None, after=None):
+    """Recompute only the samplings whose previous sampling changed.
+
+    ``before`` and ``after`` are the ``growth_state`` of the created, edited or
+    deleted row (``None`` when it did not exist). Rows that followed it before
+    the change and rows that follow it now are recomputed, together with the
+    row itself so its values match the stored (rounded) weights, and written
+    with a single ``bulk_update``. Returns the rows that were updated.
+    """
+    states = [state for state in (before, after) if state is not None]
+    engine = GrowthRateEngine({pond_id for pond_id, _, _ in states})
+    targets = {sampling_id}
+    for state in states:
+        targets |= engine.dependents(sampling_id, *state)
+    return engine.save(engine.changed_rows(targets))
@@ -0,0 +1,333 @@
+"""Streaming import of historical records from CSV/TSV files.
+
+Rows are read one at a time, mapped to model fields through a column map,
+resolved against in-memory name lookups and inserted with ``bulk_create`` in
+chunks, so memory is bounded by the chunk size whatever the size of the file.
+Fields computed from the row alone are filled while a chunk is built; fields
+that depend on other records (default mortality weights, growth rates, the
+population ledger, KPI rows) are recomputed once for the touched ponds after
+the last chunk, instead of by a ``save()`` per row.
+"""
+import csv
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q
+
+from .bulk import latest_weights
+from .growth import recalculate_growth_rates
+from .kpis import KPI_SOURCE_MODELS, mark_stale, refresh_kpis
+from .models import (
+    DailyLog, Expense, ExpenseType, Feed, FeedType, FishSampling, Harvest,
+    Income, IncomeType, Mortality, Pond, SampleType, Sampling, Species, Stocking,
+)
+from .population import MOVEMENTS, rebuild_ledger
+from .serializers import (
+    DailyLogSerializer, ExpenseSerializer, FeedSerializer, FishSamplingSerializer,
+    HarvestSerializer, IncomeSerializer, MortalitySerializer, SamplingSerializer,
+    StockingSerializer,
+)
+from .stamps import touch
+
+
+# Record type -> model, named like the API endpoints
+RECORD_TYPES = {
+    'stocking': Stocking,
+    'feeds': Feed,
+    'daily-logs': DailyLog,
+    'sampling': Sampling,
+    'fish-sampling': FishSampling,
+    'mortality': Mortality,
+    'harvests': Harvest,
+    'expenses': Expense,
+    'incomes': Income,
+}
+
+# The API serializers mark the fields the models compute; those are not read from files
+SERIALIZERS = {
+    Stocking: StockingSerializer,
+    Feed: FeedSerializer,
+    DailyLog: DailyLogSerializer,
+    Sampling: SamplingSerializer,
+    FishSampling: FishSamplingSerializer,
+    Mortality: MortalitySerializer,
+    Harvest: HarvestSerializer,
+    Expense: ExpenseSerializer,
+    Income: IncomeSerializer,
+}
+
+# Reference rows ``create_missing`` may add, with the values a name alone does not give.
+# Ponds need an area and depth, so they must exist before importing.
+CREATABLE = {
+    Species: {},
+    FeedType: {},
+    SampleType: {},
+    ExpenseType: {'category': 'other'},
+    IncomeType: {'category': 'other'},
+}
+
+# Filled by the importer rather than read from the file
+OWNER_FIELDS = {'user'}
+SKIPPED_FIELDS = {'created_at', 'updated_at'}
+
+
+class RowError(ValueError):
+    """A row that cannot be imported"""
+
+
+def _normalize(name):
+    return ' '.join(str(name).lower().replace('_', ' ').replace('-', ' ').split())
+
+
+def read_rows(stream, delimiter=','):
+    """``(fieldnames, rows)`` for a CSV stream; ``rows`` yields ``(line number, {column: value})``"""
+    reader = csv.DictReader(stream, delimiter=delimiter)
+    fieldnames = reader.fieldnames or []
+
+    def rows():
+        for row in reader:
+            yield reader.line_num, row
+
+    return fieldnames, rows()
+
+
+class RecordImporter:
+    """Import rows of one record type for one user.
+
+    ``columns`` maps file columns to model fields; columns it does not name
+    are matched to fields by name or verbose name. Related rows (ponds,
+    species, feed/sample/expense/income types) are given by name or id.
+    """
+
+    def __init__(self, model, user, columns=None, date_format=None, create_missing=False,
+                 update_existing=False, batch_size=2000):
+        self.model = model
+        self.user = user
+        self.columns = {_normalize(column): field for column, field in (columns or {}).items()}
+        self.date_format = date_format
+        self.create_missing = create_missing
+        self.batch_size = batch_size
+
+        derived = set(getattr(SERIALIZERS[model].Meta, 'read_only_fields', ()))
+        self.fields = {
+            field.name: field for field in model._meta.concrete_fields
+            if field.editable and not field.primary_key
+            and field.name not in OWNER_FIELDS and field.name not in SKIPPED_FIELDS and field.name not in derived
+        }
+        self.owner = {
+            field.name: user for field in model._meta.concrete_fields if field.name in OWNER_FIELDS
+        }
+        self.lookups = {}
+
+        self.conflicts = {}
+        unique_fields = list(model._meta.unique_together[0]) if model._meta.unique_together else None
+        self.unique_fields = unique_fields if update_existing else None
+        if unique_fields:
+            if update_existing:
+                # A row of the file replaces the stored row with the same key
+                self.conflicts = {
+                    'update_conflicts': True,
+                    'unique_fields': unique_fields,
+                    'update_fields': [
+                        field.name for field in model._meta.concrete_fields
+                        if not field.primary_key and field.name not in unique_fields and field.name != 'created_at'
+                    ],
+                }
+            else:
+                self.conflicts = {'ignore_conflicts': True}
+
+        # Rows above this id are the imported ones
+        self.first_pk = model.objects.aggregate(last=models.Max('pk'))['last'] or 0
+        self.mapping = {}
+        self.pending = []
+        # Unique key -> (position in ``pending``, line) of the rows in the current chunk
+        self.queued = {}
+        self.since = {}
+        self.read = 0
+        self.written = 0
+        self.inserted = 0
+        self.replaced = 0
+        self.created = {}
+
+    def map_header(self, fieldnames):
+        """Match file columns to fields; returns the unused columns. Raises ``ValueError`` for missing required fields"""
+        by_name = {}
+        for name, field in self.fields.items():
+            by_name[_normalize(name)] = name
+            by_name[_normalize(field.verbose_name)] = name
+        unknown = []
+        for column in fieldnames:
+            field = self.columns.get(_normalize(column)) or by_name.get(_normalize(column))
+            if field is None:
+                unknown.append(column)
+                continue
+            if field not in self.fields:
+                raise ValueError(f'Column "{column}" is mapped to unknown field "{field}"')
+            self.mapping[column] = field
+
+        mapped = set(self.mapping.values())
+        # Related rows are resolved by ``resolve``; computed and default values need no checks
+        self.unchecked = [
+            field.name for field in self.model._meta.concrete_fields
+            if field.name not in mapped or field.is_relation
+        ]
+        missing = [
+            name for name, field in self.fields.items()
+            if name not in mapped and not field.has_default() and not field.null and not field.blank
+        ]
+        if missing:
+            raise ValueError(f'No column for required fields: {", ".join(missing)}')
+        return unknown
+
+    def lookup(self, model):
+        """``{'names': {name: pk}, 'ids': set}`` for one related model, loaded once"""
+        if model not in self.lookups:
+            queryset = model.objects.all()
+            if model is Pond:
+                queryset = queryset.filter(user=self.user)
+            rows = list(queryset.values_list('pk', 'name'))
+            self.lookups[model] = {
+                'names': {_normalize(name): pk for pk, name in rows},
+                'ids': {pk for pk, _ in rows},
+            }
+        return self.lookups[model]
+
+    def resolve(self, model, value):
+        table = self.lookup(model)
+        pk = table['names'].get(_normalize(value))
+        if pk is not None:
+            return pk
+        if value.isdigit() and int(value) in table['ids']:
+            return int(value)
+        if self.create_missing and model in CREATABLE:
+            row = model.objects.create(name=value, **CREATABLE[model])
+            table['names'][_normalize(value)] = row.pk
+            table['ids'].add(row.pk)
+            self.created[model._meta.verbose_name] = self.created.get(model._meta.verbose_name, 0) + 1
+            return row.pk
+        raise RowError(f'Unknown {model._meta.verbose_name} "{value}"')
+
+    def parse(self, field, value):
+        value = (value or '').strip()
+        if not value:
+            if field.has_default():
+                return field.get_default()
+            if field.null:
+                return None
+            if field.blank:
+                return ''
+            raise RowError(f'{field.name}: This field is required.')
+        if field.is_relation:
+            return self.resolve(field.related_model, value)
+        if isinstance(field, models.DateField) and self.date_format:
+            try:
+                return datetime.strptime(value, self.date_format).date()
+            except ValueError:
+                raise RowError(f'{field.name}: "{value}" does not match {self.date_format}')
+        if isinstance(field, (models.DecimalField, models.IntegerField, models.FloatField)):
+            # Thousands separators, as spreadsheets export them
+            value = value.replace(',', '')
+        try:
+            return field.to_python(value)
+        except ValidationError as e:
+            raise RowError(f'{field.name}: {" ".join(e.messages)}')
+
+    def build(self, row):
+        """Unsaved instance for one file row, with the fields computed from the row filled"""
+        values = {}
+        for column, name in self.mapping.items():
+            field = self.fields[name]
+            values[field.attname] = self.parse(field, row.get(column))
+        instance = self.model(**values, **self.owner)
+        try:
+            instance.clean_fields(exclude=self.unchecked)
+        except ValidationError as e:
+            raise RowError('; '.join(f'{name}: {" ".join(messages)}' for name, messages in e.message_dict.items()))
+
+        for method in ('calculate_derived_fields', 'calculate_derived_metrics', 'calculate_total_weight'):
+            if hasattr(instance, method):
+                getattr(instance, method)()
+        return instance
+
+    def add(self, row, line=None):
+        """Queue one file row, inserting a chunk when it is full.
+
+        Raises ``RowError`` for an invalid row. With ``update_existing``, a row
+        repeating the key of an earlier row of the chunk replaces it, as one
+        upsert cannot touch a stored row twice; returns a warning then.
+        """
+        self.read += 1
+        line = self.read if line is None else line
+        instance = self.build(row)
+        pond_id = getattr(instance, 'pond_id', None)
+        if pond_id is not None and (pond_id not in self.since or instance.date < self.since[pond_id]):
+            self.since[pond_id] = instance.date
+
+        if self.unique_fields:
+            key = tuple(getattr(instance, self.model._meta.get_field(name).attname) for name in self.unique_fields)
+            # Keys with an empty part never conflict in the database
+            if None not in key:
+                if key in self.queued:
+                    position, earlier = self.queued[key]
+                    self.pending[position] = instance
+                    self.queued[key] = (position, line)
+                    self.replaced += 1
+                    return f'Replaces line {earlier}, which has the same {", ".join(self.unique_fields)}'
+                self.queued[key] = (len(self.pending), line)
+
+        self.pending.append(instance)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        with transaction.atomic():
+            self.model.objects.bulk_create(self.pending, batch_size=500, **self.conflicts)
+        self.written += len(self.pending)
+        self.pending = []
+        self.queued = {}
+
+    def fill_mortality_weights(self):
+        """Default weights of the imported mortality rows, as ``Mortality.save`` would set them"""
+        latest_sampling, latest_stocking = latest_weights(list(self.since))
+        rows = Mortality.objects.filter(
+            Q(avg_weight_kg__isnull=True) | Q(avg_weight_kg=0),
+            pk__gt=self.first_pk,
+            pond_id__in=list(self.since),
+            species__isnull=False,
+        ).only('pond_id', 'species_id', 'count', 'avg_weight_kg', 'total_weight_kg')
+        changed = []
+        for mortality in rows.iterator(chunk_size=self.batch_size):
+            key = (mortality.pond_id, mortality.species_id)
+            mortality.apply_default_weight(latest_sampling.get(key), latest_stocking.get(key))
+            if mortality.avg_weight_kg:
+                mortality.calculate_total_weight()
+                changed.append(mortality)
+            if len(changed) >= self.batch_size:
+                Mortality.objects.bulk_update(changed, ['avg_weight_kg', 'total_weight_kg'], batch_size=500)
+                changed = []
+        Mortality.objects.bulk_update(changed, ['avg_weight_kg', 'total_weight_kg'], batch_size=500)
+
+    def finish(self, kpis=True):
+        """Insert the last chunk and recompute what depends on the imported rows"""
+        self.flush()
+        pond_ids = list(self.since)
+        if self.written and pond_ids:
+            if self.model is Mortality:
+                self.fill_mortality_weights()
+            if self.model in MOVEMENTS:
+                rebuild_ledger(pond_ids)
+            if self.model is FishSampling:
+                recalculate_growth_rates(pond_ids)
+            if self.model in KPI_SOURCE_MODELS:
+                if kpis:
+                    for pond_id, since in self.since.items():
+                        refresh_kpis(pond_id, since=since)
+                else:
+                    # Left for the next materialize_kpis run
+                    mark_stale(self.since)
+        # Bulk writes send no signals
+        touch(self.model, self.user.pk)
+        self.inserted = self.model.objects.filter(pk__gt=self.first_pk).count()
@@ -0,0 +1,176 @@
+"""Per-request timing and query metrics.
+
+``RequestMetricsMiddleware`` counts and times the SQL each request runs,
+measures the response, reports the numbers in a ``Server-Timing`` header and
+keeps the last ``REQUEST_METRICS_WINDOW`` requests of every endpoint for
+``request_stats``. ``InstrumentedViewMixin`` names the endpoint after the
+viewset and action and times the serializers from ``get_serializer``,
+including any queries they run, which is where N+1 lookups show up.
+Serializers built directly are timed by passing them through
+``timed_serializer``.
+
+The summary lives in process memory: each server worker keeps its own and
+it starts empty on restart.
+"""
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+DEFAULT_WINDOW = 1000
+
+# Metrics of the request being handled in this thread
+_current = threading.local()
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=getattr(settings, 'REQUEST_METRICS_WINDOW', DEFAULT_WINDOW)))
+
+
+class RequestMetrics:
+    """Counters of one request; also the ``execute_wrapper`` that times its queries"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.endpoint = None
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_seconds += time.perf_counter() - started
+
+
+def current_metrics():
+    """Metrics of the request running in this thread, or ``None`` outside a request"""
+    return getattr(_current, 'metrics', None)
+
+
+def _percentile(values, fraction):
+    """Nearest-rank percentile of sorted ``values``"""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def _summary(values):
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return None
+    return {
+        'p50': round(_percentile(values, 0.50), 2),
+        'p95': round(_percentile(values, 0.95), 2),
+        'p99': round(_percentile(values, 0.99), 2),
+        'max': round(values[-1], 2),
+    }
+
+
+def record(endpoint, sample):
+    with _lock:
+        _samples[endpoint].append(sample)
+
+
+def request_stats():
+    """Latency, query and size percentiles per endpoint, slowest p95 first"""
+    with _lock:
+        samples = {endpoint: list(rows) for endpoint, rows in _samples.items()}
+    stats = []
+    for endpoint, rows in samples.items():
+        stats.append({
+            'endpoint': endpoint,
+            'requests': len(rows),
+            'server_errors': sum(1 for row in rows if row['status'] >= 500),
+            'duration_ms': _summary(row['duration_ms'] for row in rows),
+            'sql_ms': _summary(row['sql_ms'] for row in rows),
+            'queries': _summary(row['queries'] for row in rows),
+            'serializer_ms': _summary(row['serializer_ms'] for row in rows),
+            'size_bytes': _summary(row['size_bytes'] for row in rows),
+        })
+    stats.sort(key=lambda row: row['duration_ms']['p95'], reverse=True)
+    return stats
+
+
+def reset_stats():
+    with _lock:
+        _samples.clear()
+
+
+class RequestMetricsMiddleware:
+    """Record query count, SQL time, serializer time and size of every request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = _current.metrics = RequestMetrics()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.metrics = None
+
+        duration_ms = (time.perf_counter() - metrics.started) * 1000
+        sql_ms = metrics.sql_seconds * 1000
+        serializer_ms = metrics.serializer_seconds * 1000
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={sql_ms:.1f};desc="{metrics.queries} queries"',
+            f'serializer;dur={serializer_ms:.1f}',
+            f'total;dur={duration_ms:.1f}',
+        ])
+
+        endpoint = metrics.endpoint
+        if endpoint is None:
+            match = request.resolver_match
+            # Unmatched paths share one entry instead of one per URL
+            endpoint = match.view_name if match else '(unmatched)'
+        record(f'{request.method} {endpoint}', {
+            'status': response.status_code,
+            'duration_ms': duration_ms,
+            'sql_ms': sql_ms,
+            'queries': metrics.queries,
+            'serializer_ms': serializer_ms,
+            'size_bytes': None if response.streaming else len(response.content),
+        })
+        return response
+
+
+def _timed(method, metrics):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.serializer_seconds += time.perf_counter() - started
+    return wrapper
+
+
+def timed_serializer(serializer):
+    """Count ``serializer``'s validation and output as serializer time of the current request"""
+    metrics = current_metrics()
+    if metrics is not None:
+        serializer.to_representation = _timed(serializer.to_representation, metrics)
+        serializer.run_validation = _timed(serializer.run_validation, metrics)
+    return serializer
+
+
+class InstrumentedViewMixin:
+    """Name the request's endpoint ``<basename>.<action>`` and time ``get_serializer`` serializers"""
+
+    def initial(self, request, *args, **kwargs):
+        metrics = current_metrics()
+        if metrics is not None:
+            name = getattr(self, 'basename', None) or type(self).__name__
+            metrics.endpoint = f'{name}.{getattr(self, "action", None) or request.method.lower()}'
+        super().initial(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        return timed_serializer(super().get_serializer(*args, **kwargs))
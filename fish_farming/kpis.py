@@ -0,0 +1,306 @@
+"""Materialized daily KPI snapshots.
+
+``KPIDashboard`` holds one row per pond per day, computed from the raw
+FishSampling, Feed, DailyLog, Mortality, Harvest, Expense and Income records
+and the population ledger. Every value is a snapshot as of the end of that
+day, so reports read a row instead of re-aggregating history.
+
+Rows are written by the ``materialize_kpis`` command. A change on a given
+date affects every later running total, so a refresh recomputes the pond from
+that date onwards: a handful of grouped queries for the whole history, then
+one upsert. That is too much for the write path, so a write to a source
+record (see ``signals.py``) only records the earliest stale date of its pond
+in ``KPIBackfill``, and the next ``materialize_kpis`` run, typically
+scheduled every few minutes, recomputes those ponds from there. Set
+``KPI_MATERIALIZE_ON_WRITE = True`` to recompute on commit instead.
+"""
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Sum, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from .models import (
+    DailyLog, Expense, Feed, FishSampling, Harvest, Income, KPIBackfill,
+    KPIDashboard, Mortality, Pond, PopulationLedger, Stocking,
+)
+from .stamps import touch
+
+
+KPI_SOURCE_MODELS = (Stocking, FishSampling, Feed, DailyLog, Mortality, Harvest, Expense, Income)
+
+KPI_FIELDS = [
+    'avg_weight_g', 'total_biomass_kg', 'survival_rate_percent',
+    'feed_conversion_ratio', 'daily_feed_kg',
+    'water_temp_c', 'ph', 'dissolved_oxygen',
+    'total_expenses', 'total_income', 'profit_loss',
+]
+
+
+def _decimal(value, places, max_digits):
+    """``value`` rounded for a ``DecimalField``; ``None`` if it does not fit"""
+    if value is None:
+        return None
+    quantized = Decimal(str(value)).quantize(Decimal(1).scaleb(-places))
+    if quantized.adjusted() >= max_digits - places:
+        return None
+    return quantized
+
+
+class _DailySeries:
+    """Per-date sums of one field, with running totals by bisection"""
+
+    def __init__(self, queryset, field):
+        rows = queryset.order_by().values('date').annotate(total=Sum(field)).order_by('date')
+        self.dates = [row['date'] for row in rows]
+        self.values = [float(row['total'] or 0) for row in rows]
+        self.totals = [0.0] + list(accumulate(self.values))
+
+    def on(self, date):
+        index = bisect_right(self.dates, date) - 1
+        return self.values[index] if index >= 0 and self.dates[index] == date else 0.0
+
+    def through(self, date):
+        return self.totals[bisect_right(self.dates, date)]
+
+
+class _Timeline:
+    """Dated values per key; ``latest`` returns the value on or before a date"""
+
+    def __init__(self, rows):
+        self.dates = defaultdict(list)
+        self.values = defaultdict(list)
+        for key, date, value in rows:
+            self.dates[key].append(date)
+            self.values[key].append(value)
+
+    def keys(self):
+        return self.dates.keys()
+
+    def latest(self, key, date):
+        index = bisect_right(self.dates.get(key, []), date) - 1
+        return self.values[key][index] if index >= 0 else None
+
+
+class PondKPIs:
+    """All the history one pond's KPI rows are computed from, loaded once."""
+
+    def __init__(self, pond_id):
+        self.pond_id = pond_id
+
+        ledger = PopulationLedger.objects.filter(pond_id=pond_id).order_by('date')
+        self.population = _Timeline(
+            (row.species_id, row.date, (row.cumulative_stocked, row.cumulative_mortality, row.cumulative_harvested))
+            for row in ledger
+        )
+        samplings = FishSampling.objects.filter(pond_id=pond_id).order_by('date', 'created_at')
+        self.sampled_weight = _Timeline(
+            samplings.values_list('species_id', 'date', 'average_weight_kg')
+        )
+        stockings = Stocking.objects.filter(pond_id=pond_id).order_by('date', 'pk')
+        self.stocked_weight = _Timeline(
+            stockings.values_list('species_id', 'date', 'initial_avg_weight_kg')
+        )
+
+        self.stocked_kg = _DailySeries(stockings, 'total_weight_kg')
+        self.feed_kg = _DailySeries(Feed.objects.filter(pond_id=pond_id), 'amount_kg')
+        self.harvested_kg = _DailySeries(Harvest.objects.filter(pond_id=pond_id), 'total_weight_kg')
+        self.expenses = _DailySeries(Expense.objects.filter(pond_id=pond_id), 'amount')
+        self.income = _DailySeries(Income.objects.filter(pond_id=pond_id), 'amount')
+        self.water = {
+            row[0]: row[1:]
+            for row in DailyLog.objects.filter(pond_id=pond_id).values_list(
+                'date', 'water_temp_c', 'ph', 'dissolved_oxygen'
+            )
+        }
+
+    def first_date(self):
+        """The earliest date with any record, or ``None`` for a pond without history"""
+        dates = [series.dates[0] for series in (self.feed_kg, self.expenses, self.income) if series.dates]
+        for timeline in (self.population, self.sampled_weight, self.stocked_weight):
+            dates.extend(timeline_dates[0] for timeline_dates in timeline.dates.values())
+        dates.extend(self.water)
+        return min(dates) if dates else None
+
+    def weight_kg(self, species_id, date):
+        """Latest sampled average weight of a species, falling back to mixed samplings and stocking"""
+        for timeline, key in (
+            (self.sampled_weight, species_id),
+            (self.sampled_weight, None),
+            (self.stocked_weight, species_id),
+        ):
+            weight = timeline.latest(key, date)
+            if weight:
+                return float(weight)
+        return None
+
+    def row(self, date):
+        """Unsaved ``KPIDashboard`` for the end of ``date``"""
+        alive = {}
+        stocked = mortality = 0
+        for species_id in self.population.keys():
+            totals = self.population.latest(species_id, date)
+            if totals is None:
+                continue
+            alive[species_id] = totals[0] - totals[1] - totals[2]
+            stocked += totals[0]
+            mortality += totals[1]
+        alive_total = max(0, sum(alive.values()))
+
+        # Biomass of the species with a known weight, scaled down by losses
+        # recorded without a species
+        biomass = weighed = counted = 0
+        for species_id, count in alive.items():
+            if species_id is None or count <= 0:
+                continue
+            counted += count
+            weight = self.weight_kg(species_id, date)
+            if weight is not None:
+                biomass += count * weight
+                weighed += count
+        avg_weight_g = biomass / weighed * 1000 if weighed else None
+        if counted > alive_total:
+            biomass *= alive_total / counted
+
+        fcr = None
+        gain = biomass + self.harvested_kg.through(date) - self.stocked_kg.through(date)
+        if weighed and gain > 0:
+            fcr = self.feed_kg.through(date) / gain
+
+        water_temp_c, ph, dissolved_oxygen = self.water.get(date, (None, None, None))
+        total_expenses = self.expenses.through(date)
+        total_income = self.income.through(date)
+        return KPIDashboard(
+            pond_id=self.pond_id,
+            date=date,
+            avg_weight_g=_decimal(avg_weight_g, 2, 10),
+            total_biomass_kg=_decimal(biomass if weighed else None, 2, 10),
+            survival_rate_percent=_decimal((stocked - mortality) / stocked * 100 if stocked else None, 2, 5),
+            feed_conversion_ratio=_decimal(fcr, 2, 5),
+            daily_feed_kg=_decimal(self.feed_kg.on(date), 2, 10),
+            water_temp_c=water_temp_c,
+            ph=ph,
+            dissolved_oxygen=dissolved_oxygen,
+            total_expenses=_decimal(total_expenses, 2, 12),
+            total_income=_decimal(total_income, 2, 12),
+            profit_loss=_decimal(total_income - total_expenses, 2, 12),
+        )
+
+    def rows(self, since=None, until=None):
+        """KPI rows for every day from ``since`` (default: the first record) to ``until`` (default: today)"""
+        first_date = self.first_date()
+        if first_date is None:
+            return []
+        start = max(since, first_date) if since else first_date
+        end = until or timezone.localdate()
+        return [self.row(start + timedelta(days=day)) for day in range((end - start).days + 1)]
+
+
+def refresh_kpis(pond_id, since=None, until=None):
+    """Recompute and upsert one pond's KPI rows; returns the number of rows written.
+
+    Rows entered by hand keep their notes; the computed fields are overwritten.
+    """
+    rows = PondKPIs(pond_id).rows(since, until)
+    KPIDashboard.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['pond', 'date'],
+        update_fields=KPI_FIELDS + ['updated_at'],
+    )
+    # Bulk writes send no signals
+    touch(KPIDashboard, Pond.objects.filter(pk=pond_id).values_list('user_id', flat=True).first())
+    return len(rows)
+
+
+def materialize_kpis(pond_ids=None, since=None, rebuild=False):
+    """Fill KPI rows for many ponds; returns ``{pond_id: rows written}``.
+
+    By default each pond resumes from its latest KPI row, recomputing that
+    day and filling the days since, or from its ``KPIBackfill`` date when a
+    write made earlier rows stale. ``rebuild`` recomputes the whole history,
+    and ``since`` recomputes from that date. Either way the backfill marks of
+    the ponds done are cleared.
+    """
+    ponds = Pond.objects.all()
+    if pond_ids is not None:
+        ponds = ponds.filter(pk__in=pond_ids)
+    pond_ids = list(ponds.values_list('pk', flat=True))
+
+    # Marks set after this point may describe writes the refresh does not see; they stay
+    started = timezone.now()
+    resume = {}
+    if not rebuild and since is None:
+        today = timezone.localdate()
+        latest = KPIDashboard.objects.filter(pond_id__in=pond_ids).values('pond').annotate(latest=Max('date'))
+        resume = {row['pond']: min(row['latest'], today) for row in latest}
+        for pond_id, stale_since in KPIBackfill.objects.filter(pond_id__in=pond_ids).values_list('pond_id', 'since'):
+            resume[pond_id] = min(resume.get(pond_id, stale_since), stale_since)
+
+    written = {}
+    for pond_id in pond_ids:
+        with transaction.atomic():
+            written[pond_id] = refresh_kpis(pond_id, since=since or resume.get(pond_id))
+            KPIBackfill.objects.filter(pond_id=pond_id, requested_at__lte=started).delete()
+    return written
+
+
+# Refreshes requested by signal handlers in this thread, flushed on commit
+_pending = threading.local()
+
+
+def schedule_refresh(pond_id, since):
+    """Mark a pond's KPI rows stale from ``since`` once the current transaction commits.
+
+    Several writes to the same pond in one transaction leave one mark at the
+    earliest date. With ``KPI_MATERIALIZE_ON_WRITE = True`` the rows are
+    recomputed on commit instead.
+    """
+    if pond_id is None or since is None:
+        return
+    pending = getattr(_pending, 'ponds', None)
+    if pending is None:
+        pending = _pending.ponds = {}
+    if pond_id not in pending or since < pending[pond_id]:
+        pending[pond_id] = since
+    transaction.on_commit(flush_refreshes, robust=True)
+
+
+def flush_refreshes():
+    pending = getattr(_pending, 'ponds', None)
+    if not pending:
+        return
+    _pending.ponds = {}
+    if not getattr(settings, 'KPI_MATERIALIZE_ON_WRITE', False):
+        mark_stale(pending)
+        return
+    today = timezone.localdate()
+    # Ponds deleted in the meantime have no rows left to refresh
+    for pond_id in Pond.objects.filter(pk__in=list(pending)).values_list('pk', flat=True):
+        since = pending[pond_id]
+        if since <= today:
+            refresh_kpis(pond_id, since=since)
+
+
+def mark_stale(ponds):
+    """Record ``{pond_id: date}`` in ``KPIBackfill``, keeping the earliest date of each pond"""
+    now = timezone.now()
+    with transaction.atomic():
+        # Ponds deleted in the meantime have no rows left to refresh
+        pond_ids = list(Pond.objects.filter(pk__in=list(ponds)).values_list('pk', flat=True))
+        KPIBackfill.objects.bulk_create(
+            [KPIBackfill(pond_id=pond_id, since=ponds[pond_id], requested_at=now) for pond_id in pond_ids],
+            ignore_conflicts=True,
+        )
+        for pond_id in pond_ids:
+            KPIBackfill.objects.filter(pond_id=pond_id).update(
+                since=Least('since', Value(ponds[pond_id])), requested_at=now,
+            )
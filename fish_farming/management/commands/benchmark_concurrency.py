@@ -0,0 +1,185 @@
+import multiprocessing
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from aqua.database import sqlite_config
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.urls import reverse
+from fish_farming.models import FeedType, FishSampling, Pond, Species, Stocking
+from rest_framework.test import APIClient
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure parallel feed writers (POST /feeds/) against FCR analysis readers '
+        '(GET /fish-sampling/fcr_analysis/) on the configured database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=8,
+            help='Processes posting feeds (default: 8)',
+        )
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=4,
+            help='Processes reading the FCR analysis (default: 4)',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Seconds each run lasts (default: 10)',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['current', 'default', 'tuned', 'both'],
+            default='current',
+            help=(
+                'SQLite settings to run with: the configured ones, stock SQLite, the tuned pragmas, '
+                'or stock then tuned. Stock mode takes the file out of WAL, so stop the server first'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options['writers'] < 0 or options['readers'] < 0 or options['writers'] + options['readers'] == 0:
+            raise CommandError('Use at least one writer or reader')
+        modes = {'both': ['default', 'tuned']}.get(options['mode'], [options['mode']])
+        if connection.vendor != 'sqlite' and modes != ['current']:
+            raise CommandError(f'--mode {options["mode"]} only applies to SQLite; this database is {connection.vendor}')
+
+        db_settings = connections.settings[DEFAULT_DB_ALIAS]
+        original_options = db_settings.get('OPTIONS', {})
+        user, created_feed_type = self.setup()
+        try:
+            for mode in modes:
+                if mode != 'current':
+                    self.configure(db_settings, tuned=mode == 'tuned')
+                self.stdout.write(
+                    f'\n{mode} mode: {options["writers"]} writers, {options["readers"]} readers, '
+                    f'{options["duration"]:g}s'
+                )
+                self.report(self.run(user, options), options['duration'])
+        finally:
+            if modes != ['current']:
+                db_settings['OPTIONS'] = original_options
+                connections.close_all()
+            self.stdout.write('Removing benchmark data...')
+            user.delete()
+            if created_feed_type:
+                self.feed_type.delete()
+
+    def configure(self, db_settings, tuned):
+        """Reopen connections with stock or tuned SQLite settings"""
+        connections.close_all()
+        db_settings['OPTIONS'] = sqlite_config(db_settings['NAME'], tuned=tuned).get('OPTIONS', {})
+        if not tuned:
+            # WAL is stored in the file; stock SQLite uses a rollback journal
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode=DELETE')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.stdout.write(f'journal_mode={cursor.fetchone()[0]}')
+
+    def setup(self):
+        """A throwaway user with two stocked, sampled ponds"""
+        self.stdout.write('Creating benchmark data...')
+        user = User.objects.create(username=f'benchmark-{uuid.uuid4().hex[:12]}')
+        species, _ = Species.objects.get_or_create(name='Tilapia')
+        self.feed_type, created_feed_type = FeedType.objects.get_or_create(name='Benchmark feed')
+        start = date.today() - timedelta(days=120)
+        self.ponds = []
+        for number in range(2):
+            pond = Pond.objects.create(
+                user=user, name=f'Benchmark pond {number + 1}',
+                area_decimal=Decimal('10'), depth_ft=Decimal('5'), volume_m3=Decimal('600'),
+            )
+            Stocking.objects.create(
+                pond=pond, species=species, date=start, pcs=5000,
+                pieces_per_kg=Decimal('100'), total_weight_kg=Decimal('50'), initial_avg_weight_kg=Decimal('0.01'),
+            )
+            for week in range(1, 17):
+                weight = Decimal('0.01') + Decimal('0.015') * week
+                FishSampling.objects.create(
+                    pond=pond, species=species, user=user, date=start + timedelta(days=7 * week),
+                    sample_size=30, total_weight_kg=weight * 30,
+                )
+            self.ponds.append(pond)
+        return user, created_feed_type
+
+    def run(self, user, options):
+        """Timings per role; each writer and reader is a separate process, like server workers"""
+        deadline = time.monotonic() + options['duration']
+        feeds_url = reverse('feed-list')
+        fcr_url = reverse('fishsampling-fcr-analysis')
+
+        def work(role, number, queue):
+            client = APIClient()
+            client.force_authenticate(user)
+            timings = []
+            day = 0
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                try:
+                    if role == 'write':
+                        day += 1
+                        response = client.post(feeds_url, {
+                            'pond': self.ponds[number % len(self.ponds)].id,
+                            'feed_type': self.feed_type.id,
+                            'date': (date.today() - timedelta(days=day % 100)).isoformat(),
+                            'amount_kg': '2.50',
+                            'cost_per_kg': '1.20',
+                        }, format='json')
+                    else:
+                        response = client.get(fcr_url)
+                    outcome = 'ok' if response.status_code < 400 else (
+                        'locked' if b'database is locked' in response.content else 'error'
+                    )
+                except Exception as e:
+                    outcome = 'locked' if 'database is locked' in str(e) else 'error'
+                timings.append((time.monotonic() - started, outcome))
+            connection.close()
+            queue.put((role, timings))
+
+        # Children must open their own connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        workers = [
+            context.Process(target=work, args=(role, number, queue))
+            for role, count in (('write', options['writers']), ('read', options['readers']))
+            for number in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        results = {'write': [], 'read': []}
+        for _ in workers:
+            role, timings = queue.get()
+            results[role].extend(timings)
+        for worker in workers:
+            worker.join()
+        return results
+
+    def report(self, results, duration):
+        for role, label in (('write', 'POST /feeds/'), ('read', 'GET /fish-sampling/fcr_analysis/')):
+            timings = results[role]
+            if not timings:
+                continue
+            latencies = sorted(seconds * 1000 for seconds, _ in timings)
+            locked = sum(1 for _, outcome in timings if outcome == 'locked')
+            failed = sum(1 for _, outcome in timings if outcome == 'error')
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            line = (
+                f'  {label}: {len(timings)} requests, {len(timings) / duration:.1f}/s, '
+                f'p50 {statistics.median(latencies):.0f} ms, p95 {p95:.0f} ms, max {latencies[-1]:.0f} ms, '
+                f'{locked} locked, {failed} other errors'
+            )
+            self.stdout.write(self.style.WARNING(line) if locked or failed else self.style.SUCCESS(line))
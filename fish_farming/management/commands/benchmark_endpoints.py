@@ -0,0 +1,284 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from fish_farming.models import Expense, Feed, FishSampling, Mortality, Pond, Stocking
+from fish_farming.stamps import stamp_cache
+from fish_farming.synthetic import SPECIES, SyntheticFarm
+from rest_framework.test import APIClient
+
+
+# name -> (method, URL name, needs a pond id, query parameters or request body)
+ENDPOINTS = {
+    'ponds.list': ('get', 'pond-list', False, None),
+    'ponds.detail': ('get', 'pond-detail', True, None),
+    'ponds.summary': ('get', 'pond-summary', True, None),
+    'ponds.financial_summary': ('get', 'pond-financial-summary', True, None),
+    'farm.financial_summary': ('get', 'pond-farm-financial-summary', False, None),
+    'fish_sampling.biomass_analysis': ('get', 'fishsampling-biomass-analysis', False, 'dates'),
+    'fish_sampling.fcr_analysis': ('get', 'fishsampling-fcr-analysis', False, 'dates'),
+    'feeding_advice.auto_generate': ('post', 'feedingadvice-auto-generate', False, 'advice'),
+    'target_biomass.calculate': ('post', 'target-biomass-calculate', False, 'target'),
+    'analytics.list': ('get', 'analytics-list', False, 'dates'),
+    'feeds.list': ('get', 'feed-list', False, None),
+    'daily_logs.list': ('get', 'dailylog-list', False, None),
+    'fish_sampling.list': ('get', 'fishsampling-list', False, None),
+    'mortality.list': ('get', 'mortality-list', False, None),
+    'expenses.list': ('get', 'expense-list', False, None),
+    'kpi_dashboard.list': ('get', 'kpidashboard-list', False, None),
+    'sync.list': ('get', 'sync-list', False, None),
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Time the key API endpoints for one user (e.g. a synthetic farm) and write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Username to benchmark as (default: the first synthetic-* user)',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            choices=sorted(ENDPOINTS),
+            help='Only run this endpoint (repeatable; default: all)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed runs per endpoint (default: 5)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=1,
+            help='Untimed runs per endpoint first (default: 1)',
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Keep the report cache between runs instead of measuring cold reports',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the JSON report to this file',
+        )
+        parser.add_argument(
+            '--compare',
+            help='A previous JSON report to print the changes against',
+        )
+        parser.add_argument(
+            '--sweep',
+            type=int,
+            nargs='+',
+            metavar='COMBINATIONS',
+            help='Instead of one user, time the endpoints on throwaway synthetic farms of this many '
+                 'pond/species combinations each (e.g. 10 100 1000); the farms are rolled back afterwards',
+        )
+        parser.add_argument(
+            '--sweep-days',
+            type=int,
+            default=60,
+            help='Days of history of each --sweep farm (default: 60)',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or options['warmup'] < 0:
+            raise CommandError('--repeat must be at least 1 and --warmup at least 0')
+        if options['sweep']:
+            return self.sweep(options)
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+        else:
+            user = User.objects.filter(username__startswith='synthetic-').order_by('username').first()
+            if user is None:
+                raise CommandError('No synthetic-* user found. Run generate_synthetic_farm or pass --user')
+
+        report = {
+            **self.environment(options),
+            'user': user.username,
+            'dataset': self.dataset(user),
+            'endpoints': self.run_endpoints(user, options['endpoint'] or ENDPOINTS, options),
+        }
+        self.finish(report, options)
+
+    def sweep(self, options):
+        """Time the endpoints on synthetic farms of growing size; all-flat p50s mean constant work per request"""
+        if min(options['sweep']) < 1 or options['sweep_days'] < 1:
+            raise CommandError('--sweep sizes and --sweep-days must be at least 1')
+        endpoints = options['endpoint'] or ['fish_sampling.fcr_analysis']
+        start_date = timezone.localdate() - timedelta(days=options['sweep_days'] - 1)
+        sizes = []
+        for combinations in options['sweep']:
+            # As many species per pond as divide the size, so ponds x species is exact
+            species = max(count for count in range(1, len(SPECIES) + 1) if combinations % count == 0)
+            farm = SyntheticFarm(
+                seed=combinations, users=1, ponds=combinations // species, species=species,
+                days=options['sweep_days'], start_date=start_date, prefix='benchmark-sweep',
+            )
+            self.stdout.write(f'\n{combinations} combinations ({farm.ponds} ponds x {species} species):')
+            with transaction.atomic():
+                farm.generate(kpis=False)
+                user = User.objects.get(username=farm.usernames()[0])
+                sizes.append({
+                    'combinations': combinations,
+                    'dataset': self.dataset(user),
+                    'endpoints': self.run_endpoints(user, endpoints, options),
+                })
+                transaction.set_rollback(True)
+
+        self.stdout.write('\nCombinations  ' + '  '.join(f'{name:>32}' for name in endpoints))
+        for size in sizes:
+            cells = (
+                f'{size["endpoints"][name]["duration_ms"]["p50"]:8.1f} ms {size["endpoints"][name]["queries"]:4} queries'
+                for name in endpoints
+            )
+            self.stdout.write(f'{size["combinations"]:12}  ' + '  '.join(f'{cell:>32}' for cell in cells))
+        self.finish({**self.environment(options), 'sweep': sizes}, options)
+
+    def environment(self, options):
+        return {
+            'commit': _git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'options': {key: options[key] for key in ('repeat', 'warmup', 'warm_cache')},
+        }
+
+    def dataset(self, user):
+        return {
+            'ponds': Pond.objects.filter(user=user).count(),
+            'stockings': Stocking.objects.filter(pond__user=user).count(),
+            'feeds': Feed.objects.filter(pond__user=user).count(),
+            'fish_samplings': FishSampling.objects.filter(pond__user=user).count(),
+            'mortalities': Mortality.objects.filter(pond__user=user).count(),
+            'expenses': Expense.objects.filter(user=user).count(),
+        }
+
+    def run_endpoints(self, user, names, options):
+        """Measure ``names`` as ``user``; returns the summaries by endpoint name"""
+        stocking = Stocking.objects.filter(pond__user=user).order_by('date', 'pond__name', 'pk').first()
+        if stocking is None:
+            raise CommandError(f'User "{user.username}" has no stocked ponds')
+        # Reports cover the user's whole history, which may end before today
+        last_feed = Feed.objects.filter(pond__user=user).order_by('-date').values_list('date', flat=True).first()
+        end_date = last_feed or timezone.localdate()
+        payloads = {
+            'dates': {
+                'start_date': stocking.date.isoformat(),
+                'end_date': end_date.isoformat(),
+            },
+            'advice': {'pond': stocking.pond_id},
+            'target': {
+                'pond_id': stocking.pond_id,
+                'species_id': stocking.species_id,
+                'target_biomass_kg': 5000,
+                'current_date': end_date.isoformat(),
+            },
+        }
+
+        client = APIClient()
+        client.force_authenticate(user)
+        results = {}
+        for name in names:
+            method, url_name, detail, payload = ENDPOINTS[name]
+            url = reverse(url_name, args=[stocking.pond_id] if detail else [])
+            results[name] = self.measure(client, method, url, payloads.get(payload), options)
+            summary = results[name]
+            self.stdout.write(
+                f'{name:32} {summary["status"]}  p50 {summary["duration_ms"]["p50"]:8.1f} ms  '
+                f'{summary["queries"]:5} queries  {summary["size_bytes"]:9} bytes'
+            )
+        return results
+
+    def finish(self, report, options):
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Completed! Report written to {options["output"]}'))
+        if options['compare']:
+            self.compare(report, options['compare'])
+
+    def measure(self, client, method, url, data, options):
+        """Status, query count, size and duration percentiles of one endpoint"""
+        durations = []
+        for run in range(options['warmup'] + options['repeat']):
+            if not options['warm_cache']:
+                stamp_cache().clear()
+            # Writes are rolled back so every run sees the same data
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    if method == 'post':
+                        response = client.post(url, data, format='json')
+                    else:
+                        response = client.get(url, data)
+                    elapsed = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+            if run >= options['warmup']:
+                durations.append(elapsed)
+        durations.sort()
+        return {
+            'status': response.status_code,
+            'queries': len(queries),
+            'size_bytes': len(response.content),
+            'duration_ms': {
+                'p50': round(statistics.median(durations), 2),
+                'mean': round(statistics.fmean(durations), 2),
+                'min': round(durations[0], 2),
+                'max': round(durations[-1], 2),
+            },
+        }
+
+    def compare(self, report, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read --compare: {e}')
+        self.stdout.write(f'\nChanges against {previous.get("commit") or path}:')
+        if 'sweep' not in report:
+            self.compare_endpoints(report['endpoints'], previous.get('endpoints', {}))
+            return
+        previous_sizes = {size['combinations']: size['endpoints'] for size in previous.get('sweep', [])}
+        for size in report['sweep']:
+            self.stdout.write(f'  {size["combinations"]} combinations:')
+            self.compare_endpoints(size['endpoints'], previous_sizes.get(size['combinations'], {}))
+
+    def compare_endpoints(self, endpoints, previous):
+        for name, current in endpoints.items():
+            before = previous.get(name)
+            if before is None:
+                self.stdout.write(f'  {name:32} new')
+                continue
+            change = current['duration_ms']['p50'] / before['duration_ms']['p50'] - 1 if before['duration_ms']['p50'] else 0
+            line = (
+                f'  {name:32} p50 {before["duration_ms"]["p50"]:8.1f} -> {current["duration_ms"]["p50"]:8.1f} ms '
+                f'({change:+.0%})  queries {before["queries"]} -> {current["queries"]}'
+            )
+            regressed = change > 0.2 or current['queries'] > before['queries']
+            self.stdout.write(self.style.WARNING(line) if regressed else line)
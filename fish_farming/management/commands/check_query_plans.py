@@ -0,0 +1,18 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+TEST_LABEL = 'fish_farming.tests.QueryPlanTests'
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot report queries and check each one uses its composite index (runs QueryPlanTests)'
+
+    def handle(self, *args, **options):
+        try:
+            call_command('test', TEST_LABEL, verbosity=options['verbosity'], interactive=False)
+        except SystemExit as e:
+            # The test runner exits non-zero when a query does not use its index
+            if e.code:
+                raise CommandError('Some hot queries do not use their index; see the plans above')
+        self.stdout.write(self.style.SUCCESS('Completed! All hot queries use an index'))
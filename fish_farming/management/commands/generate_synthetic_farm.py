@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from fish_farming.synthetic import SPECIES, SyntheticFarm
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic farm (users x ponds x species x days of history) for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1,
+            help='Number of users (default: 1)',
+        )
+        parser.add_argument(
+            '--ponds',
+            type=int,
+            default=4,
+            help='Ponds per user (default: 4)',
+        )
+        parser.add_argument(
+            '--species',
+            type=int,
+            default=2,
+            help=f'Species stocked per pond, 1 to {len(SPECIES)} (default: 2)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=180,
+            help='Days of history per pond (default: 180)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1,
+            help='Random seed; the same seed and options give the same data (default: 1)',
+        )
+        parser.add_argument(
+            '--start-date',
+            help='First day of history, YYYY-MM-DD (default: --days before today). Fix it to compare runs on different days',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='synthetic',
+            help='Username prefix; users are named <prefix>-s<seed>-u<n> (default: synthetic)',
+        )
+        parser.add_argument(
+            '--password',
+            help='Password of the generated users (default: none, they cannot log in)',
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Delete the users of a previous run with the same prefix and seed first',
+        )
+        parser.add_argument(
+            '--skip-kpis',
+            action='store_true',
+            help='Do not materialize KPI rows (run materialize_kpis later)',
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'ponds', 'days'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be at least 1')
+        if options['start_date']:
+            try:
+                start_date = date.fromisoformat(options['start_date'])
+            except ValueError:
+                raise CommandError(f'Invalid --start-date: {options["start_date"]}. Use YYYY-MM-DD')
+        else:
+            start_date = date.today() - timedelta(days=options['days'] - 1)
+
+        try:
+            farm = SyntheticFarm(
+                seed=options['seed'],
+                users=options['users'],
+                ponds=options['ponds'],
+                species=options['species'],
+                days=options['days'],
+                start_date=start_date,
+                prefix=options['prefix'],
+                password=options['password'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        existing = User.objects.filter(username__in=farm.usernames())
+        if existing.exists():
+            if not options['replace']:
+                raise CommandError(
+                    f'{existing.count()} users of seed {options["seed"]} already exist. Use --replace or another --seed'
+                )
+            self.stdout.write(f'Deleting {existing.count()} users of a previous run...')
+            existing.delete()
+
+        self.stdout.write(
+            f'Generating {options["users"]} users x {options["ponds"]} ponds x {options["species"]} species, '
+            f'{options["days"]} days from {start_date}...'
+        )
+        pond_ids = farm.generate(
+            kpis=not options['skip_kpis'],
+            progress=lambda username: self.stdout.write(f'  {username}'),
+        )
+
+        for name, count in farm.counts.items():
+            self.stdout.write(f'{count} {name}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Completed! Created {options["users"]} users with {len(pond_ids)} ponds')
+        )
@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from fish_farming.importer import RECORD_TYPES, RecordImporter, RowError, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Import historical records (stocking, feeds, daily logs, samplings, mortality, harvests, expenses, incomes) from a CSV/TSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'record_type',
+            choices=sorted(RECORD_TYPES),
+            help='Kind of records in the file',
+        )
+        parser.add_argument(
+            'path',
+            help='CSV/TSV file to import, or - for standard input',
+        )
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Username owning the records; ponds are looked up among their ponds',
+        )
+        parser.add_argument(
+            '--config',
+            help='JSON file with "columns" ({"file column": "field"}), "delimiter" and "date_format"',
+        )
+        parser.add_argument(
+            '--map',
+            action='append',
+            default=[],
+            metavar='COLUMN=FIELD',
+            help='Map a file column to a model field (repeatable, overrides --config)',
+        )
+        parser.add_argument(
+            '--delimiter',
+            help='Field delimiter (default: tab for .tsv files, comma otherwise)',
+        )
+        parser.add_argument(
+            '--date-format',
+            help='strptime format of date columns (default: YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--encoding',
+            default='utf-8-sig',
+            help='File encoding (default: utf-8-sig)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows inserted per chunk (default: 2000)',
+        )
+        parser.add_argument(
+            '--create-missing',
+            action='store_true',
+            help='Create species and feed/sample/expense/income types that do not exist yet',
+        )
+        parser.add_argument(
+            '--update-existing',
+            action='store_true',
+            help='Overwrite stored rows with the same key (stocking, daily logs, fish sampling) instead of skipping them',
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=100,
+            help='Stop after this many invalid rows (default: 100)',
+        )
+        parser.add_argument(
+            '--skip-kpis',
+            action='store_true',
+            help='Do not refresh KPI rows afterwards (run materialize_kpis later)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and import everything, then roll back',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" does not exist')
+
+        config = {}
+        if options.get('config'):
+            try:
+                with open(options['config'], encoding='utf-8') as f:
+                    config = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read --config: {e}')
+        columns = dict(config.get('columns', {}))
+        for mapping in options['map']:
+            column, sep, field = mapping.partition('=')
+            if not sep:
+                raise CommandError(f'Invalid --map {mapping!r}. Use COLUMN=FIELD')
+            columns[column.strip()] = field.strip()
+
+        path = options['path']
+        delimiter = options.get('delimiter') or config.get('delimiter')
+        if delimiter is None:
+            delimiter = '\t' if os.path.splitext(path)[1].lower() in ('.tsv', '.tab') else ','
+        elif delimiter in ('\\t', 'tab'):
+            delimiter = '\t'
+
+        importer = RecordImporter(
+            RECORD_TYPES[options['record_type']],
+            user,
+            columns=columns,
+            date_format=options.get('date_format') or config.get('date_format'),
+            create_missing=options['create_missing'],
+            update_existing=options['update_existing'],
+            batch_size=options['batch_size'],
+        )
+
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding=options['encoding'])
+        except OSError as e:
+            raise CommandError(f'Could not open {path}: {e}')
+
+        try:
+            if options['dry_run']:
+                with transaction.atomic():
+                    errors = self.run(importer, stream, delimiter, options)
+                    transaction.set_rollback(True)
+            else:
+                errors = self.run(importer, stream, delimiter, options)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for name, count in importer.created.items():
+            self.stdout.write(f'Created {count} new {name} rows')
+        summary = f'{importer.inserted} new rows from {importer.read} read, {errors} invalid'
+        if importer.written > importer.inserted:
+            verb = 'updated' if options['update_existing'] else 'skipped as already stored'
+            summary += f', {importer.written - importer.inserted} {verb}'
+        if importer.replaced:
+            summary += f', {importer.replaced} replaced by a later line'
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run, nothing saved: {summary}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Completed! {summary}'))
+
+    def run(self, importer, stream, delimiter, options):
+        fieldnames, rows = read_rows(stream, delimiter)
+        try:
+            unknown = importer.map_header(fieldnames)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if unknown:
+            self.stdout.write(self.style.WARNING(f'Ignoring columns: {", ".join(unknown)}'))
+
+        errors = 0
+        for line, row in rows:
+            try:
+                warning = importer.add(row, line)
+                if warning:
+                    self.stdout.write(self.style.WARNING(f'Line {line}: {warning}'))
+            except RowError as e:
+                errors += 1
+                self.stdout.write(self.style.WARNING(f'Skipping line {line}: {e}'))
+                if errors > options['max_errors']:
+                    importer.finish(kpis=not options['skip_kpis'])
+                    raise CommandError(
+                        f'Stopped after {errors} invalid rows; {importer.inserted} rows were already imported'
+                    )
+            if importer.read % 100000 == 0:
+                self.stdout.write(f'  {importer.read} rows read...')
+
+        self.stdout.write('Recomputing derived data...')
+        importer.finish(kpis=not options['skip_kpis'])
+        return errors
@@ -0,0 +1,44 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from fish_farming.kpis import materialize_kpis
+
+
+class Command(BaseCommand):
+    help = 'Fill daily KPI dashboard rows for each pond from the raw records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pond-id',
+            type=int,
+            help='Materialize KPIs for specific pond only',
+        )
+        parser.add_argument(
+            '--since',
+            help='Recompute KPI rows from this date (YYYY-MM-DD) onwards',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute the whole history instead of resuming from the latest KPI row',
+        )
+
+    def handle(self, *args, **options):
+        pond_id = options.get('pond_id')
+        since = options.get('since')
+        if since:
+            try:
+                since = date.fromisoformat(since)
+            except ValueError:
+                raise CommandError(f'Invalid --since date: {since}. Use YYYY-MM-DD')
+
+        written = materialize_kpis(
+            pond_ids=[pond_id] if pond_id else None,
+            since=since,
+            rebuild=options.get('rebuild'),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Completed! Wrote {sum(written.values())} KPI rows for {len(written)} ponds'
+            )
+        )
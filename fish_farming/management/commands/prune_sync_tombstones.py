@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from fish_farming.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help=f'Keep tombstones of the last DAYS days (default: {settings.SYNC_TOMBSTONE_RETENTION_DAYS})',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days < settings.SYNC_TOMBSTONE_RETENTION_DAYS:
+            # Sync still accepts cursors from that far back
+            raise CommandError(
+                f'--days must be at least SYNC_TOMBSTONE_RETENTION_DAYS ({settings.SYNC_TOMBSTONE_RETENTION_DAYS})'
+            )
+        deleted = prune_tombstones(timezone.now() - timedelta(days=days))
+        self.stdout.write(self.style.SUCCESS(f'Completed! Deleted {deleted} tombstones'))
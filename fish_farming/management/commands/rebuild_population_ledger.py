@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from fish_farming.population import rebuild_ledger, verify_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild or verify the population ledger from stocking, mortality and harvest records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pond-id',
+            type=int,
+            help='Rebuild the ledger for specific pond only',
+        )
+        parser.add_argument(
+            '--verify-only',
+            action='store_true',
+            help='Only compare the ledger with the raw records, without writing',
+        )
+
+    def handle(self, *args, **options):
+        pond_id = options.get('pond_id')
+        pond_ids = [pond_id] if pond_id else None
+
+        if options.get('verify_only'):
+            mismatches = verify_ledger(pond_ids)
+            for mismatch in mismatches:
+                self.stdout.write(self.style.WARNING(f'  {mismatch}'))
+            if mismatches:
+                raise CommandError(f'Population ledger has {len(mismatches)} mismatches')
+            self.stdout.write(self.style.SUCCESS('Population ledger matches the raw records'))
+            return
+
+        written = rebuild_ledger(pond_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f'Completed! Wrote {written} population ledger rows')
+        )
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:00
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def build_ledger(apps, schema_editor):
+    """Populate the ledger from existing stocking, mortality and harvest rows"""
+    PopulationLedger = apps.get_model('fish_farming', 'PopulationLedger')
+    sources = [
+        ('Stocking', 'stocked', 'pcs'),
+        ('Mortality', 'mortality', 'count'),
+        ('Harvest', 'harvested', 'total_count'),
+    ]
+    fields = [field for _, field, _ in sources]
+
+    movements = defaultdict(lambda: dict.fromkeys(fields, 0))
+    for model_name, field, count_field in sources:
+        rows = apps.get_model('fish_farming', model_name).objects.values('pond_id', 'species_id', 'date')
+        for row in rows.annotate(total=Sum(count_field)).order_by():
+            movements[(row['pond_id'], row['species_id'], row['date'])][field] += row['total'] or 0
+
+    entries = []
+    running = defaultdict(lambda: dict.fromkeys(fields, 0))
+    for (pond_id, species_id, date), counts in sorted(movements.items(), key=lambda item: (item[0][0], item[0][1] or 0, item[0][2])):
+        totals = running[(pond_id, species_id)]
+        for field in fields:
+            totals[field] += counts[field]
+        entries.append(PopulationLedger(
+            pond_id=pond_id,
+            species_id=species_id,
+            date=date,
+            **counts,
+            **{f'cumulative_{field}': totals[field] for field in fields},
+        ))
+    PopulationLedger.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0007_update_all_models_to_10_decimal_places'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopulationLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('stocked', models.IntegerField(default=0)),
+                ('mortality', models.IntegerField(default=0)),
+                ('harvested', models.IntegerField(default=0)),
+                ('cumulative_stocked', models.IntegerField(default=0)),
+                ('cumulative_mortality', models.IntegerField(default=0)),
+                ('cumulative_harvested', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pond', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='population_ledger', to='fish_farming.pond')),
+                ('species', models.ForeignKey(blank=True, help_text='Empty for mortality/harvest recorded without a species', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='population_ledger', to='fish_farming.species')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('pond', 'species', 'date')},
+            },
+        ),
+        migrations.RunPython(build_ledger, migrations.RunPython.noop),
+    ]
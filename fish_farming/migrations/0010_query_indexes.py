@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0009_change_tracking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['pond', 'created_at'], name='alert_pond_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'date'], name='expense_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['pond', 'date'], name='expense_pond_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feed',
+            index=models.Index(fields=['pond', 'date'], name='feed_pond_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedingadvice',
+            index=models.Index(fields=['pond', 'species', 'date'], name='advice_pond_sp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedingadvice',
+            index=models.Index(condition=models.Q(('is_applied', True)), fields=['pond', 'species', 'applied_date'], name='advice_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fishsampling',
+            index=models.Index(fields=['pond', 'date'], name='fishsampling_pond_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='harvest',
+            index=models.Index(fields=['pond', 'species', 'date'], name='harvest_pond_sp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'date'], name='income_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['pond', 'date'], name='income_pond_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mortality',
+            index=models.Index(fields=['pond', 'species', 'date'], name='mortality_pond_sp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sampling',
+            index=models.Index(fields=['pond', 'date'], name='sampling_pond_date_idx'),
+        ),
+    ]
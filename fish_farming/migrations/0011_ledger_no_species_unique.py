@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:08
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_rows(apps, schema_editor):
+    """Fold duplicate species-less ledger rows into one and redo their running totals"""
+    PopulationLedger = apps.get_model('fish_farming', 'PopulationLedger')
+    fields = ['stocked', 'mortality', 'harvested']
+    unspecified = PopulationLedger.objects.filter(species__isnull=True)
+    duplicated = (
+        unspecified.values('pond_id', 'date').annotate(rows=Count('id')).filter(rows__gt=1).order_by()
+    )
+    pond_ids = {row['pond_id'] for row in duplicated}
+    for pond_id in pond_ids:
+        kept = {}
+        for row in unspecified.filter(pond_id=pond_id).order_by('date', 'id'):
+            first = kept.get(row.date)
+            if first is None:
+                kept[row.date] = row
+                continue
+            for field in fields:
+                setattr(first, field, getattr(first, field) + getattr(row, field))
+            row.delete()
+        running = dict.fromkeys(fields, 0)
+        for date in sorted(kept):
+            row = kept[date]
+            for field in fields:
+                running[field] += getattr(row, field)
+                setattr(row, f'cumulative_{field}', running[field])
+            row.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0010_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='populationledger',
+            constraint=models.UniqueConstraint(condition=models.Q(('species__isnull', True)), fields=('pond', 'date'), name='ledger_pond_date_no_species_uniq'),
+        ),
+    ]
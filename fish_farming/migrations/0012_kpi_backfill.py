@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fish_farming', '0011_ledger_no_species_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KPIBackfill',
+            fields=[
+                ('pond', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='kpi_backfill', serialize=False, to='fish_farming.pond')),
+                ('since', models.DateField()),
+                ('requested_at', models.DateTimeField(help_text='Time of the latest write that marked the pond')),
+            ],
+        ),
+    ]
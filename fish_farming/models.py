@@ -1,9 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db.models import Sum
 from decimal import Decimal
 
+from .feeding_stages import find_feeding_band
+
 
 class Pond(models.Model):
     """Pond management model"""
@@ -15,7 +17,7 @@ class Pond(models.Model):
     location = models.CharField(max_length=200, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['name']
@@ -63,6 +65,7 @@ class Species(models.Model):
     optimal_ph_min = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
     optimal_ph_max = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['name']
@@ -84,6 +87,7 @@ class Stocking(models.Model):
     initial_avg_weight_kg = models.DecimalField(max_digits=15, decimal_places=10, default=0, help_text="Initial average weight in kg")
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
@@ -93,6 +97,14 @@ class Stocking(models.Model):
         return f"{self.pond.name} - {self.species.name} ({self.date})"
     
     def save(self, *args, **kwargs):
+        self.calculate_derived_fields()
+        
+        # Keep the row and its population ledger entry in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def calculate_derived_fields(self):
+        """Fill pieces per kg, total weight and average weight from each other"""
         # Auto-calculate pieces_per_kg if pcs and total_weight_kg are provided and pieces_per_kg is not already set
         if self.pcs and self.total_weight_kg and self.total_weight_kg > 0 and not self.pieces_per_kg:
             self.pieces_per_kg = self.pcs / self.total_weight_kg
@@ -105,8 +117,6 @@ class Stocking(models.Model):
         elif self.pcs and self.pieces_per_kg and (not self.total_weight_kg or self.total_weight_kg == 0):
             self.total_weight_kg = self.pcs / self.pieces_per_kg
             self.initial_avg_weight_kg = self.total_weight_kg / self.pcs
-        
-        super().save(*args, **kwargs)
 
 
 class DailyLog(models.Model):
@@ -121,6 +131,7 @@ class DailyLog(models.Model):
     nitrite = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
@@ -136,6 +147,7 @@ class FeedType(models.Model):
     protein_content = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Protein content %")
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['name']
@@ -163,14 +175,23 @@ class Feed(models.Model):
     
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['pond', 'date'], name='feed_pond_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.pond.name} - {self.feed_type.name} ({self.date})"
     
     def save(self, *args, **kwargs):
+        self.calculate_derived_fields()
+        super().save(*args, **kwargs)
+    
+    def calculate_derived_fields(self):
+        """Fill total cost and feeding rate from the entered amounts"""
         # Auto-calculate total cost based on input method
         if self.cost_per_packet and self.packet_size_kg and not self.total_cost:
             # Calculate cost when using packets
@@ -213,8 +234,6 @@ class Feed(models.Model):
             else:
                 biomass_decimal = self.biomass_at_feeding_kg
             self.feeding_rate_percent = (amount_kg_decimal / biomass_decimal) * 100
-        
-        super().save(*args, **kwargs)
 
 
 class SampleType(models.Model):
@@ -225,6 +244,7 @@ class SampleType(models.Model):
     color = models.CharField(max_length=20, default='blue', help_text="Color theme for UI display")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['name']
@@ -253,9 +273,13 @@ class Sampling(models.Model):
     fish_length_cm = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['pond', 'date'], name='sampling_pond_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.pond.name} - {self.sample_type.name} ({self.date})"
@@ -272,9 +296,13 @@ class Mortality(models.Model):
     cause = models.CharField(max_length=200, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['pond', 'species', 'date'], name='mortality_pond_sp_date_idx'),
+        ]
         verbose_name_plural = 'Mortalities'
     
     def __str__(self):
@@ -290,23 +318,33 @@ class Mortality(models.Model):
                 species=self.species
             ).order_by('-date').first()
             
-            if latest_sampling and latest_sampling.average_weight_kg:
-                self.avg_weight_kg = latest_sampling.average_weight_kg
-            else:
-                # Fallback: get from latest stocking data
+            # Fallback: get from latest stocking data
+            latest_stocking = None
+            if not (latest_sampling and latest_sampling.average_weight_kg):
                 latest_stocking = Stocking.objects.filter(
                     pond=self.pond, 
                     species=self.species
                 ).order_by('-date').first()
-                
-                if latest_stocking and latest_stocking.initial_avg_weight_kg:
-                    self.avg_weight_kg = latest_stocking.initial_avg_weight_kg
+            
+            self.apply_default_weight(latest_sampling, latest_stocking)
+        
+        self.calculate_total_weight()
         
+        # Keep the row and its population ledger entry in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def apply_default_weight(self, latest_sampling, latest_stocking):
+        """Take the average weight from the latest sampling, else the latest stocking"""
+        if latest_sampling and latest_sampling.average_weight_kg:
+            self.avg_weight_kg = latest_sampling.average_weight_kg
+        elif latest_stocking and latest_stocking.initial_avg_weight_kg:
+            self.avg_weight_kg = latest_stocking.initial_avg_weight_kg
+    
+    def calculate_total_weight(self):
         # Auto-calculate total_weight_kg
         if self.count and self.avg_weight_kg:
             self.total_weight_kg = self.count * self.avg_weight_kg
-        
-        super().save(*args, **kwargs)
 
 
 class Harvest(models.Model):
@@ -322,15 +360,27 @@ class Harvest(models.Model):
     total_revenue = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['pond', 'species', 'date'], name='harvest_pond_sp_date_idx'),
+        ]
     
     def __str__(self):
         species_name = self.species.name if self.species else "Mixed"
         return f"{self.pond.name} - {species_name} - {self.total_weight_kg}kg ({self.date})"
     
     def save(self, *args, **kwargs):
+        self.calculate_derived_fields()
+        
+        # Keep the row and its population ledger entry in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def calculate_derived_fields(self):
+        """Fill pieces per kg, average weight, count and revenue from the entered values"""
         # Auto-calculate pieces_per_kg if total_count and total_weight_kg are provided
         if self.total_count and self.total_weight_kg and self.total_weight_kg > 0 and not self.pieces_per_kg:
             self.pieces_per_kg = self.total_count / self.total_weight_kg
@@ -344,7 +394,6 @@ class Harvest(models.Model):
         # Auto-calculate revenue if price is provided
         if self.price_per_kg and not self.total_revenue:
             self.total_revenue = self.total_weight_kg * self.price_per_kg
-        super().save(*args, **kwargs)
 
 
 class ExpenseType(models.Model):
@@ -361,6 +410,7 @@ class ExpenseType(models.Model):
     ])
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['category', 'name']
@@ -382,6 +432,7 @@ class IncomeType(models.Model):
     ])
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['category', 'name']
@@ -403,9 +454,14 @@ class Expense(models.Model):
     supplier = models.CharField(max_length=200, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='expense_user_date_idx'),
+            models.Index(fields=['pond', 'date'], name='expense_pond_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.expense_type.name} - ৳{self.amount} ({self.date})"
@@ -424,9 +480,14 @@ class Income(models.Model):
     customer = models.CharField(max_length=200, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='income_user_date_idx'),
+            models.Index(fields=['pond', 'date'], name='income_pond_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.income_type.name} - ৳{self.amount} ({self.date})"
@@ -442,7 +503,7 @@ class InventoryFeed(models.Model):
     batch_number = models.CharField(max_length=100, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['feed_type__name']
@@ -462,6 +523,7 @@ class Treatment(models.Model):
     reason = models.TextField(blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
@@ -487,9 +549,13 @@ class Alert(models.Model):
     resolved_at = models.DateTimeField(null=True, blank=True)
     resolved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['pond', 'created_at'], name='alert_pond_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.pond.name} - {self.alert_type} ({self.severity})"
@@ -502,7 +568,7 @@ class Setting(models.Model):
     value = models.TextField()
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['key']
@@ -521,6 +587,7 @@ class FeedingBand(models.Model):
     frequency_per_day = models.PositiveIntegerField(default=1)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['min_weight_g']
@@ -545,6 +612,7 @@ class EnvAdjustment(models.Model):
     reason = models.TextField(blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
@@ -579,6 +647,7 @@ class KPIDashboard(models.Model):
     
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
@@ -615,18 +684,30 @@ class FishSampling(models.Model):
     # Notes and observations
     notes = models.TextField(blank=True, help_text="Observations and notes about the sampling")
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date', '-created_at']
         unique_together = ['pond', 'species', 'date']
+        indexes = [
+            # Samplings of a pond across species; the unique key covers per-species lookups
+            models.Index(fields=['pond', 'date'], name='fishsampling_pond_date_idx'),
+        ]
     
     def __str__(self):
         species_name = self.species.name if self.species else "Mixed"
         return f"{self.pond.name} - {species_name} Sampling ({self.date})"
     
     def save(self, *args, **kwargs):
-        # Auto-calculate derived metrics
+        self.calculate_derived_metrics()
+        
+        # Always calculate growth rate before saving
+        self.calculate_growth_rate()
+        
+        super().save(*args, **kwargs)
+    
+    def calculate_derived_metrics(self):
+        """Average weight, fish per kg and condition factor of the sample"""
         if self.total_weight_kg and self.sample_size:
             # Calculate average weight in kg
             self.average_weight_kg = self.total_weight_kg / self.sample_size
@@ -637,11 +718,6 @@ class FishSampling(models.Model):
             # Calculate condition factor (simplified version)
             if self.average_weight_kg:
                 self.condition_factor = self.average_weight_kg * 1000  # Simplified calculation
-        
-        # Always calculate growth rate before saving
-        self.calculate_growth_rate()
-        
-        super().save(*args, **kwargs)
     
     def calculate_growth_rate(self):
         """Calculate daily growth rate and biomass difference based on previous sampling or initial stocking"""
@@ -669,6 +745,7 @@ class FishSampling(models.Model):
             ).order_by('-date').first()
         
         # If no previous sampling found, compare with initial stocking data
+        latest_stocking = None
         if not previous_sampling:
             # This is the first sampling - compare with initial stocking
             if self.species:
@@ -682,7 +759,17 @@ class FishSampling(models.Model):
                 latest_stocking = Stocking.objects.filter(
                     pond=self.pond
                 ).order_by('-date').first()
-            
+        
+        self.apply_growth_metrics(previous_sampling, latest_stocking, self.estimate_total_fish_count)
+    
+    def apply_growth_metrics(self, previous_sampling, latest_stocking, fish_count):
+        """Set growth rate and biomass difference from an already resolved baseline.
+        
+        ``previous_sampling`` takes precedence; ``latest_stocking`` is only used when
+        there is no previous sampling. ``fish_count`` is a callable returning the
+        current number of fish, evaluated only when a biomass difference is needed.
+        """
+        if not previous_sampling:
             if latest_stocking and latest_stocking.total_weight_kg and latest_stocking.pcs:
                 # Calculate days since stocking
                 days_diff = (self.date - latest_stocking.date).days
@@ -700,7 +787,7 @@ class FishSampling(models.Model):
                     
                     # Calculate total biomass difference
                     # Use current fish count (stocked - mortality - harvested)
-                    total_fish_count = self.estimate_total_fish_count()
+                    total_fish_count = fish_count()
                     if total_fish_count:
                         self.biomass_difference_kg = Decimal(str(weight_diff * total_fish_count))
                     else:
@@ -726,7 +813,7 @@ class FishSampling(models.Model):
                     
                     # Calculate total biomass difference
                     # Estimate total fish count in pond based on stocking and mortality data
-                    total_fish_count = self.estimate_total_fish_count()
+                    total_fish_count = fish_count()
                     if total_fish_count:
                         self.biomass_difference_kg = Decimal(str(weight_diff * total_fish_count))
                     else:
@@ -740,42 +827,12 @@ class FishSampling(models.Model):
     
     def estimate_total_fish_count(self):
         """Estimate total fish count in pond based on stocking, mortality, and harvest data"""
+        # Imported here because the ledger helpers import this module
+        from .population import population_totals
+
         try:
-            # Get total stocked fish for this species (or all species if no species specified)
-            if self.species:
-                total_stocked = Stocking.objects.filter(pond=self.pond, species=self.species).aggregate(
-                    total=models.Sum('pcs')
-                )['total'] or 0
-                
-                # Get total mortality for this species
-                total_mortality = Mortality.objects.filter(pond=self.pond, species=self.species).aggregate(
-                    total=models.Sum('count')
-                )['total'] or 0
-                
-                # Get total harvested for this species
-                total_harvested = Harvest.objects.filter(pond=self.pond, species=self.species).aggregate(
-                    total=models.Sum('total_count')
-                )['total'] or 0
-            else:
-                # If no species specified, use all species in the pond
-                total_stocked = Stocking.objects.filter(pond=self.pond).aggregate(
-                    total=models.Sum('pcs')
-                )['total'] or 0
-                
-                # Get total mortality
-                total_mortality = Mortality.objects.filter(pond=self.pond).aggregate(
-                    total=models.Sum('count')
-                )['total'] or 0
-                
-                # Get total harvested
-                total_harvested = Harvest.objects.filter(pond=self.pond).aggregate(
-                    total=models.Sum('total_count')
-                )['total'] or 0
-            
-            # Calculate current alive fish
-            current_alive = total_stocked - total_mortality - total_harvested
-            
-            return max(0, current_alive)
+            # Species-specific count, or all species in the pond if no species specified
+            return population_totals(self.pond_id, self.species_id)['current_count']
         except Exception:
             return None
 
@@ -817,10 +874,19 @@ class FeedingAdvice(models.Model):
     
     notes = models.TextField(blank=True, help_text="Additional notes and observations")
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['pond', 'species', 'date'], name='advice_pond_sp_date_idx'),
+            # The latest applied advice per pond/species
+            models.Index(
+                fields=['pond', 'species', 'applied_date'],
+                condition=models.Q(is_applied=True),
+                name='advice_applied_idx',
+            ),
+        ]
     
     def __str__(self):
         species_name = self.species.name if self.species else "Mixed"
@@ -828,6 +894,15 @@ class FeedingAdvice(models.Model):
     
     def save(self, *args, **kwargs):
         # Auto-calculate derived metrics
+        self.apply_feeding_metrics(find_feeding_band)
+        super().save(*args, **kwargs)
+    
+    def apply_feeding_metrics(self, find_feeding_band):
+        """Derive biomass, feeding rate, feed amount and cost from the advice inputs.
+        
+        ``find_feeding_band`` is called with the average weight in grams and
+        returns the matching FeedingBand or None.
+        """
         if self.estimated_fish_count and self.average_fish_weight_kg:
             # Calculate total biomass
             self.total_biomass_kg = self.estimated_fish_count * self.average_fish_weight_kg
@@ -841,10 +916,7 @@ class FeedingAdvice(models.Model):
                     avg_weight_g = 0
                 
                 # Find the appropriate feeding band
-                feeding_band = FeedingBand.objects.filter(
-                    min_weight_g__lte=avg_weight_g,
-                    max_weight_g__gte=avg_weight_g
-                ).first()
+                feeding_band = find_feeding_band(avg_weight_g)
                 
                 if feeding_band:
                     # Use the feeding band's rate
@@ -880,8 +952,6 @@ class FeedingAdvice(models.Model):
                         self.daily_feed_cost = self.recommended_feed_kg * self.feed_cost_per_kg
                     except (ValueError, TypeError):
                         self.daily_feed_cost = Decimal('0')
-        
-        super().save(*args, **kwargs)
 
 
 class SurvivalRate(models.Model):
@@ -904,7 +974,7 @@ class SurvivalRate(models.Model):
     
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
@@ -922,4 +992,68 @@ class SurvivalRate(models.Model):
         # Calculate total mortality and harvested
         self.total_mortality = self.initial_stocked - self.current_alive - self.total_harvested
         
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class PopulationLedger(models.Model):
+    """Running fish counts per pond and species, one row per date with stock movements"""
+    pond = models.ForeignKey(Pond, on_delete=models.CASCADE, related_name='population_ledger')
+    species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='population_ledger', null=True, blank=True, help_text="Empty for mortality/harvest recorded without a species")
+    date = models.DateField()
+    
+    # Movements on this date
+    stocked = models.IntegerField(default=0)
+    mortality = models.IntegerField(default=0)
+    harvested = models.IntegerField(default=0)
+    
+    # Running totals up to and including this date
+    cumulative_stocked = models.IntegerField(default=0)
+    cumulative_mortality = models.IntegerField(default=0)
+    cumulative_harvested = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['pond', 'species', 'date']
+        constraints = [
+            # NULLs never collide in unique_together, so pond-wide rows need their own constraint
+            models.UniqueConstraint(
+                fields=['pond', 'date'],
+                condition=models.Q(species__isnull=True),
+                name='ledger_pond_date_no_species_uniq',
+            ),
+        ]
+    
+    def __str__(self):
+        species_name = self.species.name if self.species else "Mixed"
+        return f"{self.pond.name} - {species_name} - {self.alive} alive ({self.date})"
+    
+    @property
+    def alive(self):
+        """Fish alive at the end of this date (stocked - mortality - harvested)"""
+        return max(0, self.cumulative_stocked - self.cumulative_mortality - self.cumulative_harvested)
+
+
+class KPIBackfill(models.Model):
+    """Earliest date from which a pond's KPI rows are out of date, cleared by materialize_kpis"""
+    pond = models.OneToOneField(Pond, on_delete=models.CASCADE, primary_key=True, related_name='kpi_backfill')
+    since = models.DateField()
+    requested_at = models.DateTimeField(help_text="Time of the latest write that marked the pond")
+    
+    def __str__(self):
+        return f"{self.pond_id} KPIs stale since {self.since}"
+
+
+class DeletedRecord(models.Model):
+    """Tombstone of a deleted record, so sync clients can drop their copy"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='deleted_records', null=True, blank=True, help_text="Empty for reference data shared by all users")
+    model = models.CharField(max_length=100, help_text="Model label, e.g. fish_farming.feed")
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-deleted_at']
+    
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted ({self.deleted_at})"
@@ -0,0 +1,99 @@
+"""Pagination for the fish farming API.
+
+List endpoints are page-numbered by default. Date-ordered records use keyset
+pagination on ``(date, pk)``: the cursor holds the date and primary key of
+the last row served, so every page is a single indexed range query no matter
+how deep it is.
+"""
+from base64 import b64decode, b64encode
+from datetime import date as date_cls
+from urllib import parse
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+MAX_PAGE_SIZE = 500
+
+
+class StandardPagination(PageNumberPagination):
+    """Page-number pagination with a client-selectable, capped page size"""
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+
+class DateKeysetPagination(CursorPagination):
+    """Newest-first keyset pagination on ``(date, pk)``.
+
+    Unlike ``CursorPagination``, which keys on a single field and falls back to
+    an offset among rows sharing it, the cursor here is the exact
+    ``(date, pk)`` position, so records on the same date never cost extra.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    ordering = ('-date', '-pk')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse = False
+            queryset = queryset.order_by('-date', '-pk')
+        else:
+            reverse, date, pk = self.cursor
+            if reverse:
+                queryset = queryset.filter(Q(date__gt=date) | Q(date=date, pk__gt=pk)).order_by('date', 'pk')
+            else:
+                queryset = queryset.filter(Q(date__lt=date) | Q(date=date, pk__lt=pk)).order_by('-date', '-pk')
+
+        # One extra row tells whether another page follows in this direction
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def decode_cursor(self, request):
+        """Return ``(reverse, date, pk)`` from the request, or ``None`` for the first page"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'), keep_blank_values=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            date = date_cls.fromisoformat(tokens['d'][0])
+            pk = int(tokens['k'][0])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, date, pk
+
+    def encode_cursor(self, row, reverse=False):
+        tokens = {'d': row.date.isoformat(), 'k': row.pk}
+        if reverse:
+            tokens['r'] = '1'
+        encoded = b64encode(parse.urlencode(tokens, doseq=True).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
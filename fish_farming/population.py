@@ -0,0 +1,176 @@
+"""Maintained fish population ledger.
+
+Every Stocking, Mortality and Harvest write is mirrored into
+``PopulationLedger`` (see ``signals.py``), so "how many fish are alive" is a
+single indexed row lookup instead of three ``Sum`` aggregates over the raw
+tables. Lookups by date read the latest ledger row on or before that date.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .db import latest_per_group
+from .models import PopulationLedger, Stocking, Mortality, Harvest
+
+
+# Ledger column fed by each source model, and the source count field
+MOVEMENTS = {
+    Stocking: ('stocked', 'pcs'),
+    Mortality: ('mortality', 'count'),
+    Harvest: ('harvested', 'total_count'),
+}
+
+MOVEMENT_FIELDS = ['stocked', 'mortality', 'harvested']
+LEDGER_FIELDS = MOVEMENT_FIELDS + [f'cumulative_{field}' for field in MOVEMENT_FIELDS]
+
+
+def movement_of(instance):
+    """Return ``(pond_id, species_id, date, field, count)`` for a source row"""
+    field, count_field = MOVEMENTS[type(instance)]
+    return (instance.pond_id, instance.species_id, instance.date, field, getattr(instance, count_field) or 0)
+
+
+def record_movement(pond_id, species_id, date, field, delta):
+    """Add ``delta`` fish to one movement column and shift all later running totals"""
+    if not delta:
+        return
+    cumulative_field = f'cumulative_{field}'
+    with transaction.atomic():
+        ledger = PopulationLedger.objects.filter(pond_id=pond_id, species_id=species_id)
+        row = ledger.select_for_update().filter(date=date).first()
+        if row is None:
+            previous = ledger.filter(date__lt=date).order_by('-date').first()
+            row = PopulationLedger.objects.create(
+                pond_id=pond_id,
+                species_id=species_id,
+                date=date,
+                cumulative_stocked=previous.cumulative_stocked if previous else 0,
+                cumulative_mortality=previous.cumulative_mortality if previous else 0,
+                cumulative_harvested=previous.cumulative_harvested if previous else 0,
+            )
+        PopulationLedger.objects.filter(pk=row.pk).update(**{field: F(field) + delta})
+        ledger.filter(date__gte=date).update(**{cumulative_field: F(cumulative_field) + delta})
+        # Dates without movements carry no information
+        PopulationLedger.objects.filter(pk=row.pk, stocked=0, mortality=0, harvested=0).delete()
+
+
+def _totals(rows):
+    """Population summary for a set of ledger rows (one per species)"""
+    total_stocked = sum(row.cumulative_stocked for row in rows)
+    total_mortality = sum(row.cumulative_mortality for row in rows)
+    total_harvested = sum(row.cumulative_harvested for row in rows)
+    return {
+        'total_stocked': total_stocked,
+        'total_mortality': total_mortality,
+        'total_harvested': total_harvested,
+        'current_count': max(0, total_stocked - total_mortality - total_harvested),
+    }
+
+
+def _latest_rows(ledger):
+    """The latest ledger row of every pond/species in ``ledger``, in one query"""
+    return list(latest_per_group(ledger, ['pond_id', 'species_id'], ['-date']))
+
+
+def population_totals(pond_id, species_id=None, as_of=None):
+    """Stocked, mortality, harvested and alive counts for a pond.
+
+    With ``species_id`` this is a single indexed lookup; without it the totals
+    cover every species in the pond, including mortality and harvests recorded
+    without a species. ``as_of`` limits the totals to movements on or before
+    that date.
+    """
+    ledger = PopulationLedger.objects.filter(pond_id=pond_id)
+    if as_of is not None:
+        ledger = ledger.filter(date__lte=as_of)
+    if species_id is not None:
+        row = ledger.filter(species_id=species_id).order_by('-date').first()
+        return _totals([row] if row else [])
+    return _totals(_latest_rows(ledger))
+
+
+def current_populations(pond_ids, as_of=None):
+    """Current totals for many ponds at once.
+
+    Returns ``{(pond_id, species_id): totals}`` for every species and
+    ``{(pond_id, None): totals}`` for the pond as a whole. ``as_of`` works as
+    in ``population_totals``.
+    """
+    ledger = PopulationLedger.objects.filter(pond_id__in=pond_ids)
+    if as_of is not None:
+        ledger = ledger.filter(date__lte=as_of)
+    by_pond = defaultdict(list)
+    result = {}
+    for row in _latest_rows(ledger):
+        by_pond[row.pond_id].append(row)
+        if row.species_id is not None:
+            result[(row.pond_id, row.species_id)] = _totals([row])
+    for pond_id, rows in by_pond.items():
+        result[(pond_id, None)] = _totals(rows)
+    return result
+
+
+def expected_ledger(pond_ids=None):
+    """Build the ledger rows implied by the raw Stocking/Mortality/Harvest tables"""
+    movements = defaultdict(lambda: dict.fromkeys(MOVEMENT_FIELDS, 0))
+    for model, (field, count_field) in MOVEMENTS.items():
+        rows = model.objects.all()
+        if pond_ids is not None:
+            rows = rows.filter(pond_id__in=pond_ids)
+        for row in rows.values('pond_id', 'species_id', 'date').annotate(total=Sum(count_field)).order_by():
+            movements[(row['pond_id'], row['species_id'], row['date'])][field] += row['total'] or 0
+
+    entries = []
+    running = defaultdict(lambda: dict.fromkeys(MOVEMENT_FIELDS, 0))
+    for (pond_id, species_id, date), counts in sorted(movements.items(), key=lambda item: (item[0][0], item[0][1] or 0, item[0][2])):
+        if not any(counts.values()):
+            continue
+        totals = running[(pond_id, species_id)]
+        for field in MOVEMENT_FIELDS:
+            totals[field] += counts[field]
+        entries.append(PopulationLedger(
+            pond_id=pond_id,
+            species_id=species_id,
+            date=date,
+            **counts,
+            **{f'cumulative_{field}': totals[field] for field in MOVEMENT_FIELDS},
+        ))
+    return entries
+
+
+def rebuild_ledger(pond_ids=None):
+    """Recreate the ledger from the raw tables; returns the number of rows written"""
+    entries = expected_ledger(pond_ids)
+    with transaction.atomic():
+        existing = PopulationLedger.objects.all()
+        if pond_ids is not None:
+            existing = existing.filter(pond_id__in=pond_ids)
+        existing.delete()
+        PopulationLedger.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+def verify_ledger(pond_ids=None):
+    """Compare the ledger with the raw tables; returns a list of mismatch descriptions"""
+    expected = {(row.pond_id, row.species_id, row.date): row for row in expected_ledger(pond_ids)}
+    actual = PopulationLedger.objects.all()
+    if pond_ids is not None:
+        actual = actual.filter(pond_id__in=pond_ids)
+
+    mismatches = []
+    for row in actual:
+        key = (row.pond_id, row.species_id, row.date)
+        wanted = expected.pop(key, None)
+        if wanted is None:
+            mismatches.append(f'pond {row.pond_id} species {row.species_id} {row.date}: unexpected ledger row')
+            continue
+        for field in LEDGER_FIELDS:
+            if getattr(row, field) != getattr(wanted, field):
+                mismatches.append(
+                    f'pond {row.pond_id} species {row.species_id} {row.date}: '
+                    f'{field} is {getattr(row, field)}, expected {getattr(wanted, field)}'
+                )
+    for pond_id, species_id, date in expected:
+        mismatches.append(f'pond {pond_id} species {species_id} {date}: missing ledger row')
+    return mismatches
@@ -0,0 +1,239 @@
+"""Feed-requirement projection for a pond and species.
+
+``FeedProjection`` loads the sampling, feeding and stocking series once and
+derives the historical growth rate and FCR in memory. ``simulate`` then steps
+the stock forward one day at a time: each day the fish eat the %BW of their
+feeding stage, gain ``feed / FCR`` and lose the recent daily mortality rate
+from the population ledger. The result gives the days to a target biomass and
+the feed and cost curves up to that day.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from itertools import accumulate
+
+from .feeding_stages import get_feeding_stage
+from .models import Feed, FishSampling, Stocking
+from .population import population_totals
+
+
+DEFAULT_GROWTH_RATE = 0.005  # kg/day per fish
+DEFAULT_FCR = 1.5
+MAX_PROJECTION_DAYS = 730
+MORTALITY_WINDOW_DAYS = 30
+DEFAULT_PACKET_SIZE_KG = 25
+
+
+class FeedProjection:
+    """Historical growth/FCR and a day-by-day projection for one pond/species."""
+
+    def __init__(self, pond, species, start_date):
+        self.pond = pond
+        self.species = species
+        self.start_date = start_date
+
+        self.samplings = list(
+            FishSampling.objects.filter(pond=pond, species=species).order_by('date', 'id')
+        )
+        self.latest_stocking = Stocking.objects.filter(
+            pond=pond, species=species
+        ).order_by('-date').first()
+
+        # Feeding is recorded per pond; prefix sums answer any date range
+        feeds = list(
+            Feed.objects.filter(pond=pond).order_by('date', 'id').values_list(
+                'date', 'amount_kg', 'cost_per_kg', 'cost_per_packet', 'packet_size_kg'
+            )
+        )
+        self.feed_dates = [row[0] for row in feeds]
+        self.feed_totals = [0.0] + list(accumulate(float(row[1]) for row in feeds))
+        self.latest_feed = feeds[-1] if feeds else None
+
+        self.population = population_totals(pond.id, species.id)
+        earlier = population_totals(
+            pond.id, species.id, as_of=start_date - timedelta(days=MORTALITY_WINDOW_DAYS)
+        )
+        self.recent_mortality = self.population['total_mortality'] - earlier['total_mortality']
+
+    @property
+    def latest_sampling(self):
+        return self.samplings[-1] if self.samplings else None
+
+    @property
+    def cumulative_biomass_change(self):
+        return sum(float(s.biomass_difference_kg) for s in self.samplings if s.biomass_difference_kg)
+
+    @property
+    def initial_biomass_kg(self):
+        return float(self.latest_stocking.total_weight_kg)
+
+    @property
+    def current_biomass_kg(self):
+        """Latest stocking weight plus the growth recorded by every sampling"""
+        return self.initial_biomass_kg + self.cumulative_biomass_change
+
+    @property
+    def fish_count(self):
+        """Alive fish from the population ledger; 0 once they all died or were harvested"""
+        return self.population['current_count']
+
+    @property
+    def daily_mortality_rate(self):
+        """Share of the stock lost per day over the recent mortality window"""
+        alive = self.population['current_count']
+        if not alive or self.recent_mortality <= 0:
+            return 0.0
+        return min(self.recent_mortality / MORTALITY_WINDOW_DAYS / alive, 1.0)
+
+    @property
+    def feed_cost_per_kg(self):
+        """Price per kg of the most recent feed, if it was recorded"""
+        if self.latest_feed is None:
+            return None
+        _, _, cost_per_kg, cost_per_packet, packet_size_kg = self.latest_feed
+        if cost_per_kg:
+            return float(cost_per_kg)
+        if cost_per_packet:
+            return float(cost_per_packet) / float(packet_size_kg or DEFAULT_PACKET_SIZE_KG)
+        return None
+
+    def feed_between(self, after=None, until=None):
+        """Feed kg with ``after < date <= until`` (open ends when ``None``)"""
+        start = bisect_right(self.feed_dates, after) if after is not None else 0
+        end = bisect_right(self.feed_dates, until) if until is not None else len(self.feed_dates)
+        return self.feed_totals[max(end, start)] - self.feed_totals[start]
+
+    def feed_since(self, date):
+        """Feed kg on or after ``date``"""
+        start = bisect_left(self.feed_dates, date)
+        return self.feed_totals[-1] - self.feed_totals[start]
+
+    def growth_rate(self):
+        """Return ``(kg per fish per day, method)`` from the sampling history"""
+        growth_rate = DEFAULT_GROWTH_RATE
+        method = 'default'
+        latest_sampling = self.latest_sampling
+        if latest_sampling is None:
+            return growth_rate, method
+
+        # Stocking to latest sampling
+        total_days = (latest_sampling.date - self.latest_stocking.date).days
+        if total_days > 0:
+            initial_avg_weight = float(self.latest_stocking.total_weight_kg) / float(self.latest_stocking.pcs)
+            weight_gain_per_fish = float(latest_sampling.average_weight_kg) - initial_avg_weight
+            growth_rate = min(max(weight_gain_per_fish / total_days, 0.001), 0.1)
+            method = 'stocking_to_latest'
+
+        # Positive growth between consecutive samplings
+        period_rates = []
+        for previous, current in zip(self.samplings, self.samplings[1:]):
+            days_diff = (current.date - previous.date).days
+            weight_gain_per_fish = float(current.average_weight_kg) - float(previous.average_weight_kg)
+            if days_diff > 0 and weight_gain_per_fish > 0:
+                period_rates.append(weight_gain_per_fish / days_diff)
+
+        if period_rates:
+            if len(period_rates) >= 2:
+                # 70% recent periods, 30% overall
+                recent_rate = sum(period_rates[-2:]) / len(period_rates[-2:])
+                growth_rate = (recent_rate * 0.7) + (growth_rate * 0.3)
+                method = 'blended_recent_and_overall'
+            else:
+                growth_rate = period_rates[0]
+                method = 'single_sampling_period'
+            growth_rate = min(max(growth_rate, 0.001), 0.1)
+
+        return growth_rate, method
+
+    def feed_conversion_ratio(self):
+        """Return ``(fcr, method, analysis)`` from the feeding and sampling history"""
+        fcr = DEFAULT_FCR
+        method = 'default'
+        analysis = {'total_feeding_records': len(self.feed_dates)}
+        if not self.feed_dates:
+            return fcr, method, analysis
+
+        total_feed_consumed = self.feed_since(self.latest_stocking.date)
+        total_biomass_gain = self.cumulative_biomass_change
+        if total_biomass_gain > 0 and total_feed_consumed > 0:
+            fcr = total_feed_consumed / total_biomass_gain
+            method = 'stocking_to_latest'
+            analysis['fcr_from_stocking'] = fcr
+            analysis['total_feed_consumed'] = total_feed_consumed
+            analysis['total_biomass_gain'] = total_biomass_gain
+
+        period_fcrs = []
+        for previous, current in zip(self.samplings, self.samplings[1:]):
+            period_feeding = self.feed_between(previous.date, current.date)
+            if current.biomass_difference_kg:
+                period_biomass_gain = float(current.biomass_difference_kg)
+                if period_biomass_gain > 0 and period_feeding > 0:
+                    period_fcrs.append(period_feeding / period_biomass_gain)
+
+        if period_fcrs:
+            avg_period_fcr = sum(period_fcrs) / len(period_fcrs)
+            if len(period_fcrs) >= 2:
+                # 70% recent periods, 30% all periods
+                recent_fcr = sum(period_fcrs[-2:]) / len(period_fcrs[-2:])
+                fcr = (recent_fcr * 0.7) + (avg_period_fcr * 0.3)
+                method = 'weighted_recent_periods'
+            else:
+                fcr = avg_period_fcr
+                method = 'single_period'
+            analysis['period_fcrs'] = period_fcrs
+            analysis['avg_period_fcr'] = avg_period_fcr
+
+        # Last 30 days before the latest sampling
+        latest_date = self.latest_sampling.date
+        recent_cutoff = latest_date - timedelta(days=30)
+        start = bisect_left(self.feed_dates, recent_cutoff)
+        analysis['recent_feeding_records'] = len(self.feed_dates) - start
+        analysis['recent_total_feed'] = self.feed_since(recent_cutoff)
+        if analysis['recent_feeding_records']:
+            analysis['daily_feeding_rate'] = analysis['recent_total_feed'] / (latest_date - recent_cutoff).days
+
+        return min(max(fcr, 0.8), 3.0), method, analysis
+
+    def simulate(self, target_biomass_kg, fcr, horizon=MAX_PROJECTION_DAYS):
+        """Project the stock day by day until it reaches ``target_biomass_kg``.
+
+        Day 0 is ``start_date`` at the current biomass and the average weight of
+        the latest sampling. Returns the day the target is reached (``None``
+        when it is not reached within ``horizon`` days) and per-day curves:
+        biomass and fish count at the start of the day, the feed given that
+        day, and the cumulative feed and cost up to and including it.
+        """
+        weight_kg = float(self.latest_sampling.average_weight_kg)
+        biomass = self.current_biomass_kg
+        fish = float(self.fish_count)
+        survival = 1.0 - self.daily_mortality_rate
+        cost_per_kg = self.feed_cost_per_kg
+
+        days_to_target = None
+        biomass_curve, fish_curve, feed_curve = [], [], []
+        for day in range(horizon + 1):
+            biomass_curve.append(biomass)
+            fish_curve.append(fish)
+            if biomass >= target_biomass_kg:
+                days_to_target = day
+                break
+            percent_bw = get_feeding_stage(weight_kg * 1000)['percent_bw_per_day'] / 100
+            feed_curve.append(biomass * percent_bw)
+            # Per-fish growth from the feed eaten, then the day's losses
+            growth = 1 + percent_bw / fcr
+            weight_kg *= growth
+            fish *= survival
+            biomass *= growth * survival
+
+        cumulative_feed = list(accumulate(feed_curve))
+        return {
+            'days_to_target': days_to_target,
+            'start_date': self.start_date.strftime('%Y-%m-%d'),
+            'fcr': fcr,
+            'daily_mortality_rate': self.daily_mortality_rate,
+            'feed_cost_per_kg': cost_per_kg,
+            'biomass_kg': biomass_curve,
+            'fish_count': fish_curve,
+            'feed_kg_per_day': feed_curve,
+            'cumulative_feed_kg': cumulative_feed,
+            'cumulative_cost': [kg * cost_per_kg for kg in cumulative_feed] if cost_per_kg is not None else None,
+        }
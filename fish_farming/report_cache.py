@@ -0,0 +1,105 @@
+"""Per-user cache for report endpoints.
+
+A report response is cached under the user, the report, the normalized
+request parameters, today's date and the change stamps (``stamps.py``) of
+every model the report reads. A write to one of those models moves its stamp,
+so stale entries are never read again and expire on their own. GET reports
+also carry ``ETag``/``Last-Modified`` from the same stamps (``conditional.py``).
+
+Invalidation only reaches other worker processes through a shared cache
+backend (file, Redis, Memcached), which is why ``REPORT_CACHE_ALIAS`` points
+at a file cache by default; a process-local backend fails the
+``fish_farming.W001`` system check.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .conditional import conditional_get
+from .models import (
+    Alert, DailyLog, Expense, ExpenseType, Feed, FeedingBand, FishSampling,
+    Harvest, Income, IncomeType, Mortality, Pond, Species, Stocking,
+)
+from .stamps import get_stamps, stamp_cache
+
+
+# Models each report reads; a write to any of them invalidates the report
+REPORTS = {
+    'biomass_analysis': {Pond, Species, Stocking, FishSampling},
+    'fcr_analysis': {Pond, Species, Stocking, FishSampling, Feed, Mortality, Harvest},
+    'financial_summary': {Pond, Expense, Income, ExpenseType, IncomeType},
+    'target_biomass': {Pond, Species, Stocking, FishSampling, Feed, Mortality, Harvest, FeedingBand},
+    'pond_summary': {Pond, Species, Stocking, DailyLog, Harvest, Expense, Income, Alert},
+}
+
+
+def _params_digest(request, kwargs):
+    params = {key: sorted(request.query_params.getlist(key)) for key in request.query_params}
+    if request.method != 'GET':
+        params['body'] = request.data
+    params['view'] = kwargs
+    encoded = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def _count(cache, report, outcome):
+    key = f'report-stats:{report}:{outcome}'
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def cache_stats():
+    """Hit, miss and not-modified counts per report since the cache was last cleared"""
+    outcomes = ('hits', 'misses', 'not_modified')
+    found = stamp_cache().get_many([f'report-stats:{report}:{outcome}' for report in REPORTS for outcome in outcomes])
+    stats = {}
+    for report in REPORTS:
+        counts = {outcome: found.get(f'report-stats:{report}:{outcome}', 0) for outcome in outcomes}
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / lookups * 100, 2) if lookups else 0.0
+        stats[report] = counts
+    return stats
+
+
+def cached_report(report):
+    """Cache a view method's successful responses per user under ``report``"""
+    models = REPORTS[report]
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            response = conditional_get(
+                request, models, lambda: _cached(report, models, view_method, self, request, *args, **kwargs)
+            )
+            if response.status_code == status.HTTP_304_NOT_MODIFIED:
+                _count(stamp_cache(), report, 'not_modified')
+            return response
+        return wrapper
+    return decorator
+
+
+def _cached(report, models, view_method, view, request, *args, **kwargs):
+    cache = stamp_cache()
+    stamps = json.dumps(sorted(get_stamps(models, request.user.pk).items()))
+    key = (
+        f'report:{request.user.pk}:{report}:{timezone.localdate().isoformat()}:'
+        f'{hashlib.sha1(stamps.encode("utf-8")).hexdigest()}:{_params_digest(request, kwargs)}'
+    )
+    data = cache.get(key)
+    if data is not None:
+        _count(cache, report, 'hits')
+        return Response(data)
+
+    _count(cache, report, 'misses')
+    response = view_method(view, request, *args, **kwargs)
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, getattr(settings, 'REPORT_CACHE_TIMEOUT', 3600))
+    return response
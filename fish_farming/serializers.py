@@ -206,36 +206,70 @@ class KPIDashboardSerializer(serializers.ModelSerializer):
 
 
 # Nested serializers for detailed views
+POND_DETAIL_LIMIT = 10
+
+# Pond collections embedded in the detail view, with the relations their
+# serializers read names from (``pond`` is filled in by the prefetch)
+POND_DETAIL_COLLECTIONS = {
+    'stockings': ('species',),
+    'daily_logs': (),
+    'feeds': ('feed_type',),
+    'samplings': ('sample_type',),
+    'mortalities': ('species',),
+    'harvests': ('species',),
+    'expenses': ('user', 'species', 'expense_type'),
+    'incomes': ('user', 'species', 'income_type'),
+    'treatments': (),
+    'alerts': ('resolved_by',),
+    'env_adjustments': (),
+    'kpis': (),
+}
+
+
 class PondDetailSerializer(serializers.ModelSerializer):
+    """Pond with the newest rows of each collection and the full row counts.
+
+    Reads the ``detail_<collection>`` lists and ``<collection>_count`` values
+    that ``PondViewSet`` prefetches and annotates.
+    """
     user_username = serializers.CharField(source='user.username', read_only=True)
-    stockings = StockingSerializer(many=True, read_only=True)
-    daily_logs = DailyLogSerializer(many=True, read_only=True)
-    feeds = FeedSerializer(many=True, read_only=True)
-    samplings = SamplingSerializer(many=True, read_only=True)
-    mortalities = MortalitySerializer(many=True, read_only=True)
-    harvests = HarvestSerializer(many=True, read_only=True)
-    expenses = ExpenseSerializer(many=True, read_only=True)
-    incomes = IncomeSerializer(many=True, read_only=True)
-    treatments = TreatmentSerializer(many=True, read_only=True)
-    alerts = AlertSerializer(many=True, read_only=True)
-    env_adjustments = EnvAdjustmentSerializer(many=True, read_only=True)
-    kpis = KPIDashboardSerializer(many=True, read_only=True)
+    stockings = StockingSerializer(source='detail_stockings', many=True, read_only=True)
+    daily_logs = DailyLogSerializer(source='detail_daily_logs', many=True, read_only=True)
+    feeds = FeedSerializer(source='detail_feeds', many=True, read_only=True)
+    samplings = SamplingSerializer(source='detail_samplings', many=True, read_only=True)
+    mortalities = MortalitySerializer(source='detail_mortalities', many=True, read_only=True)
+    harvests = HarvestSerializer(source='detail_harvests', many=True, read_only=True)
+    expenses = ExpenseSerializer(source='detail_expenses', many=True, read_only=True)
+    incomes = IncomeSerializer(source='detail_incomes', many=True, read_only=True)
+    treatments = TreatmentSerializer(source='detail_treatments', many=True, read_only=True)
+    alerts = AlertSerializer(source='detail_alerts', many=True, read_only=True)
+    env_adjustments = EnvAdjustmentSerializer(source='detail_env_adjustments', many=True, read_only=True)
+    kpis = KPIDashboardSerializer(source='detail_kpis', many=True, read_only=True)
+    counts = serializers.SerializerMethodField()
     
     class Meta:
         model = Pond
         fields = '__all__'
         read_only_fields = ['volume_m3', 'created_at', 'updated_at']
+    
+    def get_counts(self, obj):
+        return {name: getattr(obj, f'{name}_count') for name in POND_DETAIL_COLLECTIONS}
 
 
 # Dashboard summary serializers
 class PondSummarySerializer(serializers.ModelSerializer):
+    """Pond with its latest records and totals.
+
+    Reads the ``latest_*`` lists, ``total_*`` sums and ``active_alerts_count``
+    that ``PondViewSet`` prefetches and annotates.
+    """
     user_username = serializers.CharField(source='user.username', read_only=True)
-    latest_stocking = StockingSerializer(source='stockings.first', read_only=True)
-    latest_daily_log = DailyLogSerializer(source='daily_logs.first', read_only=True)
-    latest_harvest = HarvestSerializer(source='harvests.first', read_only=True)
-    total_expenses = serializers.SerializerMethodField()
-    total_income = serializers.SerializerMethodField()
-    active_alerts_count = serializers.SerializerMethodField()
+    latest_stocking = serializers.SerializerMethodField()
+    latest_daily_log = serializers.SerializerMethodField()
+    latest_harvest = serializers.SerializerMethodField()
+    total_expenses = serializers.ReadOnlyField()
+    total_income = serializers.ReadOnlyField()
+    active_alerts_count = serializers.ReadOnlyField()
     
     class Meta:
         model = Pond
@@ -247,14 +281,17 @@ class PondSummarySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['volume_m3', 'created_at', 'updated_at']
     
-    def get_total_expenses(self, obj):
-        return sum(expense.amount for expense in obj.expenses.all())
+    def _latest(self, rows, serializer_class):
+        return serializer_class(rows[0], context=self.context).data if rows else None
+    
+    def get_latest_stocking(self, obj):
+        return self._latest(obj.latest_stockings, StockingSerializer)
     
-    def get_total_income(self, obj):
-        return sum(income.amount for income in obj.incomes.all())
+    def get_latest_daily_log(self, obj):
+        return self._latest(obj.latest_daily_logs, DailyLogSerializer)
     
-    def get_active_alerts_count(self, obj):
-        return obj.alerts.filter(is_resolved=False).count()
+    def get_latest_harvest(self, obj):
+        return self._latest(obj.latest_harvests, HarvestSerializer)
 
 
 # Financial summary serializers
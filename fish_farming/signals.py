@@ -0,0 +1,151 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .feeding_stages import forget_feeding_bands
+from .kpis import KPI_SOURCE_MODELS, schedule_refresh
+from .stamps import SHARED_MODELS, owner_id, touch
+from .models import DeletedRecord, FeedingBand, Pond, Stocking, Mortality, Harvest
+from .population import movement_of, record_movement
+from .sync import SYNC_MODELS
+
+
+POPULATION_MODELS = (Stocking, Mortality, Harvest)
+
+
+@receiver(pre_save, sender=Stocking)
+@receiver(pre_save, sender=Mortality)
+@receiver(pre_save, sender=Harvest)
+def remember_population_movement(sender, instance, **kwargs):
+    """Keep the stored movement of a row that is about to change"""
+    instance._ledger_previous = None
+    if instance.pk is not None:
+        previous = sender.objects.filter(pk=instance.pk).first()
+        if previous is not None:
+            instance._ledger_previous = movement_of(previous)
+
+
+@receiver(post_save, sender=Stocking)
+@receiver(post_save, sender=Mortality)
+@receiver(post_save, sender=Harvest)
+def update_population_ledger(sender, instance, **kwargs):
+    """Move the row's fish count from its old ledger position to the new one"""
+    previous = getattr(instance, '_ledger_previous', None)
+    current = movement_of(instance)
+    if previous == current:
+        return
+    with transaction.atomic():
+        if previous is not None:
+            pond_id, species_id, date, field, count = previous
+            record_movement(pond_id, species_id, date, field, -count)
+        pond_id, species_id, date, field, count = current
+        record_movement(pond_id, species_id, date, field, count)
+
+
+@receiver(post_delete, sender=Stocking)
+@receiver(post_delete, sender=Mortality)
+@receiver(post_delete, sender=Harvest)
+def remove_population_movement(sender, instance, origin=None, **kwargs):
+    # Deleting a pond, species or user removes its ledger rows by cascade
+    origin_model = origin.model if hasattr(origin, 'query') else type(origin)
+    if origin is not None and origin_model not in POPULATION_MODELS:
+        return
+    pond_id, species_id, date, field, count = movement_of(instance)
+    record_movement(pond_id, species_id, date, field, -count)
+
+
+@receiver(post_save, sender=FeedingBand)
+@receiver(post_delete, sender=FeedingBand)
+def refresh_feeding_bands(sender, **kwargs):
+    """Drop this process's compiled band table; other processes notice the stamp"""
+    forget_feeding_bands()
+
+
+def remember_kpi_position(sender, instance, **kwargs):
+    """Keep the pond and date a row is moving away from"""
+    instance._kpi_previous = None
+    if instance.pk is not None:
+        instance._kpi_previous = sender.objects.filter(pk=instance.pk).values_list('pond_id', 'date').first()
+
+
+def refresh_kpis_after_save(sender, instance, **kwargs):
+    """Recompute the pond's KPI rows from the earliest date the write touched"""
+    previous = getattr(instance, '_kpi_previous', None)
+    if previous is not None and previous != (instance.pond_id, instance.date):
+        schedule_refresh(*previous)
+    schedule_refresh(instance.pond_id, instance.date)
+
+
+def refresh_kpis_after_delete(sender, instance, origin=None, **kwargs):
+    # Rows removed by deleting their pond or user leave no KPIs to refresh
+    origin_model = origin.model if hasattr(origin, 'query') else type(origin)
+    if origin is not None and origin_model not in KPI_SOURCE_MODELS:
+        return
+    schedule_refresh(instance.pond_id, instance.date)
+
+
+for model in KPI_SOURCE_MODELS:
+    pre_save.connect(remember_kpi_position, sender=model, dispatch_uid=f'kpi_previous_{model.__name__}')
+    post_save.connect(refresh_kpis_after_save, sender=model, dispatch_uid=f'kpi_save_{model.__name__}')
+    post_delete.connect(refresh_kpis_after_delete, sender=model, dispatch_uid=f'kpi_delete_{model.__name__}')
+
+
+def touch_stamp(sender, instance, origin=None, **kwargs):
+    """Move the change stamp of the written model for its owner"""
+    # A cascade is stamped by the deleted parent, which every response reads
+    origin_model = origin.model if hasattr(origin, 'query') else type(origin)
+    if origin is not None and origin_model is not sender:
+        return
+    user_id = None if sender in SHARED_MODELS else owner_id(instance)
+    touch(sender, user_id)
+    # Again once committed, in case a response was rebuilt from the old rows meanwhile
+    transaction.on_commit(lambda: touch(sender, user_id), robust=True)
+
+
+for model in apps.get_app_config('fish_farming').get_models():
+    post_save.connect(touch_stamp, sender=model, dispatch_uid=f'stamp_save_{model.__name__}')
+    post_delete.connect(touch_stamp, sender=model, dispatch_uid=f'stamp_delete_{model.__name__}')
+
+
+def record_deletion(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone so delta sync can report the row as deleted"""
+    origin_model = origin.model if hasattr(origin, 'query') else type(origin)
+    # Deleting a user removes their tombstones too
+    if origin is not None and origin_model is get_user_model():
+        return
+    # Rows deleted with their pond got theirs from ``record_pond_deletion``
+    if origin is not None and origin_model is Pond and sender is not Pond:
+        return
+    user_id = None if sender in SHARED_MODELS else owner_id(instance)
+    DeletedRecord.objects.create(user_id=user_id, model=sender._meta.label_lower, object_id=str(instance.pk))
+
+
+for model in SYNC_MODELS:
+    post_delete.connect(record_deletion, sender=model, dispatch_uid=f'tombstone_{model.__name__}')
+
+
+# Synced models deleted with their pond
+POND_CHILDREN = [
+    model for model in SYNC_MODELS
+    if any(field.related_model is Pond for field in model._meta.concrete_fields if field.is_relation)
+]
+
+
+@receiver(pre_delete, sender=Pond)
+def record_pond_deletion(sender, instance, origin=None, **kwargs):
+    """Tombstones of the synced rows the pond takes with it, read in one query and written in bulk"""
+    origin_model = origin.model if hasattr(origin, 'query') else type(origin)
+    if origin is not None and origin_model is not Pond:
+        return
+    rows = None
+    for model in POND_CHILDREN:
+        ids = model.objects.filter(pond=instance).order_by().annotate(
+            label=Value(model._meta.label_lower)
+        ).values_list('pk', 'label')
+        rows = ids if rows is None else rows.union(ids, all=True)
+    DeletedRecord.objects.bulk_create([
+        DeletedRecord(user_id=instance.user_id, model=label, object_id=str(pk)) for pk, label in rows
+    ], batch_size=1000)
@@ -0,0 +1,62 @@
+"""Per-user, per-model change stamps.
+
+Every write to a fish_farming model stores the current time under the owning
+user and the model (see ``signals.py``); reference data shared by all users
+is stamped once for everyone. Cached reports and HTTP validators are derived
+from the stamps of the models they read, so a write makes them stale without
+anyone having to find them.
+
+Stamps live in ``settings.REPORT_CACHE_ALIAS``. A stamp that is missing
+(never written, or evicted) reads as "changed now", which is always safe.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import ExpenseType, FeedingBand, FeedType, IncomeType, Pond, SampleType, Species
+
+
+# Reference data shared by every user
+SHARED_MODELS = {Species, FeedType, SampleType, ExpenseType, IncomeType, FeedingBand}
+
+
+def stamp_cache():
+    return caches[getattr(settings, 'REPORT_CACHE_ALIAS', 'default')]
+
+
+def _key(model, user_id):
+    owner = '*' if model in SHARED_MODELS or user_id is None else user_id
+    return f'stamp:{owner}:{model._meta.label_lower}'
+
+
+def owner_id(instance):
+    """The user whose data a row belongs to: its own ``user`` or its pond's"""
+    if isinstance(instance, Pond):
+        return instance.user_id
+    user_id = getattr(instance, 'user_id', None)
+    if user_id is not None or not getattr(instance, 'pond_id', None):
+        return user_id
+    if instance._meta.get_field('pond').is_cached(instance):
+        return instance.pond.user_id
+    return Pond.objects.filter(pk=instance.pond_id).values_list('user_id', flat=True).first()
+
+
+def touch(model, user_id=None):
+    """Record that ``model`` changed for ``user_id`` (or for everyone, for shared models)"""
+    if model not in SHARED_MODELS and user_id is None:
+        return
+    stamp_cache().set(_key(model, user_id), time.time_ns(), None)
+
+
+def get_stamps(models, user_id):
+    """``{model label: stamp in ns}`` for the user's view of ``models``"""
+    cache = stamp_cache()
+    keys = {_key(model, user_id): model._meta.label_lower for model in models}
+    found = cache.get_many(list(keys))
+    now = time.time_ns()
+    for key in keys:
+        if key not in found:
+            cache.add(key, now, None)
+            found[key] = cache.get(key, now)
+    return {label: found[key] for key, label in keys.items()}
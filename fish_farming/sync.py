@@ -0,0 +1,179 @@
+"""Delta sync: every change a user can see since a cursor, in one stream.
+
+Each synced model has an indexed ``updated_at``; deletions leave a
+``DeletedRecord`` tombstone (see ``signals.py``). A page merges the rows of
+every model changed after the cursor, ordered by ``(timestamp, model, pk)``,
+and the cursor is the position of the last change served, so a client that
+syncs regularly reads only what changed since its previous sync.
+
+Rows deleted with their pond get their tombstones in one bulk insert before
+the cascade. Tombstones are kept for ``SYNC_TOMBSTONE_RETENTION_DAYS`` and
+then removed by ``prune_tombstones`` (the ``prune_sync_tombstones`` command);
+a cursor older than that may have missed deletions, so it is refused and the
+client starts over without one.
+
+Timestamps are taken when a row is saved, not when its transaction commits,
+so a long transaction can commit rows older than a cursor already handed out.
+Writes are short here; clients that need certainty can resync from an older
+cursor, as changes are idempotent upserts and deletes.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .instrumentation import timed_serializer
+from .models import (
+    Alert, DailyLog, DeletedRecord, EnvAdjustment, Expense, ExpenseType, Feed,
+    FeedingAdvice, FeedingBand, FeedType, FishSampling, Harvest, Income,
+    IncomeType, InventoryFeed, KPIDashboard, Mortality, Pond, SampleType,
+    Sampling, Setting, Species, Stocking, SurvivalRate, Treatment,
+)
+from .serializers import (
+    AlertSerializer, DailyLogSerializer, EnvAdjustmentSerializer,
+    ExpenseSerializer, ExpenseTypeSerializer, FeedingAdviceSerializer,
+    FeedingBandSerializer, FeedSerializer, FeedTypeSerializer,
+    FishSamplingSerializer, HarvestSerializer, IncomeSerializer,
+    IncomeTypeSerializer, InventoryFeedSerializer, KPIDashboardSerializer,
+    MortalitySerializer, PondSerializer, SampleTypeSerializer,
+    SamplingSerializer, SettingSerializer, SpeciesSerializer,
+    StockingSerializer, SurvivalRateSerializer, TreatmentSerializer,
+)
+
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 2000
+
+# Synced model -> (owner lookup or None for shared data, serializer, related rows to join)
+SYNC_MODELS = {
+    Species: (None, SpeciesSerializer, ()),
+    FeedType: (None, FeedTypeSerializer, ()),
+    SampleType: (None, SampleTypeSerializer, ()),
+    ExpenseType: (None, ExpenseTypeSerializer, ()),
+    IncomeType: (None, IncomeTypeSerializer, ()),
+    FeedingBand: (None, FeedingBandSerializer, ()),
+    InventoryFeed: (None, InventoryFeedSerializer, ('feed_type',)),
+    Pond: ('user', PondSerializer, ('user',)),
+    Setting: ('user', SettingSerializer, ('user',)),
+    Expense: ('user', ExpenseSerializer, ('user', 'pond', 'species', 'expense_type')),
+    Income: ('user', IncomeSerializer, ('user', 'pond', 'species', 'income_type')),
+    Stocking: ('pond__user', StockingSerializer, ('pond', 'species')),
+    DailyLog: ('pond__user', DailyLogSerializer, ('pond',)),
+    Feed: ('pond__user', FeedSerializer, ('pond', 'feed_type')),
+    Sampling: ('pond__user', SamplingSerializer, ('pond', 'sample_type')),
+    Mortality: ('pond__user', MortalitySerializer, ('pond', 'species')),
+    Harvest: ('pond__user', HarvestSerializer, ('pond', 'species')),
+    Treatment: ('pond__user', TreatmentSerializer, ('pond',)),
+    Alert: ('pond__user', AlertSerializer, ('pond', 'resolved_by')),
+    EnvAdjustment: ('pond__user', EnvAdjustmentSerializer, ('pond',)),
+    KPIDashboard: ('pond__user', KPIDashboardSerializer, ('pond',)),
+    FishSampling: ('pond__user', FishSamplingSerializer, ('pond', 'species', 'user')),
+    FeedingAdvice: ('pond__user', FeedingAdviceSerializer, ('pond', 'species', 'user', 'feed_type')),
+    SurvivalRate: ('pond__user', SurvivalRateSerializer, ('pond', 'species')),
+}
+
+TOMBSTONES = DeletedRecord._meta.label_lower
+
+
+def encode_cursor(timestamp, label, pk):
+    raw = f'{timestamp.isoformat()}|{label}|{pk}'
+    return urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return ``(timestamp, model label, pk)``; raises ``ValueError`` for a malformed cursor"""
+    try:
+        timestamp, label, pk = urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(timestamp), label, int(pk)
+    except (UnicodeError, TypeError, ValueError) as exc:
+        raise ValueError('Invalid sync cursor') from exc
+
+
+def tombstone_horizon():
+    """Deletions before this time may have been pruned"""
+    return timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def cursor_expired(cursor):
+    """Whether the position of ``cursor`` is older than the tombstones kept"""
+    timestamp, label, pk = decode_cursor(cursor)
+    return timestamp < tombstone_horizon()
+
+
+def prune_tombstones(before=None):
+    """Delete the tombstones older than ``before`` (default: the retention horizon); returns how many"""
+    deleted, _ = DeletedRecord.objects.filter(deleted_at__lt=before or tombstone_horizon()).delete()
+    return deleted
+
+
+def _after(queryset, field, label, cursor):
+    """Rows of ``queryset`` positioned after ``cursor`` in ``(field, label, pk)`` order"""
+    if cursor is None:
+        return queryset
+    timestamp, cursor_label, cursor_pk = cursor
+    if label < cursor_label:
+        return queryset.filter(**{f'{field}__gt': timestamp})
+    if label == cursor_label:
+        return queryset.filter(Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, 'pk__gt': cursor_pk}))
+    return queryset.filter(**{f'{field}__gte': timestamp})
+
+
+def changes_since(user, cursor=None, limit=DEFAULT_SYNC_LIMIT, request=None):
+    """Up to ``limit`` changes after ``cursor`` (``None`` for the full history).
+
+    Returns ``{'changes', 'next_cursor', 'has_more'}``. Each change is an
+    ``upsert`` with the serialized row or a ``delete`` with the row id; pass
+    ``next_cursor`` back to continue.
+    """
+    position = decode_cursor(cursor) if cursor else None
+
+    # Up to ``limit + 1`` candidates from every source, merged below
+    candidates = []
+    for model, (owner, serializer_class, related) in SYNC_MODELS.items():
+        label = model._meta.label_lower
+        queryset = model.objects.select_related(*related)
+        if owner is not None:
+            queryset = queryset.filter(**{owner: user})
+        rows = list(_after(queryset, 'updated_at', label, position).order_by('updated_at', 'pk')[:limit + 1])
+        candidates.extend((row.updated_at, label, row.pk, serializer_class, row) for row in rows)
+
+    tombstones = DeletedRecord.objects.filter(Q(user=user) | Q(user__isnull=True))
+    rows = _after(tombstones, 'deleted_at', TOMBSTONES, position).order_by('deleted_at', 'pk')[:limit + 1]
+    candidates.extend((row.deleted_at, TOMBSTONES, row.pk, None, row) for row in rows)
+
+    candidates.sort(key=lambda candidate: candidate[:3])
+    page = candidates[:limit]
+
+    # Serialize each model's rows in one pass
+    by_serializer = {}
+    for timestamp, label, pk, serializer_class, row in page:
+        if serializer_class is not None:
+            by_serializer.setdefault(serializer_class, []).append(row)
+    data = {}
+    for serializer_class, rows in by_serializer.items():
+        serializer = timed_serializer(serializer_class(rows, many=True, context={'request': request}))
+        for row, serialized in zip(rows, serializer.data):
+            data[(type(row), row.pk)] = serialized
+
+    changes = []
+    for timestamp, label, pk, serializer_class, row in page:
+        if serializer_class is None:
+            changes.append({
+                'model': row.model.split('.')[-1],
+                'op': 'delete',
+                'id': int(row.object_id) if row.object_id.isdigit() else row.object_id,
+                'at': timestamp.isoformat(),
+            })
+        else:
+            changes.append({
+                'model': row._meta.model_name,
+                'op': 'upsert',
+                'id': pk,
+                'at': timestamp.isoformat(),
+                'data': data[(type(row), pk)],
+            })
+
+    next_cursor = encode_cursor(*page[-1][:3]) if page else cursor
+    return {'changes': changes, 'next_cursor': next_cursor, 'has_more': len(candidates) > limit}
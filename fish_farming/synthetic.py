@@ -0,0 +1,244 @@
+"""Deterministic synthetic farms for performance work.
+
+``SyntheticFarm`` creates users, each with ponds stocked with several
+species, and gives every pond a daily history: water logs that follow the
+seasons, daily feeding sized to the day's growth at a per-pond FCR, weekly
+fish and water samplings, background and occasional mass mortality, a
+partial harvest with its income, and feed and labour expenses. Fish grow
+along a von Bertalanffy curve.
+
+Each pond draws from its own random generator seeded with ``(seed, user,
+pond)``, so the same options give the same rows at any scale. Rows are
+inserted with ``bulk_create`` one pond at a time; the population ledger,
+growth rates and KPI rows are rebuilt once for all the new ponds afterwards.
+"""
+import math
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .growth import recalculate_growth_rates
+from .kpis import materialize_kpis
+from .models import (
+    DailyLog, Expense, ExpenseType, Feed, FeedType, FishSampling, Harvest,
+    Income, IncomeType, Mortality, Pond, SampleType, Sampling, Species, Stocking,
+)
+from .population import rebuild_ledger
+
+
+# name, asymptotic weight (kg), growth constant (per day), stocking weight (kg), price per kg
+SPECIES = [
+    ('Tilapia', 0.9, 0.020, 0.010, 160),
+    ('Rohu', 1.5, 0.012, 0.015, 280),
+    ('Catla', 2.0, 0.011, 0.020, 300),
+    ('Pangas', 1.8, 0.018, 0.012, 150),
+    ('Mrigal', 1.2, 0.012, 0.012, 240),
+    ('Common Carp', 1.6, 0.014, 0.015, 220),
+]
+
+FEED_TYPE = 'Synthetic grower feed'
+FEED_COST_PER_KG = Decimal('62.00')
+WATER_SAMPLE_TYPE = 'Water Quality'
+WEATHER = ['Sunny', 'Sunny', 'Cloudy', 'Partly cloudy', 'Rain']
+
+# Models the generator writes, in insert order
+GENERATED_MODELS = [Stocking, DailyLog, Feed, Sampling, FishSampling, Mortality, Harvest, Expense, Income]
+
+
+def _d(value, places=2):
+    return Decimal(f'{value:.{places}f}')
+
+
+def weight_on(day, initial_kg, asymptotic_kg, growth_constant):
+    """Von Bertalanffy weight ``day`` days after stocking at ``initial_kg``"""
+    root = asymptotic_kg ** (1 / 3) - (asymptotic_kg ** (1 / 3) - initial_kg ** (1 / 3)) * math.exp(-growth_constant * day)
+    return root ** 3
+
+
+class SyntheticFarm:
+    """Generate ``users`` users with ``ponds`` ponds of ``species`` species and ``days`` of history each"""
+
+    def __init__(self, seed, users, ponds, species, days, start_date, prefix='synthetic', password=None):
+        if not 1 <= species <= len(SPECIES):
+            raise ValueError(f'species must be between 1 and {len(SPECIES)}')
+        self.seed = seed
+        self.users = users
+        self.ponds = ponds
+        self.species = species
+        self.days = days
+        self.start_date = start_date
+        self.prefix = prefix
+        self.password = password
+        self.counts = {str(model._meta.verbose_name_plural).lower(): 0 for model in GENERATED_MODELS}
+
+    def usernames(self):
+        return [f'{self.prefix}-s{self.seed}-u{number + 1}' for number in range(self.users)]
+
+    def reference_rows(self):
+        """Species, feed, sample, expense and income types shared by every synthetic pond"""
+        self.species_rows = [
+            (Species.objects.get_or_create(name=name)[0], profile)
+            for name, *profile in SPECIES[:self.species]
+        ]
+        self.feed_type = FeedType.objects.get_or_create(name=FEED_TYPE, defaults={'protein_content': Decimal('28')})[0]
+        self.sample_type = SampleType.objects.get_or_create(name=WATER_SAMPLE_TYPE)[0]
+        self.feed_expense = ExpenseType.objects.get_or_create(name='Feed purchase', defaults={'category': 'feed'})[0]
+        self.labor_expense = ExpenseType.objects.get_or_create(name='Labour', defaults={'category': 'labor'})[0]
+        self.harvest_income = IncomeType.objects.get_or_create(name='Fish sale', defaults={'category': 'harvest'})[0]
+
+    def generate(self, kpis=True, progress=None):
+        """Create everything; returns the ids of the new ponds"""
+        self.reference_rows()
+        pond_ids = []
+        for user_number, username in enumerate(self.usernames()):
+            with transaction.atomic():
+                user = User(username=username)
+                if self.password:
+                    user.set_password(self.password)
+                else:
+                    user.set_unusable_password()
+                user.save()
+                for pond_number in range(self.ponds):
+                    rnd = random.Random(f'{self.seed}-{user_number}-{pond_number}')
+                    pond = Pond.objects.create(
+                        user=user,
+                        name=f'Pond {pond_number + 1}',
+                        area_decimal=_d(rnd.uniform(10, 60), 3),
+                        depth_ft=_d(rnd.uniform(4, 8)),
+                        volume_m3=0,
+                        location=f'Block {chr(ord("A") + pond_number % 26)}',
+                    )
+                    self.insert(self.pond_history(pond, user, rnd))
+                    pond_ids.append(pond.pk)
+            if progress:
+                progress(username)
+
+        rebuild_ledger(pond_ids)
+        recalculate_growth_rates(pond_ids)
+        if kpis:
+            materialize_kpis(pond_ids, rebuild=True)
+        return pond_ids
+
+    def insert(self, rows):
+        for model in GENERATED_MODELS:
+            model.objects.bulk_create(rows[model], batch_size=500)
+            self.counts[str(model._meta.verbose_name_plural).lower()] += len(rows[model])
+
+    def pond_history(self, pond, user, rnd):
+        """Unsaved rows of one pond, by model"""
+        rows = {model: [] for model in GENERATED_MODELS}
+        start = self.start_date
+        harvest_day = self.days - 15 if self.days >= 120 else None
+
+        stocks = []
+        for species, (asymptotic_kg, growth_constant, initial_kg, price) in self.species_rows:
+            pcs = rnd.randrange(2000, 12000, 100)
+            initial_kg *= rnd.uniform(0.8, 1.2)
+            stocking = Stocking(
+                pond=pond, species=species, date=start, pcs=pcs,
+                total_weight_kg=_d(pcs * initial_kg, 4),
+            )
+            stocking.calculate_derived_fields()
+            rows[Stocking].append(stocking)
+            stocks.append({
+                'species': species,
+                'alive': pcs,
+                'unrecorded_deaths': 0,
+                'curve': (initial_kg, asymptotic_kg * rnd.uniform(0.9, 1.1), growth_constant * rnd.uniform(0.85, 1.15)),
+                'price': price,
+            })
+
+        fcr = rnd.uniform(1.3, 1.9)
+        weekly_feed_cost = Decimal('0')
+        for day in range(self.days):
+            date = start + timedelta(days=day)
+            season = math.sin(2 * math.pi * (date.timetuple().tm_yday - 100) / 365)
+            water_temp = 28 + 4 * season + rnd.gauss(0, 0.8)
+            rows[DailyLog].append(DailyLog(
+                pond=pond, date=date, weather=rnd.choice(WEATHER),
+                water_temp_c=_d(water_temp), ph=_d(rnd.gauss(7.4, 0.3), 1),
+                dissolved_oxygen=_d(max(2, rnd.gauss(6, 0.8))),
+                ammonia=_d(abs(rnd.gauss(0.1, 0.05))), nitrite=_d(abs(rnd.gauss(0.05, 0.03))),
+            ))
+
+            # Occasional mass mortality from disease or low oxygen
+            die_off = rnd.random() < 0.01
+            biomass = gain = 0.0
+            for stock in stocks:
+                weight = weight_on(day, *stock['curve'])
+                hazard = 0.0006 * (15 if die_off else 1)
+                deaths = min(stock['alive'], int(stock['alive'] * hazard + rnd.random()))
+                stock['alive'] -= deaths
+                stock['unrecorded_deaths'] += deaths
+                # Small losses are noticed and written down every few days
+                if stock['unrecorded_deaths'] and (die_off or rnd.random() < 0.3):
+                    mortality = Mortality(
+                        pond=pond, species=stock['species'], date=date, count=stock['unrecorded_deaths'],
+                        avg_weight_kg=_d(weight, 4), cause='Disease outbreak' if die_off else 'Natural',
+                    )
+                    mortality.calculate_total_weight()
+                    rows[Mortality].append(mortality)
+                    stock['unrecorded_deaths'] = 0
+
+                if day % 7 == 6:
+                    sample_size = 30
+                    sampling = FishSampling(
+                        pond=pond, species=stock['species'], user=user, date=date, sample_size=sample_size,
+                        total_weight_kg=_d(weight * sample_size * rnd.gauss(1, 0.04), 4),
+                    )
+                    sampling.calculate_derived_metrics()
+                    rows[FishSampling].append(sampling)
+
+                if day == harvest_day:
+                    count = int(stock['alive'] * rnd.uniform(0.2, 0.4))
+                    if count:
+                        price = _d(stock['price'] * rnd.uniform(0.9, 1.1))
+                        harvest = Harvest(
+                            pond=pond, species=stock['species'], date=date,
+                            total_weight_kg=_d(count * weight, 2), total_count=count, price_per_kg=price,
+                        )
+                        harvest.calculate_derived_fields()
+                        rows[Harvest].append(harvest)
+                        rows[Income].append(Income(
+                            user=user, pond=pond, species=stock['species'], income_type=self.harvest_income,
+                            date=date, amount=_d(harvest.total_revenue), quantity=_d(count * weight),
+                            unit='kg', customer='Wholesale market',
+                        ))
+                        stock['alive'] -= count
+
+                biomass += stock['alive'] * weight
+                gain += stock['alive'] * (weight_on(day + 1, *stock['curve']) - weight)
+
+            # Fish eat less in cold water
+            appetite = min(1.0, max(0.4, (water_temp - 18) / 10))
+            amount = gain * fcr * appetite * rnd.uniform(0.85, 1.15)
+            if amount >= 0.01:
+                feed = Feed(
+                    pond=pond, feed_type=self.feed_type, date=date, amount_kg=_d(amount),
+                    cost_per_kg=FEED_COST_PER_KG, biomass_at_feeding_kg=_d(min(biomass, 99999999)),
+                )
+                feed.calculate_derived_fields()
+                rows[Feed].append(feed)
+                weekly_feed_cost += feed.total_cost or 0
+
+            if day % 7 == 0:
+                rows[Sampling].append(Sampling(
+                    pond=pond, date=date, sample_type=self.sample_type,
+                    ph=_d(rnd.gauss(7.4, 0.3), 1), temperature_c=_d(water_temp),
+                    dissolved_oxygen=_d(max(2, rnd.gauss(6, 0.8))), ammonia=_d(abs(rnd.gauss(0.1, 0.05))),
+                ))
+            if day % 7 == 6 and weekly_feed_cost:
+                rows[Expense].append(Expense(
+                    user=user, pond=pond, expense_type=self.feed_expense, date=date,
+                    amount=_d(weekly_feed_cost), supplier='Synthetic Feeds Ltd',
+                ))
+                weekly_feed_cost = Decimal('0')
+            if day % 30 == 0:
+                rows[Expense].append(Expense(
+                    user=user, pond=pond, expense_type=self.labor_expense, date=date,
+                    amount=_d(rnd.uniform(8000, 12000)),
+                ))
+        return rows
@@ -28,6 +28,10 @@ router.register(r'fish-sampling', views.FishSamplingViewSet)
 router.register(r'feeding-advice', views.FeedingAdviceViewSet)
 router.register(r'survival-rates', views.SurvivalRateViewSet)
 router.register(r'target-biomass', views.TargetBiomassViewSet, basename='target-biomass')
+router.register(r'analytics', views.AnalyticsViewSet, basename='analytics')
+router.register(r'report-cache', views.ReportCacheViewSet, basename='report-cache')
+router.register(r'sync', views.SyncViewSet, basename='sync')
+router.register(r'request-stats', views.RequestStatsViewSet, basename='request-stats')
 
 urlpatterns = [
     path('', include(router.urls)),